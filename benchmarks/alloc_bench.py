@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+import argparse
+import copy
+import gc
+import json
+import sys
+import tracemalloc
+import typing
+
+from sample import decode
+from sample import decode_interpreted
+from sample import load_sample
+from sample import run_baseline
+
+from krdsrw import objects
+from krdsrw.objects import Store
+
+# deep enough to reach from where a block is allocated back out to
+# whichever schema function asked for it
+_FRAMES: typing.Final[int] = 8
+
+
+def _schema_code() -> list[tuple[str, int, int]]:
+    # (file, first line, last line) of the code that copies or normalizes
+    # a schema as a container is built. copy.deepcopy before schemas were
+    # interned, _freeze_mapping and _freeze_field after
+    result = [(copy.deepcopy.__code__.co_filename, 0, sys.maxsize)]
+    for name in ("_freeze_mapping", "_freeze_field"):
+        f = getattr(objects, name, None)
+        if f is not None:
+            code = f.__code__
+            last = max(e for _, _, e in code.co_lines() if e is not None)
+            result.append((code.co_filename, code.co_firstlineno, last))
+    return result
+
+
+def _is_schema_block(
+    traceback: tracemalloc.Traceback, code: list[tuple[str, int, int]]
+) -> bool:
+    return any(
+        frame.filename == file and first <= frame.lineno <= last
+        for frame in traceback
+        for file, first, last in code
+    )
+
+
+def _source_bytes(root: Store) -> int:
+    # what the memoryviews that decoded containers keep of their own
+    # bytes cost, so that unmodified ones can be written back as-is. a
+    # view doesn't own the bytes it's of, so this is the views themselves
+    total = 0
+    stack: list[typing.Any] = [root]
+    while stack:
+        o = stack.pop()
+        source = getattr(o, "_source", None)
+        if source is not None:
+            total += sys.getsizeof(source)
+        if isinstance(o, dict):
+            stack.extend(dict.values(o))
+        elif isinstance(o, list):
+            stack.extend(o)
+    return total
+
+
+def _count_annotations(root: Store) -> int:
+    annots = root.get("annotation.cache.object")
+    if not annots:
+        return 0
+    return sum(len(v) for v in annots.values())
+
+
+def _measure(f: typing.Callable[[], Store]) -> dict[str, float]:
+    # per annotation: blocks still allocated once decoding is done, how
+    # many of those are schemas, the peak size of everything allocated
+    # along the way and how much of what's kept is source views
+    code = _schema_code()
+    gc.collect()
+    tracemalloc.start(_FRAMES)
+    try:
+        before = tracemalloc.take_snapshot()
+        root = f()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    # only blocks from files that could hold schema code are checked
+    files = [
+        tracemalloc.Filter(True, file, all_frames=True)
+        for file in {e[0] for e in code}
+    ]
+    schema = sum(
+        _is_schema_block(e.traceback, code)
+        for e in after.filter_traces(files).traces
+    ) - sum(
+        _is_schema_block(e.traceback, code)
+        for e in before.filter_traces(files).traces
+    )
+    stats = after.compare_to(before, "filename")
+    count = max(1, _count_annotations(root))
+    return {
+        "annotations": _count_annotations(root),
+        "blocks": sum(max(0, e.count_diff) for e in stats) / count,
+        "schema": max(0, schema) / count,
+        "peak": peak / count,
+        "sources": _source_bytes(root) / count,
+    }
+
+
+def _print(results: dict[str, dict[str, float]]):
+    print(
+        f"  {'':<12} {'blocks kept':>12} {'schema blocks':>14}"
+        + f" {'peak bytes':>11} {'source views':>13}"
+    )
+    for name, e in results.items():
+        print(
+            f"  {name:<12} {e['blocks']:12.1f} {e['schema']:14.1f}"
+            + f" {e['peak']:11.1f} {e['sources']:13.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Count the allocations made per decoded annotation"
+    )
+    parser.add_argument("file", nargs="?", help="sidecar file to decode")
+    parser.add_argument(
+        "--baseline",
+        metavar="SRC",
+        help="src dir of another checkout to compare against, e.g. one"
+        + " from before schemas were interned",
+    )
+    parser.add_argument("--json", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    data = load_sample(args.file)
+    decode(data)  # compile outside of the measured runs
+
+    results = {
+        "interpreted": _measure(lambda: decode_interpreted(data)),
+        "compiled": _measure(lambda: decode(data)),
+    }
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    count = results["compiled"]["annotations"]
+    print(f"{len(data)} bytes, {count:.0f} annotations, per annotation")
+    if args.baseline:
+        print("baseline")
+        _print(
+            run_baseline(
+                __file__, args.baseline, [args.file] if args.file else []
+            )
+        )
+        print("head")
+    _print(results)
+
+    extra = results["compiled"]["peak"] - results["interpreted"]["peak"]
+    print(
+        "  schema blocks: copies or normalized forms of a schema kept by"
+        + " the containers"
+    )
+    print(
+        f"  source views: {results['compiled']['sources']:.1f} of the"
+        + f" compiled decoder's {extra:.1f} extra peak bytes"
+    )
+    print(
+        "    the memoryview each decoded container keeps of its own bytes,"
+        + " to write it"
+    )
+    print("    back as-is while unmodified")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+import argparse
+import json
+import timeit
+
+from sample import decode
+from sample import decode_interpreted
+from sample import load_sample
+from sample import run_baseline
+
+
+def _measure(data: bytes, number: int) -> dict[str, float]:
+    decode(data)  # compile outside of the timed runs
+    return {
+        name: min(timeit.repeat(lambda: f(data), number=1, repeat=number))
+        for name, f in (
+            ("interpreted", decode_interpreted),
+            ("compiled", decode),
+        )
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the compiled and interpreted Store decoders"
+    )
+    parser.add_argument("file", nargs="?", help="sidecar file to decode")
+    parser.add_argument("-n", "--number", type=int, default=5)
+    parser.add_argument(
+        "--baseline",
+        metavar="SRC",
+        help="src dir of another checkout to compare against, e.g. one"
+        + " from before any of the decoding work",
+    )
+    parser.add_argument("--json", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    data = load_sample(args.file)
+    results = _measure(data, args.number)
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    print(f"{len(data)} bytes, best of {args.number}")
+    before = {}
+    if args.baseline:
+        before = run_baseline(
+            __file__,
+            args.baseline,
+            ["-n", str(args.number)] + ([args.file] if args.file else []),
+        )
+        print(f"  {'':<12} {'baseline':>12} {'head':>12}")
+    for name, value in results.items():
+        row = f"  {name:<12}"
+        if name in before:
+            row += f" {before[name] * 1000:9.2f} ms"
+        print(row + f" {value * 1000:9.2f} ms")
+    print(
+        "  interpreted and compiled share every other decoding change, so"
+        + " their ratio"
+    )
+    print(
+        "  is only what compiling adds. use --baseline for the change as a"
+        + " whole"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+import argparse
+import timeit
+
+from sample import load_sample
+
+from krdsrw.builtins import DictBase
+from krdsrw.builtins import ListBase
+from krdsrw.cursor import ReadCursor
+from krdsrw.cursor import WriteCursor
+from krdsrw.objects import ObjectMap
+from krdsrw.objects import Store
+
+
+def _drop_sources(o):
+    # a decoded container keeps the bytes it came from and is written
+    # back by copying them, which would leave nothing to encode
+    if isinstance(o, (ListBase, DictBase)):
+        o._source = None
+        for e in o.values() if isinstance(o, dict) else o:
+            _drop_sources(e)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the compiled and interpreted Store encoders"
+    )
+    parser.add_argument("file", nargs="?", help="sidecar file to encode")
+    parser.add_argument("-n", "--number", type=int, default=5)
+    args = parser.parse_args()
+
+    data = load_sample(args.file)
+    # noinspection PyProtectedMember
+    decoded = Store._create(ReadCursor(data))
+    # noinspection PyProtectedMember
+    store = Store._create(ReadCursor(data))
+    _drop_sources(store)
+
+    def interpreted():
+        csr = WriteCursor()
+        # noinspection PyProtectedMember
+        ObjectMap._write(store, csr)
+        return csr.dump()
+
+    def compiled():
+        csr = WriteCursor()
+        # noinspection PyProtectedMember
+        store._write(csr)
+        return csr.dump()
+
+    def passthrough():
+        csr = WriteCursor()
+        # noinspection PyProtectedMember
+        decoded._write(csr)
+        return csr.dump()
+
+    # compile outside of the timed runs
+    assert compiled() == interpreted() == data, "encoders disagree"
+    assert passthrough() == data, "passthrough disagrees"
+
+    print(f"{len(data)} bytes, best of {args.number}")
+    results = {}
+    for name, f in (
+        ("interpreted", interpreted),
+        ("compiled", compiled),
+        ("passthrough", passthrough),
+    ):
+        results[name] = min(timeit.repeat(f, number=1, repeat=args.number))
+        print(f"  {name:<12} {results[name] * 1000:9.2f} ms")
+    speedup = results["interpreted"] / results["compiled"]
+    print(f"  speedup      {speedup:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
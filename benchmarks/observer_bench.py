@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+import argparse
+import gc
+import json
+import timeit
+import tracemalloc
+
+from sample import decode
+from sample import load_sample
+from sample import make_store
+from sample import run_baseline
+
+from krdsrw.objects import Store
+
+
+def _resident(data: bytes) -> int:
+    # bytes still allocated once the decoded Store is built, i.e. what
+    # holding on to it costs
+    gc.collect()
+    tracemalloc.start()
+    try:
+        root = decode(data)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del root
+    return size
+
+
+def _edit(root: Store):
+    # one edit per annotation, each of which has to tell its ancestors
+    # that the bytes they were decoded from are stale
+    for annots in root["annotation.cache.object"].values():
+        for o in annots:
+            o["last_modification_time"] = 1700000000001
+
+
+def _measure(data: bytes, number: int) -> dict[str, float]:
+    decode(data)  # compile outside of the measured runs
+
+    def edit():
+        root = decode(data)
+        start = timeit.default_timer()
+        _edit(root)
+        return timeit.default_timer() - start
+
+    return {
+        "resident": _resident(data) / 1024 / 1024,
+        "decode": min(
+            timeit.repeat(lambda: decode(data), number=1, repeat=number)
+        ),
+        "edit": min(edit() for _ in range(number)),
+        "build": min(timeit.repeat(make_store, number=1, repeat=number)),
+    }
+
+
+def _format(name: str, value: float) -> str:
+    if name == "resident":
+        return f"{value:9.2f} MiB"
+    return f"{value * 1000:9.2f} ms "
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the cost of tracking parents for change"
+        + " propagation"
+    )
+    parser.add_argument("file", nargs="?", help="sidecar file to decode")
+    parser.add_argument("-n", "--number", type=int, default=5)
+    parser.add_argument(
+        "--baseline",
+        metavar="SRC",
+        help="src dir of another checkout to compare against, e.g. one"
+        + " from before the single parent slot with the weakref parent"
+        + " lists",
+    )
+    parser.add_argument("--json", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    data = load_sample(args.file)
+    results = _measure(data, args.number)
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    print(f"{len(data)} bytes, best of {args.number}")
+    if not args.baseline:
+        for name, value in results.items():
+            print(f"  {name:<12} {_format(name, value)}")
+        return
+
+    before = run_baseline(
+        __file__,
+        args.baseline,
+        ["-n", str(args.number)] + ([args.file] if args.file else []),
+    )
+    print(f"  {'':<12} {'baseline':>13} {'head':>13}")
+    for name, value in results.items():
+        print(
+            f"  {name:<12} {_format(name, before[name])}"
+            + f" {_format(name, value)} {before[name] / value:6.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
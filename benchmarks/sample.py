@@ -0,0 +1,151 @@
+import json
+import os
+import pathlib
+import random
+import subprocess
+import sys
+import typing
+
+# KRDSRW_SRC points the benchmarks at another checkout's src, e.g. to
+# compare against an older revision
+sys.path.insert(
+    0,
+    os.environ.get("KRDSRW_SRC")
+    or str(pathlib.Path(__file__).parent.parent / "src"),
+)
+
+from krdsrw.basics import Int
+from krdsrw.basics import Utf8Str
+from krdsrw.objects import ObjectMap
+from krdsrw.objects import Store
+from krdsrw.objects import _store_key_to_field
+from krdsrw.objects import dump_bytes
+
+try:
+    from krdsrw.cursor import ReadCursor as _DecodeCursor
+except ImportError:  # a KRDSRW_SRC from before ReadCursor
+    from krdsrw.cursor import Cursor as _DecodeCursor
+
+
+def make_store(
+    annotations: int = 300,
+    page_history: int = 1000,
+    metrics: int = 200,
+    samples: int = 2000,
+) -> Store:
+    # a synthetic but realistically shaped sidecar: lots of annotations
+    # and page history, a couple of big DynamicMaps and a long run of
+    # doubles, plus the small entries most jobs actually read
+    rng = random.Random(0)
+    root = Store()
+
+    annots = root["annotation.cache.object"]
+    for kind in ("bookmarks", "highlights", "notes"):
+        for i in range(annotations):
+            o = {
+                "start_pos": {
+                    "char_pos": i * 10,
+                    "chunk_eid": 100 + i,
+                    "chunk_pos": i,
+                },
+                "end_pos": {
+                    "char_pos": i * 10 + 5,
+                    "chunk_eid": 100 + i,
+                    "chunk_pos": i + 5,
+                },
+                "creation_time": 1700000000000 + i,
+                "last_modification_time": 1700000000000 + i,
+                "template": "0￼0",
+            }
+            if kind == "notes":
+                o["note"] = f"note number {i}"
+            # append() rather than make_and_append(), which hands back a
+            # copy of the element that was appended
+            annots[kind].append(o)
+
+    for i in range(page_history):
+        root["page.history.store"].append(
+            {
+                "pos": {"char_pos": i, "chunk_eid": i % 50, "chunk_pos": 0},
+                "time": 1700000000000 + i,
+            }
+        )
+
+    for key in ("ReaderMetrics", "EndActions"):
+        for i in range(metrics):
+            root[key][f"key{i}"] = Int(i) if i % 2 else Utf8Str(f"v{i}")
+
+    root["timer.average.calculator.outliers"].extend(
+        rng.random() for _ in range(samples)
+    )
+
+    root["lpr"] = {
+        "pos": {"char_pos": 5, "chunk_eid": 3, "chunk_pos": 1},
+        "timestamp": 1700000000000,
+        "lpr_version": 2,
+    }
+    root["fpr"] = {
+        "pos": {"char_pos": 5},
+        "timestamp": 1700000000000,
+        "timezone_offset": 0,
+        "country": "US",
+        "device": "A1B2C3",
+    }
+    root["font.prefs"] = {
+        "typeface": "_INVALID_,und:bookerly",
+        "line_sp": 1,
+        "size": 4,
+        "align": 1,
+        "inset_top": 63,
+        "inset_left": 80,
+        "inset_bottom": 0,
+        "inset_right": 80,
+        "unknown1": 0,
+    }
+    root["apnx.key"] = {
+        "asin": "B000000000",
+        "cde_type": "EBOK",
+        "sidecar_available": 1,
+        "opn_to_pos": list(range(500)),
+        "first": 1,
+        "unknown1": 0,
+        "unknown2": 0,
+        "page_map": "(1,a,1)",
+    }
+
+    return root
+
+
+def load_sample(path: None | str = None) -> bytes:
+    if path:
+        return pathlib.Path(path).read_bytes()
+    return dump_bytes(make_store())
+
+
+def decode(data: bytes) -> Store:
+    # noinspection PyProtectedMember
+    return Store._create(_DecodeCursor(data))
+
+
+def decode_interpreted(data: bytes) -> Store:
+    # the generic walk over the schema that the compiled decoders replace
+    # noinspection PyProtectedMember
+    return ObjectMap._create(
+        _DecodeCursor(data), _schema=_store_key_to_field
+    )  # type: ignore
+
+
+def run_baseline(
+    script: str, src: str, args: typing.Sequence[str]
+) -> typing.Any:
+    # runs script again against another checkout's src in a fresh
+    # interpreter, as both can't be imported as krdsrw in this one. the
+    # script prints its results as JSON when passed --json
+    out = subprocess.run(
+        [sys.executable, script, *args, "--json"],
+        check=True,
+        capture_output=True,
+        env=os.environ | {"KRDSRW_SRC": src},
+        text=True,
+    )
+    return json.loads(out.stdout)
@@ -9,18 +9,25 @@ from .basics import Short
 from .basics import Utf8Str
 from .error import UnexpectedBytesError
 from .error import UnexpectedStructureError
+from .events import iterparse
 from .objects import Array
 from .objects import DateTime
 from .objects import DynamicMap
 from .objects import IntMap
 from .objects import LPR
+from .objects import LazyStore
 from .objects import ObjectMap
+from .objects import PartialStore
 from .objects import Position
 from .objects import Record
 from .objects import Store
 from .objects import TimeZoneOffset
 from .objects import load_file
+from .objects import loads
 from .objects import dump_bytes
+from .objects import dump_file
+from .objects import patch_file
+from .objects import scan_index
 
 __all__ = [
     "Array",
@@ -34,9 +41,11 @@ __all__ = [
     "Int",
     "IntMap",
     "LPR",
+    "LazyStore",
     "Long",
     "ObjectMap",
     "ObjectMap",
+    "PartialStore",
     "Position",
     "Record",
     "Short",
@@ -46,5 +55,10 @@ __all__ = [
     "UnexpectedStructureError",
     "Utf8Str",
     "load_file",
+    "loads",
     "dump_bytes",
+    "dump_file",
+    "iterparse",
+    "patch_file",
+    "scan_index",
 ]
@@ -33,21 +33,36 @@ _FLOAT_MAGIC_BYTE: typing.Final[int] = 6
 _BYTE_MAGIC_BYTE: typing.Final[int] = 0x07
 _CHAR_MAGIC_BYTE: typing.Final[int] = 9
 
+# precompiled so that reads unpack in place instead of re-parsing the
+# format string and slicing out a temporary bytes object for each value
+_BYTE_STRUCT: typing.Final[struct.Struct] = struct.Struct(">b")
+_CHAR_STRUCT: typing.Final[struct.Struct] = struct.Struct(">B")
+_BOOL_STRUCT: typing.Final[struct.Struct] = struct.Struct(">?")
+_SHORT_STRUCT: typing.Final[struct.Struct] = struct.Struct(">h")
+_INT_STRUCT: typing.Final[struct.Struct] = struct.Struct(">l")
+_LONG_STRUCT: typing.Final[struct.Struct] = struct.Struct(">q")
+_FLOAT_STRUCT: typing.Final[struct.Struct] = struct.Struct(">f")
+_DOUBLE_STRUCT: typing.Final[struct.Struct] = struct.Struct(">d")
+_STRLEN_STRUCT: typing.Final[struct.Struct] = struct.Struct(">H")
+
 
 def _read_unpack(
-    csr: Cursor, fmt: str, magic_byte: None | int = None
+    csr: Cursor, fmt: struct.Struct, magic_byte: None | int = None
 ) -> int | float | str | bytes:
     if magic_byte is not None and not csr.eat(magic_byte):
         raise UnexpectedBytesError(csr.tell(), magic_byte, csr.peek())
-    return struct.unpack_from(fmt, csr.read(struct.calcsize(fmt)))[0]
+    return csr.unpack(fmt)[0]
 
 
 def _write_pack(
-    csr: Cursor, o: int | float | str, fmt: str, magic_byte: None | int = None
+    csr: Cursor,
+    o: int | float | str,
+    fmt: struct.Struct,
+    magic_byte: None | int = None,
 ):
     if magic_byte is not None:
         csr.write(magic_byte)
-    csr.write(struct.pack(fmt, o))
+    csr.write(fmt.pack(o))
 
 
 def _explode(
@@ -67,96 +82,96 @@ def read_byte(csr: Cursor, magic_byte: bool = True) -> int:
     from .basics import Byte
 
     magic_byte_ = _BYTE_MAGIC_BYTE if magic_byte else None
-    return Byte(_read_unpack(csr, ">b", magic_byte_))
+    return Byte(_read_unpack(csr, _BYTE_STRUCT, magic_byte_))
 
 
 def write_byte(csr: Cursor, value: int, magic_byte: bool = True):
     magic_byte_ = _BYTE_MAGIC_BYTE if magic_byte else None
-    _write_pack(csr, value, ">b", magic_byte_)
+    _write_pack(csr, value, _BYTE_STRUCT, magic_byte_)
 
 
 def read_char(csr: Cursor, magic_byte: bool = True) -> int:
     from .basics import Char
 
     magic_byte_ = _CHAR_MAGIC_BYTE if magic_byte else None
-    return Char(_read_unpack(csr, ">B", magic_byte_))
+    return Char(_read_unpack(csr, _CHAR_STRUCT, magic_byte_))
 
 
 def write_char(csr: Cursor, value: int, magic_byte: bool = True):
     magic_byte_ = _CHAR_MAGIC_BYTE if magic_byte else None
-    _write_pack(csr, value, ">B", magic_byte_)
+    _write_pack(csr, value, _CHAR_STRUCT, magic_byte_)
 
 
 def read_bool(csr: Cursor, magic_byte: bool = True) -> bool | int:
     from .basics import Bool
 
     magic_byte_ = _BOOL_MAGIC_BYTE if magic_byte else None
-    return Bool(_read_unpack(csr, ">?", magic_byte_))
+    return Bool(_read_unpack(csr, _BOOL_STRUCT, magic_byte_))
 
 
 def write_bool(csr: Cursor, value: bool | int, magic_byte: bool = True):
     magic_byte_ = _BOOL_MAGIC_BYTE if magic_byte else None
-    _write_pack(csr, value, ">?", magic_byte_)
+    _write_pack(csr, value, _BOOL_STRUCT, magic_byte_)
 
 
 def read_int(csr: Cursor, magic_byte: bool = True) -> int:
     from .basics import Int
 
     magic_byte_ = _INT_MAGIC_BYTE if magic_byte else None
-    return Int(_read_unpack(csr, ">l", magic_byte_))
+    return Int(_read_unpack(csr, _INT_STRUCT, magic_byte_))
 
 
 def write_int(csr: Cursor, value: int, magic_byte: bool = True):
     magic_byte_ = _INT_MAGIC_BYTE if magic_byte else None
-    _write_pack(csr, value, ">l", magic_byte_)
+    _write_pack(csr, value, _INT_STRUCT, magic_byte_)
 
 
 def read_long(csr: Cursor, magic_byte: bool = True) -> int:
     from .basics import Long
 
     magic_byte_ = _LONG_MAGIC_BYTE if magic_byte else None
-    return Long(_read_unpack(csr, ">q", magic_byte_))
+    return Long(_read_unpack(csr, _LONG_STRUCT, magic_byte_))
 
 
 def write_long(csr: Cursor, value: int, magic_byte: bool = True):
     magic_byte_ = _LONG_MAGIC_BYTE if magic_byte else None
-    _write_pack(csr, value, ">q", magic_byte_)
+    _write_pack(csr, value, _LONG_STRUCT, magic_byte_)
 
 
 def read_short(csr: Cursor, magic_byte: bool = True) -> int:
     from .basics import Short
 
     magic_byte_ = _SHORT_MAGIC_BYTE if magic_byte else None
-    return Short(_read_unpack(csr, ">h", magic_byte_))
+    return Short(_read_unpack(csr, _SHORT_STRUCT, magic_byte_))
 
 
 def write_short(csr: Cursor, value: int, magic_byte: bool = True):
     magic_byte_ = _SHORT_MAGIC_BYTE if magic_byte else None
-    _write_pack(csr, value, ">h", magic_byte_)
+    _write_pack(csr, value, _SHORT_STRUCT, magic_byte_)
 
 
 def read_float(csr: Cursor, magic_byte: bool = True) -> float:
     from .basics import Float
 
     magic_byte_ = _FLOAT_MAGIC_BYTE if magic_byte else None
-    return Float(_read_unpack(csr, ">f", magic_byte_))
+    return Float(_read_unpack(csr, _FLOAT_STRUCT, magic_byte_))
 
 
 def write_float(csr: Cursor, value: float, magic_byte: bool = True):
     magic_byte_ = _FLOAT_MAGIC_BYTE if magic_byte else None
-    _write_pack(csr, value, ">f", magic_byte_)
+    _write_pack(csr, value, _FLOAT_STRUCT, magic_byte_)
 
 
 def read_double(csr: Cursor, magic_byte: bool = True) -> float:
     from .basics import Double
 
     magic_byte_ = _DOUBLE_MAGIC_BYTE if magic_byte else None
-    return Double(_read_unpack(csr, ">d", magic_byte_))
+    return Double(_read_unpack(csr, _DOUBLE_STRUCT, magic_byte_))
 
 
 def write_double(csr: Cursor, value: float, magic_byte: bool = True):
     magic_byte_ = _DOUBLE_MAGIC_BYTE if magic_byte else None
-    _write_pack(csr, value, ">d", magic_byte_)
+    _write_pack(csr, value, _DOUBLE_STRUCT, magic_byte_)
 
 
 def read_utf8str(csr: Cursor, magic_byte: bool = True) -> str:
@@ -172,8 +187,8 @@ def read_utf8str(csr: Cursor, magic_byte: bool = True) -> str:
 
     # NOTE even if the is_empty byte is false, the actual str
     #   length can still be 0
-    read_len = struct.unpack_from(">H", csr.read(struct.calcsize(">H")))[0]
-    return Utf8Str(csr.read(read_len).decode("utf-8"))
+    read_len = csr.unpack(_STRLEN_STRUCT)[0]
+    return Utf8Str(csr.decode(read_len))
 
 
 def write_utf8str(csr: Cursor, value: None | str, magic_byte: bool = True):
@@ -184,31 +199,22 @@ def write_utf8str(csr: Cursor, value: None | str, magic_byte: bool = True):
     csr.write(int(is_str_null))
     if not is_str_null:
         encoded = value.encode("utf-8")
-        csr.write(struct.pack(">H", len(encoded)))
+        csr.write(_STRLEN_STRUCT.pack(len(encoded)))
         csr.write(encoded)
 
 
 def peek_basic_type(csr) -> None | type:
-    from .basics import Bool
-    from .basics import Byte
-    from .basics import Char
-    from .basics import Short
-    from .basics import Int
-    from .basics import Long
-    from .basics import Float
-    from .basics import Double
-    from .basics import Utf8Str
+    return _BASIC_TYPE_TABLE[csr.peek()]
 
-    b = csr.peek()
 
-    for t in [Bool, Byte, Char, Short, Int, Long, Float, Double, Utf8Str]:
-        if b == t.magic_byte:
-            return t
-
-    return None
+def read_basic(csr: Cursor) -> None | typing.Any:
+    # a basic value of whatever type its magic byte says it is
+    reader = _BASIC_READER_TABLE[csr.peek()]
+    return None if reader is None else reader(csr)
 
 
 class Basic(metaclass=abc.ABCMeta):
+    __slots__ = ()
     builtin: type[int | float | str] = NotImplemented  # type: ignore
     magic_byte: int = NotImplemented
 
@@ -228,25 +234,28 @@ class Basic(metaclass=abc.ABCMeta):
 
     @classmethod
     def _read_unpack(
-        cls, cursor: Cursor, fmt: str, magic_byte: None | int = None
+        cls,
+        cursor: Cursor,
+        fmt: struct.Struct,
+        magic_byte: None | int = None,
     ) -> int | float | str | bytes:
         if magic_byte is not None and not cursor.eat(magic_byte):
             raise UnexpectedBytesError(
                 cursor.tell(), magic_byte, cursor.peek()
             )
-        return struct.unpack_from(fmt, cursor.read(struct.calcsize(fmt)))[0]
+        return cursor.unpack(fmt)[0]
 
     @classmethod
     def _write_pack(
         cls,
         cursor: Cursor,
         o: int | float | str,
-        fmt: str,
+        fmt: struct.Struct,
         magic_byte: None | int = None,
     ):
         if magic_byte is not None:
             cursor.write(magic_byte)
-        cursor.write(struct.pack(fmt, o))
+        cursor.write(fmt.pack(o))
 
     @abc.abstractmethod
     def __bytes__(self) -> bytes:
@@ -255,8 +264,10 @@ class Basic(metaclass=abc.ABCMeta):
 
 class Byte(ByteBase, Basic):
     # signed byte
+    __slots__ = ()
     builtin: type[int | float | str] = int
-    size: int = struct.calcsize(">b")
+    size: int = _BYTE_STRUCT.size
+    _STRUCT: typing.Final[struct.Struct] = _BYTE_STRUCT
     magic_byte: int = 0x07
 
     @typing.override
@@ -281,22 +292,24 @@ class Byte(ByteBase, Basic):
         _schema: None | typing.Any | list[typing.Any] = None,
     ) -> typing.Self:
         magic_byte_ = cls.magic_byte if magic_byte else None
-        return cls(cls._read_unpack(cursor, ">b", magic_byte_))
+        return cls(cls._read_unpack(cursor, _BYTE_STRUCT, magic_byte_))
 
     @typing.override
     def _write(self, cursor: Cursor, magic_byte: bool = True):
         magic_byte_ = self.magic_byte if magic_byte else None
-        self._write_pack(cursor, self, ">b", magic_byte_)
+        self._write_pack(cursor, self, _BYTE_STRUCT, magic_byte_)
 
     @typing.override
     def __bytes__(self) -> bytes:
-        return struct.pack(">b", self)
+        return _BYTE_STRUCT.pack(self)
 
 
 class Char(CharBase, Basic):
     # unsigned (?) char
+    __slots__ = ()
     builtin: type[int | float | str] = int
-    size: int = struct.calcsize(">B")
+    size: int = _CHAR_STRUCT.size
+    _STRUCT: typing.Final[struct.Struct] = _CHAR_STRUCT
     magic_byte: int = 0x09
 
     @typing.override
@@ -321,22 +334,24 @@ class Char(CharBase, Basic):
         _schema: None | typing.Any | list[typing.Any] = None,
     ) -> typing.Self:
         magic_byte_ = cls.magic_byte if magic_byte else None
-        return cls(cls._read_unpack(cursor, ">B", magic_byte_))
+        return cls(cls._read_unpack(cursor, _CHAR_STRUCT, magic_byte_))
 
     @typing.override
     def _write(self, cursor: Cursor, magic_byte: bool = True):
         magic_byte_ = self.magic_byte if magic_byte else None
-        self._write_pack(cursor, self, ">B", magic_byte_)
+        self._write_pack(cursor, self, _CHAR_STRUCT, magic_byte_)
 
     @typing.override
     def __bytes__(self) -> bytes:
-        return struct.pack(">B", self)
+        return _CHAR_STRUCT.pack(self)
 
 
 class Bool(BoolBase, Basic):
     # 1-byte bool 0=false, 1=true
+    __slots__ = ()
     builtin: type[int | float | str] = int
-    size: int = struct.calcsize(">?")
+    size: int = _BOOL_STRUCT.size
+    _STRUCT: typing.Final[struct.Struct] = _BOOL_STRUCT
     magic_byte: int = 0x00
 
     @typing.override
@@ -361,16 +376,16 @@ class Bool(BoolBase, Basic):
         _schema: None | typing.Any | list[typing.Any] = None,
     ) -> typing.Self:
         magic_byte_ = cls.magic_byte if magic_byte else None
-        return cls(cls._read_unpack(cursor, ">?", magic_byte_))
+        return cls(cls._read_unpack(cursor, _BOOL_STRUCT, magic_byte_))
 
     @typing.override
     def _write(self, cursor: Cursor, magic_byte: bool = True):
         magic_byte_ = self.magic_byte if magic_byte else None
-        self._write_pack(cursor, int(self), ">?", magic_byte_)
+        self._write_pack(cursor, int(self), _BOOL_STRUCT, magic_byte_)
 
     @typing.override
     def __bytes__(self) -> bytes:
-        return struct.pack(">?", self)
+        return _BOOL_STRUCT.pack(self)
 
     def __json__(self) -> bool:
         return self != 0
@@ -378,8 +393,10 @@ class Bool(BoolBase, Basic):
 
 class Short(ShortBase, Basic):
     # 2 byte signed integer
+    __slots__ = ()
     builtin: type[int | float | str] = int
-    size: int = struct.calcsize(">h")
+    size: int = _SHORT_STRUCT.size
+    _STRUCT: typing.Final[struct.Struct] = _SHORT_STRUCT
     magic_byte: int = 0x05
 
     @typing.override
@@ -404,22 +421,24 @@ class Short(ShortBase, Basic):
         _schema: None | typing.Any | list[typing.Any] = None,
     ) -> typing.Self:
         magic_byte_ = cls.magic_byte if magic_byte else None
-        return cls(cls._read_unpack(cursor, ">h", magic_byte_))
+        return cls(cls._read_unpack(cursor, _SHORT_STRUCT, magic_byte_))
 
     @typing.override
     def _write(self, cursor: Cursor, magic_byte: bool = True):
         magic_byte_ = self.magic_byte if magic_byte else None
-        self._write_pack(cursor, self, ">h", magic_byte_)
+        self._write_pack(cursor, self, _SHORT_STRUCT, magic_byte_)
 
     @typing.override
     def __bytes__(self) -> bytes:
-        return struct.pack(">h", self)
+        return _SHORT_STRUCT.pack(self)
 
 
 class Int(IntBase, Basic):
     # 4-byte signed integer
+    __slots__ = ()
     builtin: type[int | float | str] = int
-    size: int = struct.calcsize(">l")
+    size: int = _INT_STRUCT.size
+    _STRUCT: typing.Final[struct.Struct] = _INT_STRUCT
     magic_byte: int = 0x01
 
     @typing.override
@@ -444,22 +463,24 @@ class Int(IntBase, Basic):
         _schema: None | typing.Any | list[typing.Any] = None,
     ) -> typing.Self:
         magic_byte_ = cls.magic_byte if magic_byte else None
-        return cls(cls._read_unpack(cursor, ">l", magic_byte_))
+        return cls(cls._read_unpack(cursor, _INT_STRUCT, magic_byte_))
 
     @typing.override
     def _write(self, cursor: Cursor, magic_byte: bool = True):
         magic_byte_ = self.magic_byte if magic_byte else None
-        self._write_pack(cursor, self, ">l", magic_byte_)
+        self._write_pack(cursor, self, _INT_STRUCT, magic_byte_)
 
     @typing.override
     def __bytes__(self) -> bytes:
-        return struct.pack(">l", self)
+        return _INT_STRUCT.pack(self)
 
 
 class Long(LongBase, Basic):
     # 8-byte signed integer
+    __slots__ = ()
     builtin: type[int | float | str] = int
-    size: int = struct.calcsize(">q")
+    size: int = _LONG_STRUCT.size
+    _STRUCT: typing.Final[struct.Struct] = _LONG_STRUCT
     magic_byte: int = 0x02
 
     @typing.override
@@ -484,22 +505,24 @@ class Long(LongBase, Basic):
         _schema: None | typing.Any | list[typing.Any] = None,
     ) -> typing.Self:
         magic_byte_ = cls.magic_byte if magic_byte else None
-        return cls(cls._read_unpack(cursor, ">q", magic_byte_))
+        return cls(cls._read_unpack(cursor, _LONG_STRUCT, magic_byte_))
 
     @typing.override
     def _write(self, cursor: Cursor, magic_byte: bool = True):
         magic_byte_ = self.magic_byte if magic_byte else None
-        self._write_pack(cursor, self, ">q", magic_byte_)
+        self._write_pack(cursor, self, _LONG_STRUCT, magic_byte_)
 
     @typing.override
     def __bytes__(self) -> bytes:
-        return struct.pack(">q", self)
+        return _LONG_STRUCT.pack(self)
 
 
 class Float(FloatBase, Basic):
     # 4-byte float
+    __slots__ = ()
     builtin: type[int | float | str] = float
-    size: int = struct.calcsize(">f")
+    size: int = _FLOAT_STRUCT.size
+    _STRUCT: typing.Final[struct.Struct] = _FLOAT_STRUCT
     magic_byte: int = 0x06
 
     @typing.override
@@ -524,22 +547,24 @@ class Float(FloatBase, Basic):
         _schema: None | typing.Any | list[typing.Any] = None,
     ) -> typing.Self:
         magic_byte_ = cls.magic_byte if magic_byte else None
-        return cls(cls._read_unpack(cursor, ">f", magic_byte_))
+        return cls(cls._read_unpack(cursor, _FLOAT_STRUCT, magic_byte_))
 
     @typing.override
     def _write(self, cursor: Cursor, magic_byte: bool = True):
         magic_byte_ = self.magic_byte if magic_byte else None
-        self._write_pack(cursor, self, ">f", magic_byte_)
+        self._write_pack(cursor, self, _FLOAT_STRUCT, magic_byte_)
 
     @typing.override
     def __bytes__(self) -> bytes:
-        return struct.pack(">f", self)
+        return _FLOAT_STRUCT.pack(self)
 
 
 class Double(DoubleBase, Basic):
     # 8-byte float
+    __slots__ = ()
     builtin: type[int | float | str] = float
-    size: int = struct.calcsize(">d")
+    size: int = _DOUBLE_STRUCT.size
+    _STRUCT: typing.Final[struct.Struct] = _DOUBLE_STRUCT
     magic_byte: int = 0x04
 
     @typing.override
@@ -564,22 +589,23 @@ class Double(DoubleBase, Basic):
         _schema: None | typing.Any | list[typing.Any] = None,
     ) -> typing.Self:
         magic_byte_ = cls.magic_byte if magic_byte else None
-        return cls(cls._read_unpack(cursor, ">d", magic_byte_))
+        return cls(cls._read_unpack(cursor, _DOUBLE_STRUCT, magic_byte_))
 
     @typing.override
     def _write(self, cursor: Cursor, magic_byte: bool = True):
         magic_byte_ = self.magic_byte if magic_byte else None
-        self._write_pack(cursor, self, ">d", magic_byte_)
+        self._write_pack(cursor, self, _DOUBLE_STRUCT, magic_byte_)
 
     @typing.override
     def __bytes__(self) -> bytes:
-        return struct.pack(">d", self)
+        return _DOUBLE_STRUCT.pack(self)
 
 
 class Utf8Str(Utf8StrBase, Basic):
     # 1-byte bool true if str is empty
     # then 2-byte str length (may be 0)
     # then UTF-8 str bytes of aforementioned length (empty if bool is True)
+    __slots__ = ("_prefer_null",)
     builtin: type[int | float | str] = str
     magic_byte: int = 0x03
 
@@ -601,13 +627,20 @@ class Utf8Str(Utf8StrBase, Basic):
                 if isinstance(e, cls):
                     prefer_null = e.prefer_null
                     break
-        o.prefer_null = prefer_null if prefer_null is not None else True
+        o._prefer_null = prefer_null if prefer_null is not None else True
         return o
 
     @typing.override
     def __init__(self, *args, **kwargs):
         super().__init__()
-        self.prefer_null: bool
+        self._prefer_null: bool
+
+    @property
+    def prefer_null(self) -> bool:
+        # read-only like the str itself, as a decoded container wouldn't
+        # know its bytes went stale. write back a copy made with
+        # Utf8Str(o, prefer_null=...) instead
+        return self._prefer_null
 
     @classmethod
     @typing.override
@@ -629,10 +662,8 @@ class Utf8Str(Utf8StrBase, Basic):
             return cls(value, prefer_null=prefer_null)
 
         # NOTE actual str length can still be 0
-        string_len = struct.unpack_from(
-            ">H", cursor.read(struct.calcsize(">H"))
-        )[0]
-        value = cursor.read(string_len).decode("utf-8")
+        string_len = cursor.unpack(_STRLEN_STRUCT)[0]
+        value = cursor.decode(string_len)
 
         if string_len <= 0:
             prefer_null = False
@@ -651,7 +682,7 @@ class Utf8Str(Utf8StrBase, Basic):
 
         if self or not self.prefer_null:
             encoded = self.encode("utf-8")
-            cursor.write(struct.pack(">H", len(encoded)))
+            cursor.write(_STRLEN_STRUCT.pack(len(encoded)))
             cursor.write(encoded)
 
     @typing.override
@@ -696,3 +727,33 @@ ALL_BASIC_TYPES: typing.Final[tuple[type, ...]] = (
     Double,
     Utf8Str,
 )
+
+
+def _make_basic_reader(cls_: type) -> typing.Callable[[Cursor], Basic]:
+    if cls_ is Utf8Str:
+        return cls_._create
+
+    fmt = cls_._STRUCT
+    # the magic byte was already matched by the table lookup, and the
+    # basics' own __new__ only resolves schema defaults
+    make = cls_.builtin.__new__
+
+    def read(csr: Cursor) -> Basic:
+        csr.skip(1)
+        return make(cls_, csr.unpack(fmt)[0])
+
+    return read
+
+
+# indexed by type byte, for values whose type isn't known until the
+# byte is seen (e.g. DynamicMap values)
+_BASIC_TYPE_TABLE: typing.Final[tuple[None | type, ...]] = tuple(
+    next((t for t in ALL_BASIC_TYPES if t.magic_byte == b), None)
+    for b in range(256)
+)
+
+_BASIC_READER_TABLE: typing.Final[
+    tuple[None | typing.Callable[[Cursor], Basic], ...]
+] = tuple(
+    None if t is None else _make_basic_reader(t) for t in _BASIC_TYPE_TABLE
+)
@@ -1,16 +1,153 @@
 from __future__ import annotations
 import abc
 import collections.abc
+import contextlib
+import contextvars
 import copy
+import itertools
 import typing
-import weakref
 
 K = typing.TypeVar("K", bound=int | float | str)
 T = typing.TypeVar("T", bound=typing.Any)
 _VOID = object()
 
+# most containers never get a postulate, so they share these empty
+# placeholders until they do instead of each holding its own. they are
+# swapped out before anything is added, so are never written to, and
+# swapped back in once the last postulate is promoted or removed
+_NO_POSTULATES: typing.Final[dict] = {}
+_NO_KEY_TO_POSTULATE: typing.Final[dict] = {}
+_NO_POSTULATE_TO_KEY: typing.Final[dict] = {}
+
+
+class _Batch:
+    # the edits made under one container's batch(). pending containers are
+    # keyed by id() since containers aren't hashable, each along with
+    # whether it was edited itself or only had a descendant edited
+    __slots__ = ("root", "pending", "serial")
+
+    def __init__(self, root: typing.Any):
+        self.root: typing.Any = root
+        self.pending: dict[int, tuple[typing.Any, bool]] = {}
+        # tells apart each set of open batches, see _find_batch()
+        self.serial: int = next(_serials)
+
+    def defer(self, o: typing.Any, modified: bool):
+        if modified or id(o) not in self.pending:
+            self.pending[id(o)] = (o, modified)
+
+    def is_modified(self, o: typing.Any) -> bool:
+        entry = self.pending.get(id(o))
+        return entry is not None and entry[0] is o and entry[1]
+
+    def flush(self):
+        # one at a time, as telling a parent can make it pending in turn
+        while self.pending:
+            _, (o, modified) = self.pending.popitem()
+            if modified:
+                o._modified = True
+            if o._parent is not None:
+                o._parent._on_observed(o)
+
+
+_serials: typing.Final[typing.Iterator[int]] = itertools.count()
+
+# the batches open in the current thread or task keyed by the id() of
+# their root, outermost first. replaced rather than changed in place, so
+# that copies of the context don't see each other's batches
+_batches: contextvars.ContextVar[dict[int, _Batch]] = contextvars.ContextVar(
+    "_batches", default={}
+)
+
+
+def _find_batch(o: typing.Any) -> None | _Batch:
+    # the innermost open batch whose root is o or one of its ancestors.
+    # the answer is kept on o and on every ancestor walked to find it for
+    # as long as the same batches are open, so that only the first edit
+    # to a container under them walks up
+    batches = _batches.get()
+    if not batches:
+        return None
+
+    # the set of open batches is the one the newest of them was opened
+    # into, so its serial is enough to tell whether a cached answer holds
+    serial = next(reversed(batches.values())).serial
+    walked = []
+    batch = None
+    node = o
+    while node is not None:
+        cached = node._batch
+        if cached is not None and cached[0] == serial:
+            batch = cached[1]
+            break
+        walked.append(node)
+        batch = batches.get(id(node))
+        if batch is not None and batch.root is node:
+            break
+        batch = None
+        node = node._parent
+
+    cached = (serial, batch)
+    for node in walked:
+        node._batch = cached
+    return batch
+
+
+def _is_deferred(o: typing.Any) -> bool:
+    # edited inside a batch that hasn't exited yet
+    return any(e.is_modified(o) for e in _batches.get().values())
+
+
+def _flush_batches():
+    # brings the source bytes of every container touched by an open batch
+    # up to date without closing the batch, e.g. before encoding
+    for batch in reversed(_batches.get().values()):
+        batch.flush()
+
+
+def _release(
+    parent: typing.Any,
+    removed: typing.Iterable[typing.Any],
+    remaining: typing.Iterable[typing.Any],
+):
+    # children taken out of parent stop reporting changes to it, unless
+    # they are still in it at another index or under another key. this
+    # also stops them keeping parent (and its source bytes) alive
+    children = [
+        e
+        for e in removed
+        if isinstance(e, _Observable)
+        and getattr(e, "_parent", None) is parent
+    ]
+    if children:
+        kept = {id(e) for e in remaining}
+        for e in children:
+            if id(e) not in kept:
+                e._remove_observer(parent)
+
+
+@contextlib.contextmanager
+def _batched(root: typing.Any) -> typing.Iterator[None]:
+    batches = _batches.get()
+    if id(root) in batches:
+        # nested inside a batch on the same container, which already
+        # holds everything back until the outermost one exits
+        yield
+        return
+
+    batch = _Batch(root)
+    token = _batches.set(batches | {id(root): batch})
+    try:
+        yield
+    finally:
+        # flushed even on error, as the edits themselves were made
+        _batches.reset(token)
+        batch.flush()
+
 
 class _Observable(metaclass=abc.ABCMeta):
+    __slots__ = ()
+
     @abc.abstractmethod
     def _add_observer(self, receiver: typing.Any):
         raise NotImplementedError("Must be implemented by subclass.")
@@ -25,6 +162,7 @@ class _Observable(metaclass=abc.ABCMeta):
 
 
 class ByteBase(int):
+    __slots__ = ()
     _builtin: typing.Final[type] = int
 
     @typing.override
@@ -199,6 +337,7 @@ class ByteBase(int):
 
 
 class CharBase(int):
+    __slots__ = ()
     _builtin: typing.Final[type] = int
 
     @typing.override
@@ -373,6 +512,7 @@ class CharBase(int):
 
 
 class BoolBase(int):
+    __slots__ = ()
     _builtin: typing.Final[type] = int
 
     @typing.override
@@ -546,6 +686,7 @@ class BoolBase(int):
 
 
 class ShortBase(int):
+    __slots__ = ()
     _builtin: typing.Final[type] = int
 
     @typing.override
@@ -716,6 +857,7 @@ class ShortBase(int):
 
 
 class IntBase(int):
+    __slots__ = ()
     _builtin: typing.Final[type] = int
 
     @typing.override
@@ -886,6 +1028,7 @@ class IntBase(int):
 
 
 class LongBase(int):
+    __slots__ = ()
     _builtin: typing.Final[type] = int
 
     @typing.override
@@ -1056,6 +1199,7 @@ class LongBase(int):
 
 
 class FloatBase(float):
+    __slots__ = ()
     _builtin: typing.Final[type] = float
 
     @typing.override
@@ -1167,6 +1311,7 @@ class FloatBase(float):
 
 
 class DoubleBase(float):
+    __slots__ = ()
     _builtin: typing.Final[type] = float
 
     @typing.override
@@ -1278,6 +1423,7 @@ class DoubleBase(float):
 
 
 class Utf8StrBase(str):
+    __slots__ = ()
     _builtin: typing.Final[type] = str
 
     @typing.override
@@ -1323,52 +1469,109 @@ class Utf8StrBase(str):
 
 
 class ListBase(list[T], _Observable, metaclass=abc.ABCMeta):
+    __slots__ = (
+        "_modified",
+        "_source",
+        "_parent",
+        "_batch",
+        "_postulates",
+        "__weakref__",
+    )
+
     def __init__(self, *args, **kwargs):
         self._modified: bool = False
-        self._parents: list[weakref.ReferenceType[_Observable]] = []
-        self._postulates: list[typing.Any] = []
+        self._source: None | memoryview = None
+        # the container this is a postulate of or was decoded as part of,
+        # and so the only one that needs to hear about changes to it. set
+        # on attach and cleared once taken out of that container
+        self._parent: None | _Observable = None
+        # the serial of the open batches and the one of them this is
+        # under, see _find_batch()
+        self._batch: None | tuple[int, None | _Batch] = None
+        # keyed by id() so that a postulate is found without comparing
+        # it against every other one. holding the postulate keeps its id
+        # from being reused
+        self._postulates: dict[int, typing.Any] = _NO_POSTULATES
         super().__init__(map(self._transform, list(*args, **kwargs)))
 
     @property
     def is_modified(self) -> bool:
-        return self._modified
+        return self._modified or _is_deferred(self)
+
+    def batch(self) -> contextlib.AbstractContextManager[None]:
+        # defers the upward bookkeeping of every edit made to this
+        # container or its descendants inside the block (promoting
+        # postulates, telling ancestors their source bytes are stale) to
+        # when the block exits. only affects the current thread or task
+        return _batched(self)
+
+    def __getstate__(self) -> typing.Any:
+        # a copy isn't linked to the original's parent, so it would never
+        # hear about changes that make the original bytes stale. nor is it
+        # the parent of the original's postulates, which are keyed by id.
+        # dropping the parent also keeps a copy of a child from copying
+        # every one of its ancestors along with it
+        # slotted, so the default state is a (dict state, slot values) pair
+        state, slots = typing.cast(
+            tuple[typing.Any, dict[str, typing.Any]], super().__getstate__()
+        )
+        return state, slots | {
+            "_source": None,
+            "_parent": None,
+            "_batch": None,
+            "_postulates": _NO_POSTULATES,
+        }
 
     def _is_allowed(self, value: typing.Any) -> bool:
         return True
 
+    def _adopt(self, values: typing.Iterable[T]):
+        # trusted bulk initialization for values that were decoded against
+        # the schema and so are already the exact element class. nothing
+        # is validated, transformed or notified, so only use this on a
+        # container that is still being created
+        super().extend(values)
+
     def _transform(self, value: typing.Any) -> T:
         return value
 
     def _add_postulate(self, child: typing.Any):
-        if any(e is child for e in self._postulates) or any(
-            e is child for e in self
-        ):
+        if id(child) in self._postulates:
             return
-        self._postulates.append(child)
+        if self._postulates is _NO_POSTULATES:
+            self._postulates = {}
+        self._postulates[id(child)] = child
         if isinstance(child, _Observable):
             child._add_observer(self)
 
     @typing.override
     def _add_observer(self, receiver: typing.Any):
-        if not isinstance(receiver, _Observable) or any(
-            e() is receiver for e in self._parents
-        ):
-            return
-        self._parents.append(weakref.ref(receiver))
+        if isinstance(receiver, _Observable):
+            self._parent = receiver
+            # under whichever batch its new parent is under
+            self._batch = getattr(receiver, "_batch", None)
 
     @typing.override
     def _remove_observer(self, receiver: typing.Any):
-        self._parents[:] = [e for e in self._parents if e() is not receiver]
-
-    def _notify_observers(self):
-        while self._parents:
-            ref = self._parents.pop()
-            if ref is None:
-                continue
-            parent = ref()
-            if parent is None or not isinstance(parent, _Observable):
-                continue
-            parent._on_observed(self)
+        if self._parent is receiver:
+            self._parent = None
+            self._batch = None
+
+    def _notify_observers(self, modified: bool = False):
+        # the bytes this was decoded from no longer match its contents
+        self._source = None
+        batch = _find_batch(self)
+        if batch is not None:
+            # flagged and passed up once per container when the batch exits
+            batch.defer(self, modified)
+            return
+        if modified:
+            self._modified = True
+        # the link stays, as a container is only ever detached by being
+        # taken out of its parent. once the parent's own bytes are stale
+        # it stops passing the change on, so later edits end there
+        if self._parent is not None:
+            self._parent._on_observed(self)
 
     @typing.override
     def _on_observed(self, sender: typing.Any):
@@ -1377,15 +1580,13 @@ class ListBase(list[T], _Observable, metaclass=abc.ABCMeta):
             + "(should have been screened out before this point)"
         )
 
-        found = False
-        for i, e in reversed(list(enumerate(self._postulates))):
-            if e is sender:
-                self._postulates.pop(i)
-                found = True
-
-        if found:
+        if self._postulates.pop(id(sender), None) is sender:
+            if not self._postulates:
+                self._postulates = _NO_POSTULATES  # type: ignore
             super().append(sender)
-            self._modified = True
+            self._notify_observers(modified=True)
+        elif self._source is not None:
+            # a descendant changed, so pass it on to the ancestors
             self._notify_observers()
 
     @typing.overload
@@ -1428,6 +1629,7 @@ class ListBase(list[T], _Observable, metaclass=abc.ABCMeta):
                         f'The value "{e}" is invalid for this container.'
                     )
 
+            removed = super().__getitem__(i)
             super().__setitem__(i, list(self._transform(e) for e in o))
         else:
             if not self._is_allowed(o):
@@ -1435,10 +1637,11 @@ class ListBase(list[T], _Observable, metaclass=abc.ABCMeta):
                     f'The value "{o}" is invalid for this container.'
                 )
 
+            removed = (super().__getitem__(i),)
             super().__setitem__(i, self._transform(o))
 
-        self._modified = True
-        self._notify_observers()
+        _release(self, removed, self)
+        self._notify_observers(modified=True)
 
     @typing.override
     def __add__(  # type: ignore
@@ -1471,8 +1674,7 @@ class ListBase(list[T], _Observable, metaclass=abc.ABCMeta):
                 )
 
         result = super().__iadd__(self._transform(e) for e in other)
-        self._modified = True
-        self._notify_observers()
+        self._notify_observers(modified=True)
 
         return result
 
@@ -1484,8 +1686,7 @@ class ListBase(list[T], _Observable, metaclass=abc.ABCMeta):
             )
 
         super().append(self._transform(o))
-        self._modified = True
-        self._notify_observers()
+        self._notify_observers(modified=True)
 
     @typing.override
     def insert(self, i: typing.SupportsIndex, o: int | float | str | T):
@@ -1495,8 +1696,7 @@ class ListBase(list[T], _Observable, metaclass=abc.ABCMeta):
             )
 
         super().insert(i, self._transform(o))
-        self._modified = True
-        self._notify_observers()
+        self._notify_observers(modified=True)
 
     @typing.override
     def copy(self) -> typing.Self:
@@ -1512,8 +1712,32 @@ class ListBase(list[T], _Observable, metaclass=abc.ABCMeta):
                 )
 
         super().extend(self._transform(e) for e in other)
-        self._modified = True
-        self._notify_observers()
+        self._notify_observers(modified=True)
+
+    @typing.override
+    def __imul__(self, other: typing.SupportsIndex) -> typing.Self:
+        removed = list(self) if other.__index__() <= 0 else ()
+        result = super().__imul__(other)
+        _release(self, removed, self)
+        self._notify_observers(modified=True)
+        return result
+
+    @typing.override
+    def __delitem__(self, i: typing.SupportsIndex | slice):
+        removed = super().__getitem__(i)
+        super().__delitem__(i)
+        _release(self, removed if isinstance(i, slice) else (removed,), self)
+        self._notify_observers(modified=True)
+
+    @typing.override
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._notify_observers(modified=True)
+
+    @typing.override
+    def reverse(self):
+        super().reverse()
+        self._notify_observers(modified=True)
 
     @typing.override
     def count(self, o: bool | int | float | str | bytes | T) -> int:
@@ -1522,50 +1746,93 @@ class ListBase(list[T], _Observable, metaclass=abc.ABCMeta):
     @typing.override
     def pop(self, idx: typing.SupportsIndex = -1) -> T:
         result = super().pop(idx)
-        self._modified = True
-        self._notify_observers()
+        _release(self, (result,), self)
+        self._notify_observers(modified=True)
         return result
 
     @typing.override
     def remove(self, value: T):
-        while True:
-            try:
-                super().remove(value)
-                self._modified = True
-                self._notify_observers()
-                break
-            except ValueError:
-                pass
-
-            try:
-                self._postulates.remove(value)
-                self._modified = True
-                self._notify_observers()
-                break
-            except ValueError:
-                pass
-
-            raise ValueError(f'Value "{value}" not in container.')
+        try:
+            # by index, so that the element removed is the one released
+            i = super().index(value)
+        except ValueError:
+            if self._postulates.pop(id(value), None) is not value:
+                raise ValueError(f'Value "{value}" not in container.')
+            if not self._postulates:
+                self._postulates = _NO_POSTULATES  # type: ignore
+            _release(self, (value,), ())
+        else:
+            _release(self, (super().pop(i),), self)
+
+        self._notify_observers(modified=True)
 
     @typing.override
     def clear(self):
+        removed = [*self, *self._postulates.values()]
         super().clear()
-        self._postulates.clear()
-        self._modified = True
-        self._notify_observers()
+        self._postulates = _NO_POSTULATES  # type: ignore
+        _release(self, removed, ())
+        self._notify_observers(modified=True)
 
 
 class DictBase(dict[K, T], _Observable):
+    __slots__ = (
+        "_modified",
+        "_source",
+        "_key_to_postulate",
+        "_postulate_to_key",
+        "_parent",
+        "_batch",
+        "__weakref__",
+    )
+
     def __init__(self, *args, **kwargs):
         self._modified: bool = False
-        self._key_to_postulate: dict[K, T] = {}
-        self._parents: list[weakref.ReferenceType[_Observable]] = []
+        self._source: None | memoryview = None
+        self._key_to_postulate: dict[K, T]
+        self._key_to_postulate = _NO_KEY_TO_POSTULATE  # type: ignore
+        # the reverse, keyed by id(), see ListBase._postulates
+        self._postulate_to_key: dict[int, K] = _NO_POSTULATE_TO_KEY
+        # the container this is a postulate of or was decoded as part of,
+        # and so the only one that needs to hear about changes to it. set
+        # on attach and cleared once taken out of that container
+        self._parent: None | _Observable = None
+        # the serial of the open batches and the one of them this is
+        # under, see _find_batch()
+        self._batch: None | tuple[int, None | _Batch] = None
         init = self._transform_for_write(dict(*args, **kwargs))
         super().__init__(init)
 
     @property
     def is_modified(self) -> bool:
-        return self._modified
+        return self._modified or _is_deferred(self)
+
+    def batch(self) -> contextlib.AbstractContextManager[None]:
+        # defers the upward bookkeeping of every edit made to this
+        # container or its descendants inside the block (promoting
+        # postulates, telling ancestors their source bytes are stale) to
+        # when the block exits. only affects the current thread or task
+        return _batched(self)
+
+    def __getstate__(self) -> typing.Any:
+        # a copy isn't linked to the original's parents, so it would never
+        # hear about changes that make the original bytes stale
+        # see ListBase.__getstate__
+        # slotted, so the default state is a (dict state, slot values) pair
+        state, slots = typing.cast(
+            tuple[typing.Any, dict[str, typing.Any]], super().__getstate__()
+        )
+        return state, slots | {
+            "_source": None,
+            "_parent": None,
+            "_batch": None,
+            "_key_to_postulate": _NO_KEY_TO_POSTULATE,
+            "_postulate_to_key": _NO_POSTULATE_TO_KEY,
+        }
+
+    def _adopt(self, values: typing.Mapping[K, T]):
+        # trusted bulk initialization, see ListBase._adopt
+        super().update(values)
 
     def _is_key_readable(self, key: typing.Any) -> bool:
         return True
@@ -1589,63 +1856,81 @@ class DictBase(dict[K, T], _Observable):
         return None
 
     def _add_postulate(self, key: typing.Any, child: typing.Any):
-        assert key not in self.keys(), (
+        assert not super().__contains__(key), (
             f"Cannot create postulate for key-value ({key}, {child}) "
             + "that already exists (should have been screened out "
             + "before this point)"
         )
+        if self._key_to_postulate is _NO_KEY_TO_POSTULATE:
+            self._key_to_postulate = {}
+            self._postulate_to_key = {}
         self._key_to_postulate[key] = child
+        self._postulate_to_key[id(child)] = key
         if isinstance(child, _Observable):
             child._add_observer(self)
 
     @typing.override
     def _add_observer(self, receiver: typing.Any):
-        if not isinstance(receiver, _Observable) or any(
-            e() is receiver for e in self._parents
-        ):
-            return
-        self._parents.append(weakref.ref(receiver))
+        if isinstance(receiver, _Observable):
+            self._parent = receiver
+            # under whichever batch its new parent is under
+            self._batch = getattr(receiver, "_batch", None)
 
     @typing.override
     def _remove_observer(self, receiver: typing.Any):
-        self._parents[:] = [e for e in self._parents if e() is not receiver]
-
-    def _notify_observers(self):
-        while self._parents:
-            ref = self._parents.pop()
-            if ref is None:
-                continue
-            parent = ref()
-            if parent is None or not isinstance(parent, _Observable):
-                continue
-            parent._on_observed(self)
+        if self._parent is receiver:
+            self._parent = None
+            self._batch = None
+
+    def _notify_observers(self, modified: bool = False):
+        # the bytes this was decoded from no longer match its contents
+        self._source = None
+        batch = _find_batch(self)
+        if batch is not None:
+            # flagged and passed up once per container when the batch exits
+            batch.defer(self, modified)
+            return
+        if modified:
+            self._modified = True
+        # the link stays, as a container is only ever detached by being
+        # taken out of its parent. once the parent's own bytes are stale
+        # it stops passing the change on, so later edits end there
+        if self._parent is not None:
+            self._parent._on_observed(self)
 
     @typing.override
     def _on_observed(self, sender: typing.Any):
-        found = False
-        for k, v in list(self._key_to_postulate.items()):
-            if v is not sender:
-                continue
-            self._key_to_postulate.pop(k)
-            if k in self.keys():
-                continue
-            assert self._is_key_readable(k), (
-                f'Key "{k}" is not readable '
-                + "(should have been screened out before this point)."
-            )
-            assert self._is_key_writable(k), (
-                f'Key "{k}" is not writable '
-                + "(should have been screened out before this point)."
-            )
-            assert self._is_value_writable(sender, k), (
-                f"Key-value pair ({k}, {sender}) is not writable "
-                + "(should have been screened out before this point)."
-            )
-            super().__setitem__(k, sender)
-            found = True
+        k = self._postulate_to_key.pop(id(sender), _VOID)
+        if k is not _VOID:
+            key = typing.cast(K, k)
+            self._key_to_postulate.pop(key, None)
+            if not self._postulate_to_key:
+                self._key_to_postulate = _NO_KEY_TO_POSTULATE  # type: ignore
+                self._postulate_to_key = _NO_POSTULATE_TO_KEY
+
+            # unless an explicit write already took its place
+            if not super().__contains__(key):
+                assert self._is_key_readable(key), (
+                    f'Key "{key}" is not readable '
+                    + "(should have been screened out before this point)."
+                )
+                assert self._is_key_writable(key), (
+                    f'Key "{key}" is not writable '
+                    + "(should have been screened out before this point)."
+                )
+                assert self._is_value_writable(sender, key), (
+                    f"Key-value pair ({key}, {sender}) is not writable "
+                    + "(should have been screened out before this point)."
+                )
+                super().__setitem__(key, sender)
+                self._notify_observers(modified=True)
+            else:
+                # superseded, so nothing here changed and it's not a child
+                sender._remove_observer(self)
+            return
 
-        if found:
-            self._modified = True
+        if self._source is not None:
+            # a descendant changed, so pass it on to the ancestors
             self._notify_observers()
 
     @typing.override
@@ -1688,8 +1973,7 @@ class DictBase(dict[K, T], _Observable):
         default_ = self._transform_value(default, key)
         key_ = self._transform_key(key)
         result = super().setdefault(key_, default_)
-        self._modified = True
-        self._notify_observers()
+        self._notify_observers(modified=True)
 
         return result
 
@@ -1726,10 +2010,11 @@ class DictBase(dict[K, T], _Observable):
         **kwargs: T,
     ):
         other = self._transform_for_write(dict(*args, **kwargs))
+        removed = [dict.get(self, k, _VOID) for k in other]
         super().update(other)
+        _release(self, removed, super().values())
         if other:
-            self._modified = True
-            self._notify_observers()
+            self._notify_observers(modified=True)
 
     @typing.override
     def __eq__(self, o: typing.Any) -> bool:
@@ -1753,10 +2038,10 @@ class DictBase(dict[K, T], _Observable):
 
         key_ = self._transform_key(key)
         is_contained = super().__contains__(key_)
-        super().__delitem__(key_)  # type: ignore
+        removed = super().pop(key_)  # type: ignore
+        _release(self, (removed,), super().values())
         if is_contained:
-            self._modified = True
-            self._notify_observers()
+            self._notify_observers(modified=True)
 
     @typing.override
     def __getitem__(self, key: K) -> T:
@@ -1799,9 +2084,10 @@ class DictBase(dict[K, T], _Observable):
 
         item_ = self._transform_value(item, key)
         key_ = self._transform_key(key)
+        removed = super().get(key_, _VOID)
         super().__setitem__(key_, item_)  # type: ignore
-        self._modified = True
-        self._notify_observers()
+        _release(self, (removed,), super().values())
+        self._notify_observers(modified=True)
 
     @typing.override
     def get(self, key: K, default: None | T = None) -> T:  # type: ignore
@@ -1837,8 +2123,8 @@ class DictBase(dict[K, T], _Observable):
             )
 
         result = super().pop(key_)
-        self._modified = True
-        self._notify_observers()
+        _release(self, (result,), super().values())
+        self._notify_observers(modified=True)
 
         return result
 
@@ -1852,8 +2138,8 @@ class DictBase(dict[K, T], _Observable):
             if self._is_key_deletable(k):
                 # no need for transform b/c already in dict
                 super().__delitem__(k)
-                self._modified = True
-                self._notify_observers()
+                _release(self, (v,), super().values())
+                self._notify_observers(modified=True)
                 return (k, v)
 
         # same exception as plain dict
@@ -1862,10 +2148,12 @@ class DictBase(dict[K, T], _Observable):
     @typing.override
     def clear(self, children: bool = True):
         is_modified = False
+        removed = list(self._key_to_postulate.values())
 
-        for k, _ in reversed(list(self.items())):
+        for k, v in reversed(list(self.items())):
             if self._is_key_deletable(k):
                 super().__delitem__(k)
+                removed.append(v)
                 is_modified = True
 
         if children:
@@ -1875,11 +2163,13 @@ class DictBase(dict[K, T], _Observable):
 
         if self._key_to_postulate:
             is_modified = True
-            self._key_to_postulate.clear()
+            self._key_to_postulate = _NO_KEY_TO_POSTULATE  # type: ignore
+            self._postulate_to_key = _NO_POSTULATE_TO_KEY
+
+        _release(self, removed, super().values())
 
         if is_modified:
-            self._modified = True
-            self._notify_observers()
+            self._notify_observers(modified=True)
 
     @typing.override
     def copy(self) -> typing.Self:
@@ -1901,6 +2191,5 @@ class DictBase(dict[K, T], _Observable):
         o = filter(lambda e: e[0] not in self, o.items())
         if o:
             super().update(o)
-            self._modified = True
-            self._notify_observers()
+            self._notify_observers(modified=True)
         return self
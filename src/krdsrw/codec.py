@@ -0,0 +1,1639 @@
+from __future__ import annotations
+
+import array
+import collections.abc
+import functools
+import inspect
+import struct
+import sys
+import typing
+
+from .basics import Bool
+from .basics import Byte
+from .basics import Char
+from .basics import Double
+from .basics import Float
+from .basics import Int
+from .basics import Long
+from .basics import Short
+from .basics import Utf8Str
+from .basics import _BASIC_TYPE_TABLE
+from .basics import peek_basic_type
+from .basics import read_long
+from .basics import read_utf8str
+from .basics import write_int
+from .basics import write_long
+from .basics import write_utf8str
+from .builtins import DictBase
+from .builtins import ListBase
+from .builtins import _Observable
+from .builtins import _batches
+from .builtins import _flush_batches
+from .constants import OBJECT_BEGIN
+from .constants import OBJECT_END
+from .cursor import Cursor
+from .cursor import ReadCursor
+from .cursor import WriteCursor
+from .error import UnexpectedBytesError
+from .error import UnexpectedStructureError
+from .objects import LPR
+from .objects import Array
+from .objects import DateTime
+from .objects import DynamicMap
+from .objects import Field
+from .objects import Index
+from .objects import IntMap
+from .objects import Mapping
+from .objects import ObjectMap
+from .objects import PartialStore
+from .objects import Position
+from .objects import Protoform
+from .objects import Record
+from .objects import Store
+from .objects import TimeZoneOffset
+from .objects import _freeze_mapping
+from .objects import _store_key_to_field
+from .objects import _type_bytes
+
+# The Protoform/Field schema tree is walked once per schema node and
+# turned into a tree of closures. Each closure knows its node's field
+# order, type bytes and sub-decoders up front, so decoding doesn't have
+# to normalize the mapping or dispatch through _read_object
+# for every value it reads. Encoders are built the same way, with the
+# constant parts of each node (object framing, IntMap indices) encoded
+# ahead of time.
+
+Decoder: typing.TypeAlias = typing.Callable[[Cursor], typing.Any]
+Encoder: typing.TypeAlias = typing.Callable[[Cursor, typing.Any], None]
+
+_FIXED_WIDTH_BASICS: typing.Final[tuple[type, ...]] = (
+    Bool,
+    Byte,
+    Char,
+    Short,
+    Int,
+    Long,
+    Float,
+    Double,
+)
+
+
+def _read_count(csr: Cursor) -> int:
+    if not csr.eat(Int.magic_byte):
+        raise UnexpectedBytesError(csr.tell(), Int.magic_byte, csr.peek())
+    return csr.unpack(Int._STRUCT)[0]
+
+
+def _encode_schema_id(schema_id: str) -> bytes:
+    csr = WriteCursor()
+    write_utf8str(csr, schema_id, False)
+    return csr.dump()
+
+
+def _encode_int(value: int) -> bytes:
+    csr = WriteCursor()
+    write_int(csr, value)
+    return csr.dump()
+
+
+def _populate_dict(result: typing.Any, values: dict) -> typing.Any:
+    # values came out of a compiled decoder and so already have the exact
+    # classes the schema asks for. adopt them as-is instead of running
+    # each through __setitem__, which would re-validate and copy them
+    result._adopt(values)
+    return result
+
+
+def _populate_list(result: typing.Any, values: list) -> typing.Any:
+    result._adopt(values)
+    return result
+
+
+def _raise_bad_schema_id(csr: Cursor, schema_id: str) -> typing.NoReturn:
+    # only reached once the fast prefix comparison has already failed,
+    # so the cost of working out what went wrong doesn't matter here
+    if not csr.eat(OBJECT_BEGIN):
+        raise UnexpectedBytesError(csr.tell(), OBJECT_BEGIN, csr.peek())
+
+    schema_id_actual = read_utf8str(csr, False)
+    if not schema_id_actual:
+        raise UnexpectedStructureError("Object has blank schema.")
+    raise UnexpectedStructureError(
+        f'Expected object schema "{schema_id}"'
+        + f' but got "{schema_id_actual}".'
+    )
+
+
+def _compile_framed(decoder: Decoder, schema_id: str) -> Decoder:
+    prefix = bytes((OBJECT_BEGIN,)) + _encode_schema_id(schema_id)
+
+    def decode(csr: Cursor) -> typing.Any:
+        if not csr.eat(prefix):
+            _raise_bad_schema_id(csr, schema_id)
+        value = decoder(csr)
+        if not csr.eat(OBJECT_END):
+            raise UnexpectedBytesError(csr.tell(), OBJECT_END, csr.peek())
+        return value
+
+    return decode
+
+
+def _compile_fixed_width(cls_: type) -> Decoder:
+    magic_byte = cls_.magic_byte
+    fmt = cls_._STRUCT
+
+    def decode(csr: Cursor) -> typing.Any:
+        if not csr.eat(magic_byte):
+            raise UnexpectedBytesError(csr.tell(), magic_byte, csr.peek())
+        return cls_(csr.unpack(fmt)[0])
+
+    return decode
+
+
+def _array_typecode(cls_: type) -> str:
+    # the array module typecode that has the same size as the basic
+    codes = {
+        Byte: "b",
+        Char: "B",
+        Short: "h",
+        Int: "hil",
+        Long: "lq",
+        Float: "f",
+        Double: "d",
+    }[cls_]
+    return next(c for c in codes if array.array(c).itemsize == cls_.size)
+
+
+# Bool is left out because array has no bool typecode
+_ARRAY_TYPECODES: typing.Final[dict[type, str]] = {
+    cls_: _array_typecode(cls_)
+    for cls_ in (Byte, Char, Short, Int, Long, Float, Double)
+}
+
+
+def _as_typed_array(code: str, values: typing.Any) -> array.array:
+    if isinstance(values, array.array) and values.typecode == code:
+        return values
+    if hasattr(values, "__array__"):
+        # NumPy. converted in one go rather than element by element
+        import numpy  # type: ignore
+
+        return array.array(code, numpy.asarray(values, dtype=code).tobytes())
+    return array.array(code, values)
+
+
+def read_fixed_width_values(
+    csr: Cursor,
+    cls_: type,
+    numpy: bool = False,
+) -> typing.Any:
+    # the body of an Array of a fixed-width basic. every element is its
+    # magic byte followed by the big-endian value, so the magic bytes are
+    # checked and the values pulled out with strided slices instead of
+    # being read one at a time. the result is an array.array, or a NumPy
+    # array sharing its memory
+    code = _ARRAY_TYPECODES[cls_]
+    magic_byte = cls_.magic_byte
+    size = cls_.size
+    stride = size + 1
+
+    count = _read_count(csr)
+    pos = csr.tell()
+    raw = csr.read(count * stride)
+    if len(raw) != count * stride:
+        raise UnexpectedBytesError(pos + len(raw), magic_byte, None)
+
+    magic_bytes = raw[::stride]
+    if magic_bytes != bytes((magic_byte,)) * count:
+        i = next(i for i, b in enumerate(magic_bytes) if b != magic_byte)
+        raise UnexpectedBytesError(
+            pos + i * stride, magic_byte, magic_bytes[i]
+        )
+
+    packed = bytearray(count * size)
+    for i in range(size):
+        packed[i::size] = raw[1 + i :: stride]
+    values = array.array(code, packed)
+    if size > 1 and sys.byteorder == "little":
+        values.byteswap()
+
+    if numpy:
+        import numpy as numpy_  # type: ignore
+
+        return numpy_.frombuffer(values, dtype=code)
+    return values
+
+
+def write_fixed_width_values(csr: Cursor, cls_: type, values: typing.Any):
+    # the inverse of read_fixed_width_values. takes anything that can be
+    # made into an array.array of the right type, including NumPy arrays
+    values = _as_typed_array(_ARRAY_TYPECODES[cls_], values)
+    size = cls_.size
+    stride = size + 1
+    count = len(values)
+
+    if size > 1 and sys.byteorder == "little":
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    packed = values.tobytes()
+
+    raw = bytearray(count * stride)
+    raw[::stride] = bytes((cls_.magic_byte,)) * count
+    for i in range(size):
+        raw[1 + i :: stride] = packed[i::size]
+
+    write_int(csr, count)
+    csr.write(raw)
+
+
+def _compile_record(cls_: type, schema: Mapping) -> Decoder:
+    # same defaults as Record._create, where only fields that are
+    # explicitly marked as required are an error when absent
+    mapping = _freeze_mapping(schema)
+
+    fields = tuple(
+        (
+            alias,
+            bool(field.required),
+            _type_bytes(
+                field.proto.cls_,
+                field.proto.schema,
+                field.schema_id,
+            ),
+            compile_decoder(
+                field.proto.cls_,
+                field.proto.schema,
+                field.schema_id,
+            ),
+        )
+        for alias, field in mapping.items()
+    )
+
+    def decode_unknown(csr: Cursor, decoder: Decoder) -> typing.Any:
+        csr.save()
+        try:
+            value = decoder(csr)
+            csr.unsave()
+            return value
+        except UnexpectedBytesError:
+            csr.restore()
+            return None
+
+    def decode(csr: Cursor) -> typing.Any:
+        values = {}
+        for alias, required, type_bytes, decoder in fields:
+            if type_bytes is None:
+                value = decode_unknown(csr, decoder)
+            elif csr.tell() < len(csr) and csr.peek() in type_bytes:
+                value = decoder(csr)
+            else:
+                value = None
+
+            if value is None:
+                if required:
+                    raise UnexpectedStructureError(
+                        f'Value for field "{alias}" but was not found',
+                        pos=csr.tell(),
+                    )
+                break
+
+            values[alias] = value
+
+        return _populate_dict(
+            cls_(_schema=mapping, _defaults=False), values
+        )
+
+    return decode
+
+
+def _compile_int_map(cls_: type, schema: Mapping) -> Decoder:
+    mapping = _freeze_mapping(schema, False)
+
+    idx_to_entry = {
+        idx: (
+            alias,
+            compile_decoder(
+                field.proto.cls_,
+                field.proto.schema,
+                field.schema_id,
+            ),
+        )
+        for idx, (alias, field) in enumerate(mapping.items())
+    }
+
+    def decode(csr: Cursor) -> typing.Any:
+        values = {}
+        for _ in range(_read_count(csr)):
+            idxnum = _read_count(csr)
+            entry = idx_to_entry.get(idxnum)
+            if entry is None:
+                raise UnexpectedStructureError(
+                    f"Object index number {idxnum} not recognized"
+                )
+            alias, decoder = entry
+            values[alias] = decoder(csr)
+
+        return _populate_dict(cls_(_schema=mapping), values)
+
+    return decode
+
+
+def decode_positions(strings: typing.Iterable[str]) -> list[Position]:
+    # encoded position strings to positions, in one pass. repeated
+    # strings are parsed once thanks to Position._parse's memo
+    # noinspection PyProtectedMember
+    return [Position._from_str(str(s)) for s in strings]
+
+
+def encode_positions(positions: typing.Iterable[typing.Any]) -> list[str]:
+    # positions (or mappings that can become one) to encoded strings
+    return [
+        str(e if isinstance(e, Position) else Position(e)) for e in positions
+    ]
+
+
+def _compile_position_array(cls_: type, schema: Index) -> Decoder:
+    def decode(csr: Cursor) -> typing.Any:
+        count = _read_count(csr)
+        values = decode_positions(read_utf8str(csr) for _ in range(count))
+        return _populate_list(cls_(_schema=schema), values)
+
+    return decode
+
+
+def _compile_fixed_width_array(cls_: type, schema: Index) -> Decoder:
+    elmt_cls = schema.proto.cls_
+    # the basics' own __new__ only resolves schema defaults, so go
+    # straight to the builtin's and skip that per element
+    make = functools.partial(elmt_cls.builtin.__new__, elmt_cls)
+
+    def decode(csr: Cursor) -> typing.Any:
+        values = read_fixed_width_values(csr, elmt_cls)
+        values = list(map(make, values))
+        return _populate_list(cls_(_schema=schema), values)
+
+    return decode
+
+
+def _compile_array(cls_: type, schema: Index) -> Decoder:
+    if schema.proto.cls_ is Position and not schema.schema_id:
+        return _compile_position_array(cls_, schema)
+    if schema.proto.cls_ in _ARRAY_TYPECODES and not schema.schema_id:
+        return _compile_fixed_width_array(cls_, schema)
+
+    elmt_decoder = compile_decoder(
+        schema.proto.cls_,
+        schema.proto.schema,
+        schema.schema_id or None,
+    )
+
+    def decode(csr: Cursor) -> typing.Any:
+        values = [elmt_decoder(csr) for _ in range(_read_count(csr))]
+        return _populate_list(cls_(_schema=schema), values)
+
+    return decode
+
+
+def _read_object_map_header(csr: Cursor) -> int:
+    signature = ObjectMap._MAGIC_STR
+    if not csr.eat(signature):
+        raise UnexpectedBytesError(
+            csr.tell(),
+            signature,
+            csr.peek(len(signature)),
+        )
+
+    pos = csr.tell()
+    value = read_long(csr)
+    if value != ObjectMap._FIXED_MYSTERY_NUM:
+        raise UnexpectedBytesError(
+            pos,
+            Long(ObjectMap._FIXED_MYSTERY_NUM).to_bytes(),
+            Long(value).to_bytes(),
+        )
+
+    return _read_count(csr)
+
+
+def _entry_field(mapping: Mapping, schema_id: str) -> None | Field:
+    # same as _freeze_mapping but for just the one entry, so that mappings
+    # that were never normalized don't have to be up front
+    field = mapping.get(schema_id)
+    if field is None or field is NotImplemented:
+        return None
+    if inspect.isclass(field):
+        return Field(Protoform(field))
+    return field
+
+
+def _make_entry_decoders(
+    mapping: Mapping,
+) -> typing.Callable[[str], None | Decoder]:
+    # entries are compiled the first time they're seen. most files only
+    # hold a handful of the schema's entries
+    @functools.cache
+    def entry_decoder(schema_id: str) -> None | Decoder:
+        field = _entry_field(mapping, schema_id)
+        if field is None:
+            return None
+        return compile_decoder(field.proto.cls_, field.proto.schema)
+
+    return entry_decoder
+
+
+def _decode_entry(
+    csr: Cursor,
+    entry_decoder: typing.Callable[[str], None | Decoder],
+) -> tuple[str, typing.Any]:
+    if not csr.eat(OBJECT_BEGIN):
+        raise UnexpectedStructureError("Failed to read schema for object.")
+    schema_id = read_utf8str(csr, False)
+
+    decoder = entry_decoder(schema_id)
+    if decoder is None:
+        raise UnexpectedStructureError(
+            f'Object schema "{schema_id}" not recognized',
+            pos=csr.tell(),
+        )
+    value = decoder(csr)
+
+    if not csr.eat(OBJECT_END):
+        raise UnexpectedBytesError(csr.tell(), OBJECT_END, csr.peek())
+
+    return schema_id, value
+
+
+def _compile_object_map(
+    entry_decoder: typing.Callable[[str], None | Decoder],
+    make: typing.Callable[[], ObjectMap],
+) -> Decoder:
+    def decode(csr: Cursor) -> typing.Any:
+        values = {}
+        for _ in range(_read_object_map_header(csr)):
+            schema_id, value = _decode_entry(csr, entry_decoder)
+            values[schema_id] = value
+        return _populate_dict(make(), values)
+
+    return decode
+
+
+def _link_children(o: typing.Any):
+    # so that a change anywhere below also drops the ancestors' sources
+    children = dict.values(o) if isinstance(o, dict) else o
+    for e in children:
+        if isinstance(e, _Observable):
+            e._add_observer(o)
+
+
+def _compile_tracked(decoder: Decoder) -> Decoder:
+    # remember the bytes each container was decoded from, so that an
+    # unmodified container can be written back by copying them
+    def decode(csr: Cursor) -> typing.Any:
+        start = csr.tell()
+        value = decoder(csr)
+        source = csr.view(start, csr.tell())
+        if source is not None:
+            _link_children(value)
+            value._source = source
+        return value
+
+    return decode
+
+
+def compile_decoder(
+    cls_: type,
+    schema: typing.Any | None = None,
+    schema_id: None | str = None,
+) -> Decoder:
+    # classes are matched exactly (not by issubclass) so that a subclass
+    # that overrides _create still gets its own _create called
+    if cls_ in _FIXED_WIDTH_BASICS:
+        decoder = _compile_fixed_width(cls_)
+    elif cls_ is Record:
+        decoder = _compile_record(cls_, typing.cast(Mapping, schema))
+    elif cls_ is IntMap:
+        decoder = _compile_int_map(cls_, typing.cast(Mapping, schema))
+    elif cls_ is Array:
+        decoder = _compile_array(cls_, typing.cast(Index, schema))
+    elif cls_ is ObjectMap:
+        mapping = typing.cast(Mapping, schema)
+        decoder = _compile_object_map(
+            _make_entry_decoders(mapping),
+            lambda: ObjectMap(_schema=mapping),
+        )
+    elif issubclass(cls_, Store):
+        # Store._create delegates here, so this covers its subclasses too
+        decoder = _compile_object_map(_store_entry_decoder, cls_)
+    else:
+        # noinspection PyProtectedMember
+        decoder = functools.partial(cls_._create, _schema=schema)
+
+    if issubclass(cls_, (ListBase, DictBase)):
+        decoder = _compile_tracked(decoder)
+
+    if schema_id:
+        decoder = _compile_framed(decoder, schema_id)
+
+    return decoder
+
+
+@functools.cache
+def decoder_for(cls_: type) -> Decoder:
+    # compiled once per class for classes whose schema is fixed (i.e.
+    # Store), since compiling walks the whole schema tree
+    return compile_decoder(cls_)
+
+
+def _encode_by_value(csr: Cursor, o: typing.Any):
+    # noinspection PyProtectedMember
+    o._write(csr)
+
+
+def _compile_encode_framed(encoder: Encoder, schema_id: str) -> Encoder:
+    prefix = bytes((OBJECT_BEGIN,)) + _encode_schema_id(schema_id)
+    suffix = bytes((OBJECT_END,))
+
+    def encode(csr: Cursor, o: typing.Any):
+        csr.write(prefix)
+        encoder(csr, o)
+        csr.write(suffix)
+
+    return encode
+
+
+def _compile_encode_fixed_width(cls_: type) -> Encoder:
+    # magic byte and value packed together so each value is one write
+    fmt = struct.Struct(">B" + cls_._STRUCT.format.lstrip("<>!=@"))
+    magic_byte = cls_.magic_byte
+
+    def encode(csr: Cursor, o: typing.Any):
+        csr.write(fmt.pack(magic_byte, o))
+
+    return encode
+
+
+_UTF8STR_NULL: typing.Final[bytes] = bytes((Utf8Str.magic_byte, 1))
+_UTF8STR_PREFIX: typing.Final[bytes] = bytes((Utf8Str.magic_byte, 0))
+_STRLEN_STRUCT: typing.Final[struct.Struct] = struct.Struct(">H")
+
+
+def _encode_str(csr: Cursor, s: str):
+    encoded = s.encode("utf-8")
+    csr.write(_UTF8STR_PREFIX + _STRLEN_STRUCT.pack(len(encoded)) + encoded)
+
+
+def _encode_utf8str(csr: Cursor, o: typing.Any):
+    if not o and o.prefer_null:
+        csr.write(_UTF8STR_NULL)
+    else:
+        _encode_str(csr, o)
+
+
+def _encode_position(csr: Cursor, o: typing.Any):
+    # the encoded string is memoized on the position
+    _encode_str(csr, str(o))
+
+
+def _compile_encode_record(schema: Mapping) -> Encoder:
+    mapping = _freeze_mapping(schema)
+
+    fields = tuple(
+        (
+            alias,
+            compile_encoder(
+                field.proto.cls_,
+                field.proto.schema,
+                field.schema_id,
+            ),
+        )
+        for alias, field in mapping.items()
+    )
+
+    def encode(csr: Cursor, o: typing.Any):
+        # fields are written in schema order up to the first one missing,
+        # same as Record._write. keys were validated when they were set,
+        # so look them up without going through the checked accessors
+        for alias, encoder in fields:
+            value = dict.get(o, alias)
+            if value is None:
+                break
+            encoder(csr, value)
+
+    return encode
+
+
+def _compile_encode_int_map(schema: Mapping) -> Encoder:
+    mapping = _freeze_mapping(schema, False)
+
+    alias_to_entry = {
+        alias: (
+            _encode_int(idx),
+            compile_encoder(
+                field.proto.cls_,
+                field.proto.schema,
+                field.schema_id,
+            ),
+        )
+        for idx, (alias, field) in enumerate(mapping.items())
+    }
+
+    def encode(csr: Cursor, o: typing.Any):
+        write_int(csr, len(o))
+        for alias, value in o.items():
+            prefix, encoder = alias_to_entry[alias]
+            csr.write(prefix)
+            encoder(csr, value)
+
+    return encode
+
+
+def _encode_position_array(csr: Cursor, o: typing.Any):
+    write_int(csr, len(o))
+    for s in encode_positions(o):
+        _encode_str(csr, s)
+
+
+def _compile_encode_fixed_width_array(elmt_cls: type) -> Encoder:
+    def encode(csr: Cursor, o: typing.Any):
+        write_fixed_width_values(csr, elmt_cls, o)
+
+    return encode
+
+
+def _compile_encode_array(schema: Index) -> Encoder:
+    if schema.proto.cls_ is Position and not schema.schema_id:
+        return _encode_position_array
+    if schema.proto.cls_ in _ARRAY_TYPECODES and not schema.schema_id:
+        return _compile_encode_fixed_width_array(schema.proto.cls_)
+
+    elmt_encoder = compile_encoder(
+        schema.proto.cls_,
+        schema.proto.schema,
+        schema.schema_id or None,
+    )
+
+    def encode(csr: Cursor, o: typing.Any):
+        write_int(csr, len(o))
+        for e in o:
+            elmt_encoder(csr, e)
+
+    return encode
+
+
+def _compile_encode_dynamic_map() -> Encoder:
+    def encode(csr: Cursor, o: typing.Any):
+        write_int(csr, len(o))
+        for key, value in o.items():
+            write_utf8str(csr, key)
+            # noinspection PyProtectedMember
+            value._write(csr)
+
+    return encode
+
+
+def _write_object_map_header(csr: Cursor, count: int):
+    csr.write(_OBJECT_MAP_HEADER)
+    write_int(csr, count)
+
+
+def _make_entry_encoders(
+    mapping: Mapping,
+) -> typing.Callable[[str], tuple[bytes, Encoder]]:
+    @functools.cache
+    def entry_encoder(schema_id: str) -> tuple[bytes, Encoder]:
+        field = _entry_field(mapping, schema_id)
+        if field is None:
+            raise KeyError(f'No template for key "{schema_id}".')
+        return (
+            bytes((OBJECT_BEGIN,)) + _encode_schema_id(schema_id),
+            compile_encoder(field.proto.cls_, field.proto.schema),
+        )
+
+    return entry_encoder
+
+
+def _encode_entry(
+    csr: Cursor,
+    schema_id: str,
+    value: typing.Any,
+    entry_encoder: typing.Callable[[str], tuple[bytes, Encoder]],
+):
+    prefix, encoder = entry_encoder(schema_id)
+    csr.write(prefix)
+    encoder(csr, value)
+    csr.write(OBJECT_END)
+
+
+def _compile_encode_object_map(
+    entry_encoder: typing.Callable[[str], tuple[bytes, Encoder]],
+) -> Encoder:
+    def encode(csr: Cursor, o: typing.Any):
+        _write_object_map_header(csr, len(o))
+        for schema_id, value in o.items():
+            _encode_entry(csr, schema_id, value, entry_encoder)
+
+    return encode
+
+
+def _compile_encode_passthrough(encoder: Encoder) -> Encoder:
+    def encode(csr: Cursor, o: typing.Any):
+        # noinspection PyProtectedMember
+        source = o._source
+        if source is not None and _batches.get():
+            # edits held back by a batch haven't yet made it stale
+            _flush_batches()
+            source = o._source
+        if source is not None:
+            csr.write(source)
+        else:
+            encoder(csr, o)
+
+    return encode
+
+
+def compile_encoder(
+    cls_: type,
+    schema: typing.Any | None = None,
+    schema_id: None | str = None,
+) -> Encoder:
+    if cls_ in _FIXED_WIDTH_BASICS:
+        encoder = _compile_encode_fixed_width(cls_)
+    elif cls_ is Utf8Str:
+        encoder = _encode_utf8str
+    elif cls_ is Position:
+        encoder = _encode_position
+    elif cls_ is Record:
+        encoder = _compile_encode_record(typing.cast(Mapping, schema))
+    elif cls_ is IntMap:
+        encoder = _compile_encode_int_map(typing.cast(Mapping, schema))
+    elif cls_ is Array:
+        encoder = _compile_encode_array(typing.cast(Index, schema))
+    elif cls_ is DynamicMap:
+        encoder = _compile_encode_dynamic_map()
+    elif cls_ is ObjectMap:
+        encoder = _compile_encode_object_map(
+            _make_entry_encoders(typing.cast(Mapping, schema))
+        )
+    elif issubclass(cls_, Store):
+        encoder = _compile_encode_object_map(_store_entry_encoder)
+    else:
+        encoder = _encode_by_value
+
+    if issubclass(cls_, (ListBase, DictBase)):
+        encoder = _compile_encode_passthrough(encoder)
+
+    if schema_id:
+        encoder = _compile_encode_framed(encoder, schema_id)
+
+    return encoder
+
+
+@functools.cache
+def encoder_for(cls_: type) -> Encoder:
+    return compile_encoder(cls_)
+
+
+def _make_object_map_header() -> bytes:
+    csr = WriteCursor()
+    csr.write(ObjectMap._MAGIC_STR)
+    write_long(csr, ObjectMap._FIXED_MYSTERY_NUM)
+    return csr.dump()
+
+
+_OBJECT_MAP_HEADER: typing.Final[bytes] = _make_object_map_header()
+
+# shared by every Store so that each entry is compiled at most once
+_store_entry_decoder = _make_entry_decoders(_store_key_to_field)
+_store_entry_encoder = _make_entry_encoders(_store_key_to_field)
+
+
+def is_store_entry(schema_id: str) -> bool:
+    return _store_entry_decoder(schema_id) is not None
+
+
+def decode_store_entry(frame: typing.ByteString) -> tuple[str, typing.Any]:
+    csr = ReadCursor(frame)
+    return _decode_entry(csr, _store_entry_decoder)
+
+
+def encode_store_entry(csr: Cursor, schema_id: str, value: typing.Any):
+    _encode_entry(csr, schema_id, value, _store_entry_encoder)
+
+
+def write_store_header(csr: Cursor, count: int):
+    _write_object_map_header(csr, count)
+
+
+def encode_store_header(count: int) -> bytes:
+    # always the same length, whatever the count
+    csr = WriteCursor()
+    _write_object_map_header(csr, count)
+    return csr.dump()
+
+
+# Every value in the format carries its own type byte, and nested objects
+# are bracketed by OBJECT_BEGIN/OBJECT_END, so an object can be stepped
+# over token by token without knowing its schema.
+
+_TOKEN_SIZES: typing.Final[dict[int, int]] = {
+    cls_.magic_byte: cls_._STRUCT.size for cls_ in _FIXED_WIDTH_BASICS
+}
+_BASIC_TYPE_BYTES: typing.Final[tuple[int, ...]] = (
+    *_TOKEN_SIZES,
+    Utf8Str.magic_byte,
+)
+_TOKEN_TYPE_BYTES: typing.Final[tuple[int, ...]] = (
+    *_BASIC_TYPE_BYTES,
+    OBJECT_BEGIN,
+    OBJECT_END,
+)
+
+
+def _skip_utf8str(csr: Cursor):
+    # everything after the magic byte
+    if csr.read() == 0:
+        csr.skip(csr.unpack(_STRLEN_STRUCT)[0])
+
+
+def _skip_token(csr: Cursor) -> int:
+    pos = csr.tell()
+    if pos >= len(csr):
+        raise UnexpectedBytesError(pos, list(_TOKEN_TYPE_BYTES))
+
+    type_byte = csr.read()
+    size = _TOKEN_SIZES.get(type_byte)
+    if size is not None:
+        csr.skip(size)
+    elif type_byte == Utf8Str.magic_byte or type_byte == OBJECT_BEGIN:
+        _skip_utf8str(csr)
+    elif type_byte != OBJECT_END:
+        raise UnexpectedBytesError(pos, list(_TOKEN_TYPE_BYTES), type_byte)
+    return type_byte
+
+
+def _skip_basic(csr: Cursor):
+    pos = csr.tell()
+    if _skip_token(csr) in (OBJECT_BEGIN, OBJECT_END):
+        csr.seek(pos)
+        raise UnexpectedBytesError(pos, list(_BASIC_TYPE_BYTES), csr.peek())
+
+
+def skip_object(csr: Cursor):
+    # skips the remainder of an object whose OBJECT_BEGIN and schema id
+    # have already been read, up to and including its OBJECT_END
+    depth = 1
+    while depth > 0:
+        type_byte = _skip_token(csr)
+        if type_byte == OBJECT_BEGIN:
+            depth += 1
+        elif type_byte == OBJECT_END:
+            depth -= 1
+
+
+def scan_object_map(csr: Cursor) -> list[tuple[str, int, int]]:
+    # (schema id, offset, length) of each entry's frame, where the frame
+    # runs from its OBJECT_BEGIN through its OBJECT_END
+    result = []
+    for _ in range(_read_object_map_header(csr)):
+        pos = csr.tell()
+        if not csr.eat(OBJECT_BEGIN):
+            raise UnexpectedBytesError(pos, OBJECT_BEGIN, csr.peek())
+        schema_id = str(read_utf8str(csr, False))
+        skip_object(csr)
+        result.append((schema_id, pos, csr.tell() - pos))
+    return result
+
+
+# Skippers step over a value without decoding it. Unlike skip_object
+# they need the schema, since containers that aren't wrapped in
+# OBJECT_BEGIN/OBJECT_END don't say where they end.
+
+Skipper: typing.TypeAlias = typing.Callable[[Cursor], None]
+
+
+def _is_field_present(
+    csr: Cursor,
+    type_bytes: None | frozenset[int],
+    probe: None | Decoder,
+) -> bool:
+    if type_bytes is not None:
+        return csr.tell() < len(csr) and csr.peek() in type_bytes
+
+    # no known leading byte, so see whether it decodes. same as
+    # Record._read_next
+    assert probe is not None, "a field without type bytes needs a probe"
+    csr.save()
+    try:
+        return probe(csr) is not None
+    except UnexpectedBytesError:
+        return False
+    finally:
+        csr.restore()
+
+
+def _record_fields(
+    schema: Mapping,
+) -> list[tuple[str, Field, None | frozenset[int], None | Decoder]]:
+    mapping = _freeze_mapping(schema)
+
+    result = []
+    for alias, field in mapping.items():
+        type_bytes = _type_bytes(
+            field.proto.cls_,
+            field.proto.schema,
+            field.schema_id,
+        )
+        probe = None
+        if type_bytes is None:
+            probe = compile_decoder(
+                field.proto.cls_,
+                field.proto.schema,
+                field.schema_id,
+            )
+        result.append((alias, field, type_bytes, probe))
+    return result
+
+
+def _skip_lpr(csr: Cursor):
+    # newer versions are prefixed with a version byte and followed by
+    # a timestamp. see LPR._create
+    for _ in range(3 if peek_basic_type(csr) is Byte else 1):
+        _skip_basic(csr)
+
+
+def _compile_skip_framed(schema_id: str) -> Skipper:
+    prefix = bytes((OBJECT_BEGIN,)) + _encode_schema_id(schema_id)
+
+    def skip(csr: Cursor):
+        if not csr.eat(prefix):
+            _raise_bad_schema_id(csr, schema_id)
+        skip_object(csr)
+
+    return skip
+
+
+def _compile_skip_record(schema: Mapping) -> Skipper:
+    fields = tuple(
+        (
+            alias,
+            bool(field.required),
+            type_bytes,
+            probe,
+            compile_skipper(
+                field.proto.cls_,
+                field.proto.schema,
+                field.schema_id,
+            ),
+        )
+        for alias, field, type_bytes, probe in _record_fields(schema)
+    )
+
+    def skip(csr: Cursor):
+        for alias, required, type_bytes, probe, skipper in fields:
+            if not _is_field_present(csr, type_bytes, probe):
+                if required:
+                    raise UnexpectedStructureError(
+                        f'Value for field "{alias}" but was not found',
+                        pos=csr.tell(),
+                    )
+                break
+            skipper(csr)
+
+    return skip
+
+
+def _compile_skip_int_map(schema: Mapping) -> Skipper:
+    mapping = _freeze_mapping(schema, False)
+
+    idx_to_skipper = {
+        idx: compile_skipper(
+            field.proto.cls_,
+            field.proto.schema,
+            field.schema_id,
+        )
+        for idx, field in enumerate(mapping.values())
+    }
+
+    def skip(csr: Cursor):
+        for _ in range(_read_count(csr)):
+            idxnum = _read_count(csr)
+            skipper = idx_to_skipper.get(idxnum)
+            if skipper is None:
+                raise UnexpectedStructureError(
+                    f"Object index number {idxnum} not recognized"
+                )
+            skipper(csr)
+
+    return skip
+
+
+def _compile_skip_array(schema: Index) -> Skipper:
+    elmt_skipper = compile_skipper(
+        schema.proto.cls_,
+        schema.proto.schema,
+        schema.schema_id or None,
+    )
+
+    def skip(csr: Cursor):
+        for _ in range(_read_count(csr)):
+            elmt_skipper(csr)
+
+    return skip
+
+
+def _skip_dynamic_map(csr: Cursor):
+    for _ in range(_read_count(csr)):
+        _skip_basic(csr)  # key
+        _skip_basic(csr)
+
+
+def _skip_object_map(csr: Cursor):
+    for _ in range(_read_object_map_header(csr)):
+        if not csr.eat(OBJECT_BEGIN):
+            raise UnexpectedStructureError(
+                "Failed to read schema for object."
+            )
+        _skip_utf8str(csr)
+        skip_object(csr)
+
+
+def compile_skipper(
+    cls_: type,
+    schema: typing.Any | None = None,
+    schema_id: None | str = None,
+) -> Skipper:
+    if schema_id:
+        # the framing says where it ends
+        return _compile_skip_framed(schema_id)
+
+    if cls_ in _FIXED_WIDTH_BASICS or cls_ in (
+        Utf8Str,
+        Position,
+        DateTime,
+        TimeZoneOffset,
+    ):
+        return _skip_basic
+    if cls_ is LPR:
+        return _skip_lpr
+    if cls_ is Record:
+        return _compile_skip_record(typing.cast(Mapping, schema))
+    if cls_ is IntMap:
+        return _compile_skip_int_map(typing.cast(Mapping, schema))
+    if cls_ is Array:
+        return _compile_skip_array(typing.cast(Index, schema))
+    if cls_ is DynamicMap:
+        return _skip_dynamic_map
+    if cls_ is ObjectMap or issubclass(cls_, Store):
+        return _skip_object_map
+
+    decoder = compile_decoder(cls_, schema)
+
+    def skip(csr: Cursor):
+        decoder(csr)
+
+    return skip
+
+
+# Selective decoders only materialize the keys named in a selection and
+# skip everything else. A selection is a tree of nested dicts, where a
+# None leaf means the whole subtree. e.g. the key paths ["lpr",
+# "annotation.cache.object/notes"] become
+#
+#   {"lpr": None, "annotation.cache.object": {"notes": None}}
+#
+# Keys under an array select within each of its elements, and array
+# indices can't be selected. The containers that were only partly
+# decoded are built with just the selected keys in their schema, so
+# that reading a skipped key raises KeyError instead of returning a
+# default as though it had been read. They don't keep their source
+# bytes either (see _compile_tracked), since writing those back would
+# bring back everything that was skipped.
+
+Selection: typing.TypeAlias = None | dict[str | int, "Selection"]
+
+
+def make_selection(
+    key_paths: typing.Iterable[typing.Sequence[str | int]],
+) -> Selection:
+    result = {}
+    for keys in key_paths:
+        node = result
+        for key in keys[:-1]:
+            child = node.setdefault(key, {})
+            if child is None:
+                break  # an ancestor is already selected in full
+            node = child
+        else:
+            node[keys[-1]] = None
+    return result
+
+
+def _check_selection(selection: dict, keys: typing.Iterable[str]):
+    unknown = set(selection) - set(keys)
+    if unknown:
+        raise KeyError(f'Key "{sorted(unknown)[0]}" not found.')
+
+
+def _selected_schema(mapping: Mapping, selection: dict) -> Mapping:
+    return _freeze_mapping(
+        {k: v for k, v in mapping.items() if k in selection}
+    )
+
+
+def _compile_select_record(schema: Mapping, selection: dict) -> Decoder:
+    record_fields = _record_fields(schema)
+    _check_selection(selection, (e[0] for e in record_fields))
+    selected = _selected_schema(_freeze_mapping(schema), selection)
+
+    fields = []
+    for alias, field, type_bytes, probe in record_fields:
+        if alias in selection:
+            read = compile_selective_decoder(
+                field.proto.cls_,
+                field.proto.schema,
+                selection[alias],
+                field.schema_id,
+            )
+        else:
+            read = compile_skipper(
+                field.proto.cls_,
+                field.proto.schema,
+                field.schema_id,
+            )
+        required = bool(field.required)
+        fields.append((alias, required, type_bytes, probe, read))
+
+    def decode(csr: Cursor) -> typing.Any:
+        values = {}
+        for alias, required, type_bytes, probe, read in fields:
+            if not _is_field_present(csr, type_bytes, probe):
+                if required:
+                    raise UnexpectedStructureError(
+                        f'Value for field "{alias}" but was not found',
+                        pos=csr.tell(),
+                    )
+                break
+
+            value = read(csr)
+            if alias in selection:
+                values[alias] = value
+
+        result = Record(_schema=selected, _defaults=False)
+        # unselected fields are left out rather than given defaults, which
+        # would look like real values that were read from the file
+        result._adopt(values, defaults=False)
+        return result
+
+    return decode
+
+
+def _compile_select_int_map(schema: Mapping, selection: dict) -> Decoder:
+    mapping = _freeze_mapping(schema, False)
+    _check_selection(selection, mapping)
+    selected = _selected_schema(mapping, selection)
+
+    idx_to_entry = {}
+    for idx, (alias, field) in enumerate(mapping.items()):
+        if alias in selection:
+            read = compile_selective_decoder(
+                field.proto.cls_,
+                field.proto.schema,
+                selection[alias],
+                field.schema_id,
+            )
+        else:
+            read = compile_skipper(
+                field.proto.cls_,
+                field.proto.schema,
+                field.schema_id,
+            )
+        idx_to_entry[idx] = (alias, read)
+
+    def decode(csr: Cursor) -> typing.Any:
+        values = {}
+        for _ in range(_read_count(csr)):
+            idxnum = _read_count(csr)
+            entry = idx_to_entry.get(idxnum)
+            if entry is None:
+                raise UnexpectedStructureError(
+                    f"Object index number {idxnum} not recognized"
+                )
+            alias, read = entry
+            value = read(csr)
+            if alias in selection:
+                values[alias] = value
+
+        result = IntMap(_schema=selected, _defaults=False)
+        result._adopt(values, defaults=False)
+        return result
+
+    return decode
+
+
+def _compile_select_array(schema: Index, selection: dict) -> Decoder:
+    indices = [e for e in selection if isinstance(e, int)]
+    if indices:
+        raise KeyError(
+            f"Cannot select index {indices[0]} of an array, only keys "
+            + "within each of its elements."
+        )
+
+    # keys select within each element
+    elmt_decoder = compile_selective_decoder(
+        schema.proto.cls_,
+        schema.proto.schema,
+        selection,
+        schema.schema_id or None,
+    )
+
+    def decode(csr: Cursor) -> typing.Any:
+        values = [elmt_decoder(csr) for _ in range(_read_count(csr))]
+        return _populate_list(Array(_schema=schema), values)
+
+    return decode
+
+
+def _compile_select_object_map(
+    mapping: Mapping,
+    selection: dict,
+    make: typing.Callable[[Mapping], ObjectMap],
+) -> Decoder:
+    key_to_decoder = {}
+    for schema_id, sub_selection in selection.items():
+        field = _entry_field(mapping, schema_id)
+        if field is None:
+            raise KeyError(f'Key "{schema_id}" not found.')
+        key_to_decoder[schema_id] = compile_selective_decoder(
+            field.proto.cls_,
+            field.proto.schema,
+            sub_selection,
+        )
+    selected = _selected_schema(mapping, selection)
+
+    def decode(csr: Cursor) -> typing.Any:
+        values = {}
+        for _ in range(_read_object_map_header(csr)):
+            if not csr.eat(OBJECT_BEGIN):
+                raise UnexpectedStructureError(
+                    "Failed to read schema for object."
+                )
+            schema_id = read_utf8str(csr, False)
+
+            decoder = key_to_decoder.get(schema_id)
+            if decoder is None:
+                # the framing says where it ends
+                skip_object(csr)
+                continue
+
+            values[schema_id] = decoder(csr)
+            if not csr.eat(OBJECT_END):
+                raise UnexpectedBytesError(
+                    csr.tell(), OBJECT_END, csr.peek()
+                )
+
+        return _populate_dict(make(selected), values)
+
+    return decode
+
+
+def compile_selective_decoder(
+    cls_: type,
+    schema: typing.Any | None = None,
+    selection: Selection = None,
+    schema_id: None | str = None,
+) -> Decoder:
+    if selection is None:
+        return compile_decoder(cls_, schema, schema_id)
+
+    if cls_ is Record:
+        decoder = _compile_select_record(
+            typing.cast(Mapping, schema), selection
+        )
+    elif cls_ is IntMap:
+        decoder = _compile_select_int_map(
+            typing.cast(Mapping, schema), selection
+        )
+    elif cls_ is Array:
+        decoder = _compile_select_array(typing.cast(Index, schema), selection)
+    elif cls_ is ObjectMap:
+        mapping = typing.cast(Mapping, schema)
+        decoder = _compile_select_object_map(
+            mapping,
+            selection,
+            lambda selected: ObjectMap(_schema=selected),
+        )
+    elif issubclass(cls_, Store):
+        # marked as partial, so that it can't be written back
+        decoder = _compile_select_object_map(
+            _store_key_to_field,
+            selection,
+            lambda selected: PartialStore(_schema=selected),
+        )
+    else:
+        # nothing to gain from decoding part of a small fixed object
+        decoder = compile_decoder(cls_, schema)
+
+    if schema_id:
+        decoder = _compile_framed(decoder, schema_id)
+
+    return decoder
+
+
+@functools.cache
+def selective_decoder_for(
+    cls_: type,
+    key_paths: tuple[tuple[str | int, ...], ...],
+) -> Decoder:
+    selection = make_selection(key_paths)
+    return compile_selective_decoder(cls_, selection=selection)
+
+
+# Native decoders follow the same schema but build plain dict, list,
+# bool, int, float and str trees, with none of the container machinery
+# (schemas, observers, postulates, source tracking). Positions become
+# dicts and DateTime/TimeZoneOffset become ints, same as their
+# __json__. Meant for read-only use, since nothing is validated if the
+# result is edited and there's no way to write it back.
+
+
+def _read_native_str(csr: Cursor) -> str:
+    if not csr.eat(Utf8Str.magic_byte):
+        raise UnexpectedBytesError(csr.tell(), Utf8Str.magic_byte, csr.peek())
+    if csr.read() > 0:  # true if empty string
+        return ""
+    return csr.decode(csr.unpack(_STRLEN_STRUCT)[0])
+
+
+def _compile_native_fixed_width(cls_: type) -> Decoder:
+    magic_byte = cls_.magic_byte
+    fmt = cls_._STRUCT
+
+    def decode(csr: Cursor) -> typing.Any:
+        if not csr.eat(magic_byte):
+            raise UnexpectedBytesError(csr.tell(), magic_byte, csr.peek())
+        return csr.unpack(fmt)[0]
+
+    return decode
+
+
+def _make_native_basic_reader(cls_: type) -> Decoder:
+    if cls_ is Utf8Str:
+        return _read_native_str
+
+    fmt = cls_._STRUCT
+
+    def read(csr: Cursor) -> typing.Any:
+        csr.skip(1)  # already matched by the table lookup
+        return csr.unpack(fmt)[0]
+
+    return read
+
+
+_NATIVE_BASIC_READER_TABLE: typing.Final[tuple[None | Decoder, ...]] = tuple(
+    None if t is None else _make_native_basic_reader(t)
+    for t in _BASIC_TYPE_TABLE
+)
+
+
+def _read_native_basic(csr: Cursor) -> typing.Any:
+    reader = _NATIVE_BASIC_READER_TABLE[csr.peek()]
+    if reader is None:
+        raise UnexpectedBytesError(
+            csr.tell(), list(_BASIC_TYPE_BYTES), csr.peek()
+        )
+    return reader(csr)
+
+
+def _native_position(s: str) -> dict:
+    # same keys as iterating the Position
+    char_pos, chunk_eid, chunk_pos = Position._parse(s)
+    result = {"char_pos": char_pos}
+    if chunk_eid >= 0:
+        result["chunk_eid"] = chunk_eid
+    if chunk_pos >= 0:
+        result["chunk_pos"] = chunk_pos
+    return result
+
+
+def _decode_native_position(csr: Cursor) -> dict:
+    return _native_position(_read_native_str(csr))
+
+
+def _decode_native_lpr(csr: Cursor) -> dict:
+    # see LPR._create
+    if peek_basic_type(csr) is not Byte:
+        return {"pos": _decode_native_position(csr)}
+    return {
+        "lpr_version": _read_native_basic(csr),
+        "pos": _decode_native_position(csr),
+        "timestamp": _read_native_basic(csr),
+    }
+
+
+def _compile_native_record(schema: Mapping) -> Decoder:
+    fields = tuple(
+        (
+            alias,
+            bool(field.required),
+            type_bytes,
+            compile_native_decoder(
+                field.proto.cls_,
+                field.proto.schema,
+                field.schema_id,
+            ),
+        )
+        for alias, field, type_bytes, _ in _record_fields(schema)
+    )
+
+    def decode_unknown(csr: Cursor, decoder: Decoder) -> typing.Any:
+        # keeps what it decoded instead of decoding it again once found,
+        # see _compile_record
+        csr.save()
+        try:
+            value = decoder(csr)
+            csr.unsave()
+            return value
+        except UnexpectedBytesError:
+            csr.restore()
+            return None
+
+    def decode(csr: Cursor) -> typing.Any:
+        result = {}
+        for alias, required, type_bytes, decoder in fields:
+            if type_bytes is None:
+                value = decode_unknown(csr, decoder)
+            elif csr.tell() < len(csr) and csr.peek() in type_bytes:
+                value = decoder(csr)
+            else:
+                value = None
+
+            if value is None:
+                if required:
+                    raise UnexpectedStructureError(
+                        f'Value for field "{alias}" but was not found',
+                        pos=csr.tell(),
+                    )
+                break
+
+            result[alias] = value
+        return result
+
+    return decode
+
+
+def _compile_native_int_map(schema: Mapping) -> Decoder:
+    mapping = _freeze_mapping(schema, False)
+
+    idx_to_entry = {
+        idx: (
+            alias,
+            compile_native_decoder(
+                field.proto.cls_,
+                field.proto.schema,
+                field.schema_id,
+            ),
+        )
+        for idx, (alias, field) in enumerate(mapping.items())
+    }
+
+    def decode(csr: Cursor) -> typing.Any:
+        result = {}
+        for _ in range(_read_count(csr)):
+            idxnum = _read_count(csr)
+            entry = idx_to_entry.get(idxnum)
+            if entry is None:
+                raise UnexpectedStructureError(
+                    f"Object index number {idxnum} not recognized"
+                )
+            alias, decoder = entry
+            result[alias] = decoder(csr)
+        return result
+
+    return decode
+
+
+def _compile_native_array(schema: Index) -> Decoder:
+    elmt_cls = schema.proto.cls_
+    if elmt_cls in _ARRAY_TYPECODES and not schema.schema_id:
+
+        def decode_fixed_width(csr: Cursor) -> typing.Any:
+            return read_fixed_width_values(csr, elmt_cls).tolist()
+
+        return decode_fixed_width
+
+    elmt_decoder = compile_native_decoder(
+        elmt_cls,
+        schema.proto.schema,
+        schema.schema_id or None,
+    )
+
+    def decode(csr: Cursor) -> typing.Any:
+        return [elmt_decoder(csr) for _ in range(_read_count(csr))]
+
+    return decode
+
+
+def _decode_native_dynamic_map(csr: Cursor) -> dict:
+    result = {}
+    for _ in range(_read_count(csr)):
+        key = _read_native_str(csr)
+        result[key] = _read_native_basic(csr)
+    return result
+
+
+def _make_native_entry_decoders(
+    mapping: Mapping,
+) -> typing.Callable[[str], None | Decoder]:
+    @functools.cache
+    def entry_decoder(schema_id: str) -> None | Decoder:
+        field = _entry_field(mapping, schema_id)
+        if field is None:
+            return None
+        return compile_native_decoder(field.proto.cls_, field.proto.schema)
+
+    return entry_decoder
+
+
+def _compile_native_object_map(
+    entry_decoder: typing.Callable[[str], None | Decoder],
+) -> Decoder:
+    def decode(csr: Cursor) -> typing.Any:
+        result = {}
+        for _ in range(_read_object_map_header(csr)):
+            schema_id, value = _decode_entry(csr, entry_decoder)
+            result[str(schema_id)] = value
+        return result
+
+    return decode
+
+
+def _to_native(o: typing.Any) -> typing.Any:
+    # for classes without a native decoder of their own
+    if isinstance(o, bool):
+        return o
+    if isinstance(o, Bool):
+        return bool(o)
+    if isinstance(o, int):
+        return int(o)
+    if isinstance(o, float):
+        return float(o)
+    if isinstance(o, str):
+        return str(o)
+    if isinstance(o, collections.abc.Mapping):
+        return {str(k): _to_native(v) for k, v in o.items()}
+    if isinstance(o, (list, tuple)):
+        return [_to_native(e) for e in o]
+    return o
+
+
+def compile_native_decoder(
+    cls_: type,
+    schema: typing.Any | None = None,
+    schema_id: None | str = None,
+) -> Decoder:
+    if cls_ in _FIXED_WIDTH_BASICS:
+        decoder = _compile_native_fixed_width(cls_)
+    elif cls_ is Utf8Str:
+        decoder = _read_native_str
+    elif cls_ is Position:
+        decoder = _decode_native_position
+    elif cls_ in (DateTime, TimeZoneOffset):
+        decoder = _compile_native_fixed_width(Long)
+    elif cls_ is LPR:
+        decoder = _decode_native_lpr
+    elif cls_ is Record:
+        decoder = _compile_native_record(typing.cast(Mapping, schema))
+    elif cls_ is IntMap:
+        decoder = _compile_native_int_map(typing.cast(Mapping, schema))
+    elif cls_ is Array:
+        decoder = _compile_native_array(typing.cast(Index, schema))
+    elif cls_ is DynamicMap:
+        decoder = _decode_native_dynamic_map
+    elif cls_ is ObjectMap:
+        decoder = _compile_native_object_map(
+            _make_native_entry_decoders(typing.cast(Mapping, schema))
+        )
+    elif issubclass(cls_, Store):
+        decoder = _compile_native_object_map(_native_store_entry_decoder)
+    else:
+        decode_object = compile_decoder(cls_, schema)
+
+        def decode_native(csr: Cursor) -> typing.Any:
+            return _to_native(decode_object(csr))
+
+        decoder = decode_native
+
+    if schema_id:
+        decoder = _compile_framed(decoder, schema_id)
+
+    return decoder
+
+
+_native_store_entry_decoder = _make_native_entry_decoders(
+    _store_key_to_field
+)
+
+
+@functools.cache
+def native_decoder_for(cls_: type) -> Decoder:
+    return compile_native_decoder(cls_)
@@ -2,6 +2,7 @@ from __future__ import annotations
 import abc
 import collections.abc
 import io
+import struct
 import typing
 
 
@@ -163,17 +164,21 @@ class Cursor:
             return self._peek_raw_byte() == data
         return self._peek_raw_bytes(len(data)) == data
 
-    def _extend_from_current_pos(self, length: int):
-        min_size = self._data.tell() + length + 1
-        if len(self._data.getbuffer()) <= min_size:
-            self._data.truncate(min_size)
+    def unpack(self, fmt: struct.Struct) -> tuple[typing.Any, ...]:
+        return fmt.unpack(self._data.read(fmt.size))
+
+    def decode(self, length: int, encoding: str = "utf-8") -> str:
+        return self._data.read(length).decode(encoding)
+
+    def view(self, start: int, end: int) -> None | memoryview:
+        # a zero-copy view of already-read bytes that may outlive this
+        # cursor, or None when the buffer can't safely be held onto
+        return None
 
     def _write_raw_byte(self, value: int):
-        self._extend_from_current_pos(1)
         self._data.write(value.to_bytes(1, "big"))
 
     def _write_raw_bytes(self, value: typing.ByteString):
-        self._extend_from_current_pos(len(value))
         self._data.write(value)
 
     def write(self, value: int | typing.ByteString):
@@ -196,12 +201,290 @@ class Cursor:
         self._data.seek(pos, io.SEEK_SET)
 
 
+class ReadCursor(Cursor):
+    # read-only cursor over a memoryview. reads index straight into the
+    # underlying buffer instead of doing a seek-read-seek round trip
+    # through io.BytesIO, and fixed-width values are unpacked in place
+    def __init__(self, data: None | collections.abc.Buffer = None):
+        self._saved_positions: typing.List[int] = []
+        self._view: memoryview = memoryview(b"")
+        self._size: int = 0
+        self._pos: int = 0
+        self._is_immutable: bool = False
+
+        if data is not None:
+            self.load(data)
+
+    @typing.override
+    def load(self, data: collections.abc.Buffer):
+        # anything exporting the buffer protocol, e.g. bytes, bytearray,
+        # memoryview or mmap.mmap
+        self._view = memoryview(data).cast("B")
+        self._size = len(self._view)
+        self._pos = 0
+        # views into mutable or mappable buffers would pin them (an mmap
+        # can't be closed while views exist) or silently change
+        self._is_immutable = isinstance(data, bytes)
+
+    def release(self):
+        # drop the export on the underlying buffer so that it can be
+        # closed (an mmap.mmap refuses to close while views are alive)
+        self._view.release()
+        self._view = memoryview(b"")
+        self._size = 0
+        self._pos = 0
+        self._is_immutable = False
+
+    @typing.override
+    def dump(self) -> bytes:
+        return bytes(self._view)
+
+    @typing.override
+    def seek(self, pos: int):
+        self._pos = pos
+
+    @typing.override
+    def skip(self, length: int):
+        self._pos += length
+
+    @typing.override
+    def tell(self) -> int:
+        return self._pos
+
+    @typing.override
+    def __len__(self) -> int:
+        return self._size
+
+    @typing.override
+    def __getitem__(self, item: int | slice) -> int | bytes:
+        if isinstance(item, int):
+            return bytes(self._view[item : item + 1])
+        elif isinstance(item, slice):
+            return bytes(self._view[item])
+
+        raise IndexError(
+            'index of class "' + str(type(item)) + '" not supported'
+        )
+
+    @typing.override
+    def __str__(self) -> str:
+        return "%s{@%d of %db}" % (
+            self.__class__.__name__,
+            self._pos,
+            self._size,
+        )
+
+    @typing.override
+    def __getslice__(self, i: int, j: int) -> bytes:
+        return bytes(self._view[i:j])
+
+    @typing.override
+    def _read_raw_byte(self) -> int:
+        pos = self._pos
+        if pos >= self._size:
+            raise IndexError(
+                "Cannot read next byte; buffer of length "
+                + f"{self._size} "
+                + "has reached its end"
+            )
+        self._pos = pos + 1
+        return self._view[pos]
+
+    @typing.override
+    def _read_raw_bytes(self, length: int) -> bytes:
+        pos = self._pos
+        end = min(pos + length, self._size)
+        self._pos = end
+        return bytes(self._view[pos:end])
+
+    @typing.overload
+    def read(self, length: None = None) -> int: ...
+
+    @typing.overload
+    def read(self, length: int) -> bytes: ...
+
+    @typing.override
+    def read(self, length: None | int = None) -> int | bytes:
+        if length is None:
+            return self._read_raw_byte()
+        return self._read_raw_bytes(length)
+
+    @typing.override
+    def unpack(self, fmt: struct.Struct) -> tuple[typing.Any, ...]:
+        result = fmt.unpack_from(self._view, self._pos)
+        self._pos += fmt.size
+        return result
+
+    @typing.override
+    def decode(self, length: int, encoding: str = "utf-8") -> str:
+        pos = self._pos
+        end = min(pos + length, self._size)
+        self._pos = end
+        return str(self._view[pos:end], encoding)
+
+    @typing.override
+    def view(self, start: int, end: int) -> None | memoryview:
+        if not self._is_immutable:
+            return None
+        return self._view[start:end]
+
+    @typing.override
+    def _eat_raw_byte(self, expected: int) -> bool:
+        pos = self._pos
+        if pos < self._size and self._view[pos] == expected:
+            self._pos = pos + 1
+            return True
+        return False
+
+    @typing.override
+    def _eat_raw_bytes(self, expected: typing.ByteString) -> bool:
+        pos = self._pos
+        end = pos + len(expected)
+        if end <= self._size and self._view[pos:end] == expected:
+            self._pos = end
+            return True
+        return False
+
+    @typing.override
+    def _peek_raw_byte(self) -> int:
+        if self._pos >= self._size:
+            raise IndexError(
+                "Cannot peek next byte; buffer of length "
+                + f"{self._size} "
+                + "has reached its end"
+            )
+        return self._view[self._pos]
+
+    @typing.override
+    def _peek_raw_bytes(self, length: int) -> bytes:
+        return bytes(self._view[self._pos : self._pos + length])
+
+    @typing.override
+    def write(self, value: int | typing.ByteString):
+        raise io.UnsupportedOperation(
+            f"{self.__class__.__name__} is read-only"
+        )
+
+    @typing.override
+    def is_at_end(self) -> bool:
+        return self._pos + 1 >= self._size
+
+    @typing.override
+    def save(self):
+        self._saved_positions.append(self._pos)
+
+    @typing.override
+    def restore(self):
+        self._pos = self._saved_positions.pop()
+
+
+class WriteCursor(Cursor):
+    # append-only cursor for serialization. writes are gathered in one
+    # growable bytearray and emitted once, either by dump() or, when a
+    # sink file is given, in large chunks as the buffer fills up
+    _FLUSH_SIZE: typing.Final[int] = 1 << 16
+
+    def __init__(self, sink: None | typing.BinaryIO = None):
+        self._saved_positions: typing.List[int] = []
+        self._buffer: bytearray = bytearray()
+        self._sink: None | typing.BinaryIO = sink
+        self._flushed: int = 0
+
+    def _unsupported(self, *args, **kwargs) -> typing.NoReturn:
+        raise io.UnsupportedOperation(
+            f"{self.__class__.__name__} is write-only and append-only"
+        )
+
+    load = _unsupported
+    seek = _unsupported
+    skip = _unsupported
+    unpack = _unsupported
+    decode = _unsupported
+    save = _unsupported
+    unsave = _unsupported
+    restore = _unsupported
+    _read_raw_byte = _unsupported
+    _read_raw_bytes = _unsupported
+    _eat_raw_byte = _unsupported
+    _eat_raw_bytes = _unsupported
+    _peek_raw_byte = _unsupported
+    _peek_raw_bytes = _unsupported
+    __getitem__ = _unsupported
+    __getslice__ = _unsupported
+
+    @typing.override
+    def dump(self) -> bytes:
+        if self._sink is not None:
+            self._unsupported()
+        return bytes(self._buffer)
+
+    def flush(self):
+        if self._sink is None:
+            return
+        self._sink.write(self._buffer)
+        self._flushed += len(self._buffer)
+        self._buffer.clear()
+
+    @typing.override
+    def tell(self) -> int:
+        return self._flushed + len(self._buffer)
+
+    @typing.override
+    def __len__(self) -> int:
+        return self._flushed + len(self._buffer)
+
+    @typing.override
+    def __str__(self) -> str:
+        return "%s{@%d}" % (self.__class__.__name__, self.tell())
+
+    @typing.overload
+    def read(self, length: None = None) -> int: ...
+
+    @typing.overload
+    def read(self, length: int) -> bytes: ...
+
+    @typing.override
+    def read(self, length: None | int = None) -> int | bytes:
+        self._unsupported()
+
+    @typing.override
+    def _write_raw_byte(self, value: int):
+        self._buffer.append(value)
+
+    @typing.override
+    def _write_raw_bytes(self, value: typing.ByteString):
+        self._buffer += value
+        if self._sink is not None and len(self._buffer) >= self._FLUSH_SIZE:
+            self.flush()
+
+    @typing.override
+    def write(self, value: int | typing.ByteString):
+        if isinstance(value, int):
+            self._buffer.append(value)
+        else:
+            self._write_raw_bytes(value)
+
+    @typing.override
+    def is_at_end(self) -> bool:
+        return True
+
+
 class Serializable(metaclass=abc.ABCMeta):
+    __slots__ = ()
+
     @classmethod
     @abc.abstractmethod
     def _create(cls, cursor: Cursor, *args, **kwargs) -> typing.Self:
         raise NotImplementedError("Must be implemented by the subclass.")
 
+    @classmethod
+    def _type_bytes(
+        cls, _schema: typing.Any = None
+    ) -> None | frozenset[int]:
+        # bytes a serialized value of this class can begin with, or null
+        # if that can't be known without actually attempting the read
+        return None
+
     @abc.abstractmethod
     def _write(self, cursor: Cursor):
         raise NotImplementedError("Must be implemented by the subclass.")
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import dataclasses
+import functools
+import pathlib
+import typing
+
+from .basics import Byte
+from .basics import Utf8Str
+from .basics import peek_basic_type
+from .basics import read_utf8str
+from .codec import _FIXED_WIDTH_BASICS
+from .codec import _STRLEN_STRUCT
+from .codec import _encode_schema_id
+from .codec import _entry_field
+from .codec import _is_field_present
+from .codec import _raise_bad_schema_id
+from .codec import _read_count
+from .codec import _read_object_map_header
+from .codec import _record_fields
+from .codec import compile_decoder
+from .constants import OBJECT_BEGIN
+from .constants import OBJECT_END
+from .cursor import Cursor
+from .cursor import ReadCursor
+from .error import UnexpectedBytesError
+from .error import UnexpectedStructureError
+from .objects import LPR
+from .objects import Array
+from .objects import DateTime
+from .objects import DynamicMap
+from .objects import Index
+from .objects import IntMap
+from .objects import Mapping
+from .objects import ObjectMap
+from .objects import Position
+from .objects import Record
+from .objects import Store
+from .objects import TimeZoneOffset
+from .objects import _freeze_mapping
+from .objects import _open_cursor
+from .objects import _store_key_to_field
+
+# Walks the byte stream against the schema and yields (event, payload)
+# pairs as it goes, in the style of xml.etree.ElementTree.iterparse. No
+# containers are built, so memory use doesn't grow with the file.
+#
+#   ("begin_object", schema_id)    OBJECT_BEGIN and its schema id
+#   ("end_object", schema_id)      the matching OBJECT_END
+#   ("field", key)                 the key of the value that follows
+#   ("value", Value)               a basic value
+#   ("begin_array", count)         before an array's elements
+#   ("end_array", count)           after an array's elements
+
+BEGIN_OBJECT: typing.Final[str] = "begin_object"
+END_OBJECT: typing.Final[str] = "end_object"
+FIELD: typing.Final[str] = "field"
+VALUE: typing.Final[str] = "value"
+BEGIN_ARRAY: typing.Final[str] = "begin_array"
+END_ARRAY: typing.Final[str] = "end_array"
+
+Event: typing.TypeAlias = tuple[str, typing.Any]
+Walker: typing.TypeAlias = typing.Callable[[Cursor], typing.Iterator[Event]]
+
+
+@dataclasses.dataclass(frozen=True)
+class Value:
+    cls_: type  # e.g. Int or Utf8Str
+    value: typing.Any  # plain bool, int, float or str
+    offset: int  # of the magic byte
+
+
+def _make_fixed_width_walker(cls_: type) -> Walker:
+    magic_byte = cls_.magic_byte
+    fmt = cls_._STRUCT
+
+    def walk(csr: Cursor) -> typing.Iterator[Event]:
+        pos = csr.tell()
+        if not csr.eat(magic_byte):
+            raise UnexpectedBytesError(pos, magic_byte, csr.peek())
+        yield VALUE, Value(cls_, csr.unpack(fmt)[0], pos)
+
+    return walk
+
+
+def _walk_utf8str(csr: Cursor) -> typing.Iterator[Event]:
+    pos = csr.tell()
+    if not csr.eat(Utf8Str.magic_byte):
+        raise UnexpectedBytesError(pos, Utf8Str.magic_byte, csr.peek())
+    value = ""
+    if csr.read() == 0:
+        value = csr.decode(csr.unpack(_STRLEN_STRUCT)[0])
+    yield VALUE, Value(Utf8Str, value, pos)
+
+
+_BASIC_WALKERS: typing.Final[dict[int, Walker]] = {
+    cls_.magic_byte: _make_fixed_width_walker(cls_)
+    for cls_ in _FIXED_WIDTH_BASICS
+} | {Utf8Str.magic_byte: _walk_utf8str}
+
+
+def _walk_basic(csr: Cursor) -> typing.Iterator[Event]:
+    # a basic value of whatever type its magic byte says it is
+    pos = csr.tell()
+    walker = _BASIC_WALKERS.get(csr.peek())
+    if walker is None:
+        raise UnexpectedBytesError(pos, list(_BASIC_WALKERS), csr.peek())
+    return walker(csr)
+
+
+def _walk_lpr(csr: Cursor) -> typing.Iterator[Event]:
+    # newer versions are prefixed with a version byte and followed by
+    # a timestamp. see LPR._create
+    count = 3 if peek_basic_type(csr) is Byte else 1
+    for _ in range(count):
+        yield from _walk_basic(csr)
+
+
+def _make_framed_walker(walker: Walker, schema_id: str) -> Walker:
+    prefix = bytes((OBJECT_BEGIN,)) + _encode_schema_id(schema_id)
+
+    def walk(csr: Cursor) -> typing.Iterator[Event]:
+        if not csr.eat(prefix):
+            _raise_bad_schema_id(csr, schema_id)
+        yield BEGIN_OBJECT, schema_id
+        yield from walker(csr)
+        if not csr.eat(OBJECT_END):
+            raise UnexpectedBytesError(csr.tell(), OBJECT_END, csr.peek())
+        yield END_OBJECT, schema_id
+
+    return walk
+
+
+def _make_record_walker(schema: Mapping) -> Walker:
+    fields = tuple(
+        (
+            alias,
+            bool(field.required),
+            type_bytes,
+            probe,
+            compile_walker(
+                field.proto.cls_,
+                field.proto.schema,
+                field.schema_id,
+            ),
+        )
+        for alias, field, type_bytes, probe in _record_fields(schema)
+    )
+
+    def walk(csr: Cursor) -> typing.Iterator[Event]:
+        for alias, required, type_bytes, probe, walker in fields:
+            if not _is_field_present(csr, type_bytes, probe):
+                if required:
+                    raise UnexpectedStructureError(
+                        f'Value for field "{alias}" but was not found',
+                        pos=csr.tell(),
+                    )
+                break
+
+            yield FIELD, alias
+            yield from walker(csr)
+
+    return walk
+
+
+def _make_int_map_walker(schema: Mapping) -> Walker:
+    mapping = _freeze_mapping(schema, False)
+
+    idx_to_entry = {
+        idx: (
+            alias,
+            compile_walker(
+                field.proto.cls_,
+                field.proto.schema,
+                field.schema_id,
+            ),
+        )
+        for idx, (alias, field) in enumerate(mapping.items())
+    }
+
+    def walk(csr: Cursor) -> typing.Iterator[Event]:
+        for _ in range(_read_count(csr)):
+            idxnum = _read_count(csr)
+            entry = idx_to_entry.get(idxnum)
+            if entry is None:
+                raise UnexpectedStructureError(
+                    f"Object index number {idxnum} not recognized"
+                )
+            alias, walker = entry
+            yield FIELD, alias
+            yield from walker(csr)
+
+    return walk
+
+
+def _make_array_walker(schema: Index) -> Walker:
+    elmt_walker = compile_walker(
+        schema.proto.cls_,
+        schema.proto.schema,
+        schema.schema_id or None,
+    )
+
+    def walk(csr: Cursor) -> typing.Iterator[Event]:
+        count = _read_count(csr)
+        yield BEGIN_ARRAY, count
+        for _ in range(count):
+            yield from elmt_walker(csr)
+        yield END_ARRAY, count
+
+    return walk
+
+
+def _walk_dynamic_map(csr: Cursor) -> typing.Iterator[Event]:
+    for _ in range(_read_count(csr)):
+        yield FIELD, str(read_utf8str(csr))
+        yield from _walk_basic(csr)
+
+
+def _make_entry_walkers(
+    mapping: Mapping,
+) -> typing.Callable[[str], None | Walker]:
+    @functools.cache
+    def entry_walker(schema_id: str) -> None | Walker:
+        field = _entry_field(mapping, schema_id)
+        if field is None:
+            return None
+        return compile_walker(field.proto.cls_, field.proto.schema)
+
+    return entry_walker
+
+
+def _make_object_map_walker(
+    entry_walker: typing.Callable[[str], None | Walker],
+) -> Walker:
+    def walk(csr: Cursor) -> typing.Iterator[Event]:
+        for _ in range(_read_object_map_header(csr)):
+            if not csr.eat(OBJECT_BEGIN):
+                raise UnexpectedStructureError(
+                    "Failed to read schema for object."
+                )
+            schema_id = str(read_utf8str(csr, False))
+            walker = entry_walker(schema_id)
+            if walker is None:
+                raise UnexpectedStructureError(
+                    f'Object schema "{schema_id}" not recognized',
+                    pos=csr.tell(),
+                )
+
+            yield BEGIN_OBJECT, schema_id
+            yield from walker(csr)
+            if not csr.eat(OBJECT_END):
+                raise UnexpectedBytesError(
+                    csr.tell(), OBJECT_END, csr.peek()
+                )
+            yield END_OBJECT, schema_id
+
+    return walk
+
+
+def _make_fallback_walker(cls_: type, schema: typing.Any) -> Walker:
+    decoder = compile_decoder(cls_, schema)
+
+    def walk(csr: Cursor) -> typing.Iterator[Event]:
+        pos = csr.tell()
+        yield VALUE, Value(cls_, decoder(csr), pos)
+
+    return walk
+
+
+def compile_walker(
+    cls_: type,
+    schema: typing.Any | None = None,
+    schema_id: None | str = None,
+) -> Walker:
+    if cls_ in _FIXED_WIDTH_BASICS:
+        walker = _make_fixed_width_walker(cls_)
+    elif cls_ is Utf8Str:
+        walker = _walk_utf8str
+    elif cls_ in (Position, DateTime, TimeZoneOffset):
+        # each is a single basic value underneath
+        walker = _walk_basic
+    elif cls_ is LPR:
+        walker = _walk_lpr
+    elif cls_ is Record:
+        walker = _make_record_walker(typing.cast(Mapping, schema))
+    elif cls_ is IntMap:
+        walker = _make_int_map_walker(typing.cast(Mapping, schema))
+    elif cls_ is Array:
+        walker = _make_array_walker(typing.cast(Index, schema))
+    elif cls_ is DynamicMap:
+        walker = _walk_dynamic_map
+    elif cls_ is ObjectMap:
+        walker = _make_object_map_walker(
+            _make_entry_walkers(typing.cast(Mapping, schema))
+        )
+    elif issubclass(cls_, Store):
+        walker = _make_object_map_walker(_store_entry_walker)
+    else:
+        walker = _make_fallback_walker(cls_, schema)
+
+    if schema_id:
+        walker = _make_framed_walker(walker, schema_id)
+
+    return walker
+
+
+_store_entry_walker = _make_entry_walkers(_store_key_to_field)
+
+
+def iterparse(
+    source: str | pathlib.Path | typing.ByteString,
+) -> typing.Iterator[Event]:
+    walker = compile_walker(Store)
+
+    if isinstance(source, (str, pathlib.Path)):
+        # read through the page cache so that memory use stays flat
+        with _open_cursor(source, mmap=True) as csr:
+            yield from walker(csr)
+    else:
+        yield from walker(ReadCursor(source))
@@ -2,11 +2,17 @@ from __future__ import annotations
 
 import abc
 import base64
-import copy
+import collections.abc
+import contextlib
 import dataclasses
+import functools
 import inspect
 import json
+import mmap as mmap_
+import os
 import pathlib
+import shutil
+import tempfile
 import typing
 import warnings
 
@@ -20,6 +26,8 @@ from .basics import Int
 from .basics import Long
 from .basics import Short
 from .basics import Utf8Str
+from .basics import peek_basic_type
+from .basics import read_basic
 from .basics import read_byte
 from .basics import read_int
 from .basics import read_long
@@ -34,10 +42,17 @@ from .builtins import ListBase
 from .constants import OBJECT_BEGIN
 from .constants import OBJECT_END
 from .cursor import Cursor
+from .cursor import ReadCursor
 from .cursor import Serializable
+from .cursor import WriteCursor
 from .error import UnexpectedBytesError
 from .error import UnexpectedStructureError
 
+if typing.TYPE_CHECKING:
+    from _collections_abc import dict_items
+    from _collections_abc import dict_keys
+    from _collections_abc import dict_values
+
 K = typing.TypeVar("K", bound=int | float | str)
 T = typing.TypeVar(
     "T",
@@ -137,37 +152,95 @@ def _write_object(
         cursor.write(OBJECT_END)
 
 
+def _type_bytes(
+    cls_: type,
+    schema: typing.Any | None = None,
+    schema_id: None | str = None,
+) -> None | frozenset[int]:
+    if schema_id:
+        return frozenset((OBJECT_BEGIN,))
+    if issubclass(cls_, Basic):
+        return frozenset((cls_.magic_byte,))
+    if issubclass(cls_, Serializable):
+        # noinspection PyProtectedMember
+        return cls_._type_bytes(schema)
+    return None
+
+
+_COMPATIBLE_MEMO_SIZE: typing.Final[int] = 1024
+
+
+def _is_class_compatible(t: type, cls_: type) -> bool:
+    if issubclass(t, cls_):
+        return True
+
+    for e in [
+        bool,
+        int,
+        float,
+        str,
+        bytes,
+        list,
+        tuple,
+        collections.abc.Mapping,
+    ]:
+        if issubclass(cls_, e) and issubclass(t, e):
+            return True
+
+    return False
+
+
+# checked on every write, so memoized per (value type, schema class).
+# issubclass() against an ABC changes when a class is registered with
+# it, so the memo is only good for as long as the ABC token stays put
+_compatible_memo: dict[tuple[type, type], bool] = {}
+_compatible_token: object = abc.get_cache_token()
+
+
+def _remember_compatible(t: type, cls_: type) -> bool:
+    if len(_compatible_memo) >= _COMPATIBLE_MEMO_SIZE:
+        # keeps classes made on the fly from piling up
+        _compatible_memo.clear()
+    result = _is_class_compatible(t, cls_)
+    _compatible_memo[(t, cls_)] = result
+    return result
+
+
 def _is_compatible(
     o: type | typing.Any,
     cls_: type | typing.Iterable[type],
 ) -> bool:
-    if inspect.isclass(cls_):
-        cls_ = [cls_]
+    global _compatible_token
+
+    token = abc.get_cache_token()
+    if token != _compatible_token:
+        _compatible_memo.clear()
+        _compatible_token = token
+
+    t = o if isinstance(o, type) else type(o)
+    if isinstance(cls_, type):
+        result = _compatible_memo.get((t, cls_))
+        if result is None:
+            result = _remember_compatible(t, cls_)
+        return result
 
     for e in cls_:
-        if (inspect.isclass(o) and issubclass(o, e)) or (
-            not inspect.isclass(o) and isinstance(o, e)
-        ):
+        result = _compatible_memo.get((t, e))
+        if result is None:
+            result = _remember_compatible(t, e)
+        if result:
             return True
-
-        for t in [bool, int, float, str, bytes, list, tuple, dict]:
-            if issubclass(e, t) and (
-                (inspect.isclass(o) and issubclass(o, t))
-                or (not inspect.isclass(o) and isinstance(o, t))
-            ):
-                return True
-
     return False
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True)
 class Protoform:
     cls_: type
     schema: typing.Any | None = None
     name: None | str = None
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True)
 class Field:
     proto: Protoform
     schema_id: None | str = None
@@ -178,34 +251,115 @@ Index: typing.TypeAlias = Field
 Mapping: typing.TypeAlias = dict[str, Field]
 
 
-def _fix_mapping(
-    schema: Mapping,
-    default_required: None | bool = None,
-    recurse: bool = False,
-):
-    for k in list(schema.keys()):
-        if schema[k] is NotImplemented:
-            del schema[k]
-            continue
+class _FrozenMapping(dict[str, Field]):
+    # a normalized schema. these are interned and shared between every
+    # container built from them, so they must never change
+    __slots__ = ("_hash", "_resolved")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._hash: None | int = None
+        self._resolved: dict[None | bool, _FrozenMapping] = {}
+
+    def __hash__(self) -> int:  # type: ignore
+        if self._hash is None:
+            self._hash = hash(tuple(self.items()))
+        return self._hash
+
+    def __copy__(self) -> typing.Self:
+        return self
+
+    def __deepcopy__(self, memo: dict) -> typing.Self:
+        return self
+
+    def __reduce__(self) -> tuple:
+        return _freeze_mapping, (dict(self),)
 
-        if inspect.isclass(schema[k]):
-            t = schema[k]
-            assert isinstance(t, type)
-            schema[k] = Field(Protoform(t))
+    def __immutable(self, *args, **kwargs) -> typing.NoReturn:
+        raise TypeError(f"{self.__class__.__name__} is immutable")
 
-        if schema[k].required is None:
-            schema[k].required = default_required
+    __setitem__ = __immutable
+    __delitem__ = __immutable
+    __ior__ = __immutable  # type: ignore
+    clear = __immutable
+    pop = __immutable
+    popitem = __immutable
 
-        if (
-            recurse
-            and issubclass(schema[k].proto.cls_, dict)
-            and schema[k].proto.schema
-        ):
-            _fix_mapping(schema[k].proto.schema)
+    # written out rather than aliased, as these are overloaded on dict
+    @typing.override
+    def setdefault(
+        self,
+        key: str,
+        default: typing.Any = None,
+        /,
+    ) -> typing.NoReturn:
+        self.__immutable()
+
+    @typing.override
+    def update(
+        self,
+        *args: typing.Any,
+        **kwargs: typing.Any,
+    ) -> typing.NoReturn:
+        self.__immutable()
+
+
+_interned_mappings: dict[_FrozenMapping, _FrozenMapping] = {}
+
+
+def _freeze_proto(proto: Protoform) -> Protoform:
+    schema = proto.schema
+    if isinstance(schema, dict) and not isinstance(schema, _FrozenMapping):
+        return dataclasses.replace(proto, schema=_freeze_mapping(schema))
+    if isinstance(schema, Field):
+        return dataclasses.replace(proto, schema=_freeze_field(schema))
+    return proto
+
+
+def _freeze_field(
+    field: Field,
+    default_required: None | bool = None,
+) -> Field:
+    proto = _freeze_proto(field.proto)
+    if proto is not field.proto:
+        field = dataclasses.replace(field, proto=proto)
+    if field.required is None and default_required is not None:
+        field = dataclasses.replace(field, required=default_required)
+    return field
+
+
+def _freeze_mapping(
+    schema: typing.Mapping[str, typing.Any],
+    default_required: None | bool = None,
+) -> _FrozenMapping:
+    # classes become fields, NotImplemented entries are dropped and fields
+    # that don't say whether they're required get the default. the result
+    # is interned so that equal schemas are the same object, and nothing
+    # has to be copied when a container is built from it
+    if isinstance(schema, _FrozenMapping):
+        result = schema._resolved.get(default_required)
+        if result is not None:
+            return result
+
+    fields = {}
+    for key, field in schema.items():
+        if field is NotImplemented:
+            continue
+        if inspect.isclass(field):
+            field = Field(Protoform(field))
+        fields[key] = _freeze_field(field, default_required)
+
+    result = _FrozenMapping(fields)
+    result = _interned_mappings.setdefault(result, result)
+    result._resolved[default_required] = result
+    if isinstance(schema, _FrozenMapping):
+        schema._resolved[default_required] = result
+    return result
 
 
 class Array(ListBase[T], Serializable, metaclass=abc.ABCMeta):
     # Array can contain Basic and other containers
+    __slots__ = ("__elmt_cls", "__elmt_schema", "__elmt_schema_id")
 
     @typing.override
     def __init__(self, *args, _schema: Index, **kwargs):
@@ -238,17 +392,22 @@ class Array(ListBase[T], Serializable, metaclass=abc.ABCMeta):
     def _create(cls, cursor: Cursor, *args, **kwargs) -> typing.Self:
         result = cls(*args, **kwargs)
         size = read_int(cursor)
-        for _ in range(size):
-            result.append(
-                _read_object(
-                    cursor,
-                    result.__elmt_cls,
-                    result.__elmt_schema,
-                    result.__elmt_schema_id,
-                )
+        result._adopt(
+            _read_object(
+                cursor,
+                result.__elmt_cls,
+                result.__elmt_schema,
+                result.__elmt_schema_id,
             )
+            for _ in range(size)
+        )
         return result
 
+    @classmethod
+    @typing.override
+    def _type_bytes(cls, _schema: typing.Any = None) -> frozenset[int]:
+        return frozenset((Int.magic_byte,))
+
     @typing.override
     def _write(self, cursor: Cursor):
         write_int(cursor, len(self))
@@ -293,23 +452,48 @@ class Array(ListBase[T], Serializable, metaclass=abc.ABCMeta):
 
 
 class _TypedDict(DictBase[str, T], metaclass=abc.ABCMeta):
+    __slots__ = ("__key_to_field",)
+
     @typing.override
-    def __init__(self, *args, _schema: Mapping, **kwargs):
-        schema = copy.deepcopy(_schema)
-        _fix_mapping(schema, True)
+    def __init__(
+        self,
+        *args,
+        _schema: Mapping,
+        _defaults: bool = True,
+        **kwargs,
+    ):
+        schema = _freeze_mapping(_schema, True)
 
+        # a decoder is about to _adopt() the decoded values, so it passes
+        # _defaults=False and only the fields it didn't find get defaults
         init = dict(*args, **kwargs)
-        for key, field in schema.items():
-            if field.required and key not in init:
-                init[key] = _make_object(
-                    field.proto.cls_, schema=field.proto.schema
-                )
+        if _defaults:
+            for key, field in schema.items():
+                if field.required and key not in init:
+                    init[key] = _make_object(
+                        field.proto.cls_, schema=field.proto.schema
+                    )
 
         self.__key_to_field: Mapping = schema
 
         # call parent constructor last so that hooks will work
         super().__init__(init)
 
+    @typing.override
+    def _adopt(self, values: typing.Mapping[str, T], defaults: bool = True):
+        # a selective decoder passes defaults=False, since a field it
+        # skipped over isn't missing from the file
+        super()._adopt(values)
+        if not defaults:
+            return
+        for key, field in self.__key_to_field.items():
+            if field.required and not dict.__contains__(self, key):
+                dict.__setitem__(
+                    self,
+                    key,
+                    _make_object(field.proto.cls_, schema=field.proto.schema),
+                )
+
     @typing.override
     @typing.final
     def _is_key_readable(self, key: typing.Any) -> bool:
@@ -408,6 +592,7 @@ class Record(_TypedDict, Serializable, metaclass=abc.ABCMeta):
     # keys are just arbitrary aliases for convenience. values are
     # hardcoded and knowing what value is where is determined by
     # the order of their appearance
+    __slots__ = ("__key_to_field",)
 
     @typing.override
     def __init__(
@@ -416,8 +601,7 @@ class Record(_TypedDict, Serializable, metaclass=abc.ABCMeta):
         _schema: Mapping,
         **kwargs,
     ):
-        schema = copy.deepcopy(_schema)
-        _fix_mapping(schema, True)
+        schema = _freeze_mapping(_schema, True)
 
         self.__key_to_field: Mapping = schema
         # super constructor last so hooks work correctly
@@ -425,7 +609,7 @@ class Record(_TypedDict, Serializable, metaclass=abc.ABCMeta):
 
     @classmethod
     def _schema(cls, mapping: dict[str, type | Field]) -> Mapping:
-        return copy.deepcopy(mapping)
+        return _freeze_mapping(mapping)
 
     @classmethod
     @typing.override
@@ -436,11 +620,11 @@ class Record(_TypedDict, Serializable, metaclass=abc.ABCMeta):
         _schema: Mapping,
         **kwargs,
     ) -> typing.Self:
-        schema = copy.deepcopy(_schema)
-        _fix_mapping(schema)
+        schema = _freeze_mapping(_schema)
 
-        result = cls(*args, _schema=schema, **kwargs)
+        result = cls(*args, _schema=schema, _defaults=False, **kwargs)
 
+        values = {}
         for alias, field in schema.items():
             val = cls._read_next(
                 cursor,
@@ -458,10 +642,41 @@ class Record(_TypedDict, Serializable, metaclass=abc.ABCMeta):
                 else:
                     break
 
-            result[alias] = val
+            values[alias] = val
 
+        result._adopt(values)
         return result
 
+    @classmethod
+    @typing.override
+    def _type_bytes(
+        cls, _schema: None | Mapping = None
+    ) -> None | frozenset[int]:
+        if not _schema:
+            return None
+
+        # a record starts with its first field that is actually present
+        result = set()
+        for field in _schema.values():
+            if field is NotImplemented:
+                continue
+            if inspect.isclass(field):
+                field = Field(Protoform(field))
+
+            type_bytes = _type_bytes(
+                field.proto.cls_,
+                field.proto.schema,
+                field.schema_id,
+            )
+            if type_bytes is None:
+                return None
+            result |= type_bytes
+            if field.required is not False:
+                return frozenset(result)
+
+        # every field is optional so the record can be empty
+        return None
+
     @classmethod
     def _read_next(
         cls,
@@ -473,6 +688,16 @@ class Record(_TypedDict, Serializable, metaclass=abc.ABCMeta):
         # objects in a Record have no OBJECT_BEGIN OBJECT_END demarcating
         # bytes. the demarcation is implied by the ordering of the elements
 
+        # decide whether the value is present from its leading type byte
+        # so that an absent optional field doesn't cost an exception
+        type_bytes = _type_bytes(cls_, schema, schema_id)
+        if type_bytes is not None:
+            if cursor.tell() >= len(cursor):
+                return None
+            if cursor.peek() not in type_bytes:
+                return None
+            return _read_object(cursor, cls_, schema, schema_id)
+
         cursor.save()
         try:
             val = _read_object(cursor, cls_, schema, schema_id)
@@ -492,22 +717,37 @@ class Record(_TypedDict, Serializable, metaclass=abc.ABCMeta):
             _write_object(cursor, self[alias], field.schema_id)
 
 
+@functools.cache
+def _int_map_indices(
+    schema: _FrozenMapping,
+) -> tuple[dict[int, Field], dict[str, int], dict[int, str]]:
+    # the same for every IntMap of a schema, so they share one copy
+    idx_to_field = {}
+    alias_to_idx = {}
+    idx_to_alias = {}
+    for i, (alias, field) in enumerate(schema.items()):
+        idx_to_field[i] = field
+        alias_to_idx[alias] = i
+        idx_to_alias[i] = alias
+    return idx_to_field, alias_to_idx, idx_to_alias
+
+
 class IntMap(_TypedDict, Serializable):
     # can contain Bool, Char, Byte, Short, Int, Long, Float, Double,
     #   Utf8Str, Object
+    __slots__ = ("__idx_to_field", "__alias_to_idx", "__idx_to_alias")
 
     def __init__(self, *args, _schema: Mapping, **kwargs):
-        schema = copy.deepcopy(_schema)
-        _fix_mapping(schema, False)
-
-        self.__idx_to_field: dict[int, Field] = {}
-        self.__alias_to_idx: dict[str, int] = {}
-        self.__idx_to_alias: dict[int, str] = {}
+        schema = _freeze_mapping(_schema, False)
 
-        for i, (alias, field) in enumerate(schema.items()):
-            self.__idx_to_field[i] = field
-            self.__alias_to_idx[alias] = i
-            self.__idx_to_alias[i] = alias
+        self.__idx_to_field: dict[int, Field]
+        self.__alias_to_idx: dict[str, int]
+        self.__idx_to_alias: dict[int, str]
+        (
+            self.__idx_to_field,
+            self.__alias_to_idx,
+            self.__idx_to_alias,
+        ) = _int_map_indices(schema)
 
         # parent constructor after schema setup so hooks run correctly
         super().__init__(*args, _schema=schema, **kwargs)
@@ -520,12 +760,13 @@ class IntMap(_TypedDict, Serializable):
 
     @classmethod
     def _schema(cls, mapping: dict[str, type | Field]) -> Mapping:
-        return copy.deepcopy(mapping)
+        return _freeze_mapping(mapping)
 
     @classmethod
     @typing.override
     def _create(cls, cursor: Cursor, *args, **kwargs) -> typing.Self:
         result = cls(*args, **kwargs)
+        values = {}
         size = read_int(cursor)
         for _ in range(size):
             idxnum = read_int(cursor)
@@ -540,9 +781,16 @@ class IntMap(_TypedDict, Serializable):
             schema_id = result.__idx_to_field[idxnum].schema_id
             schema = result.__idx_to_field[idxnum].proto.schema
 
-            result[alias] = _read_object(cursor, cls_, schema, schema_id)
+            values[alias] = _read_object(cursor, cls_, schema, schema_id)
+
+        result._adopt(values)
         return result
 
+    @classmethod
+    @typing.override
+    def _type_bytes(cls, _schema: typing.Any = None) -> frozenset[int]:
+        return frozenset((Int.magic_byte,))
+
     @typing.override
     def _write(self, cursor: Cursor):
         write_int(cursor, len(self))
@@ -557,6 +805,8 @@ class IntMap(_TypedDict, Serializable):
 
 # can contain Bool, Char, Byte, Short, Int, Long, Float, Double, Utf8Str
 class DynamicMap(DictBase[str, typing.Any], Serializable):
+    __slots__ = ()
+
     @typing.override
     def __init__(self, *args, **kwargs):
         args = list(args)
@@ -638,25 +888,28 @@ class DynamicMap(DictBase[str, typing.Any], Serializable):
         | Double
         | Utf8Str
     ):
-        for t in [Bool, Byte, Char, Short, Int, Long, Float, Double, Utf8Str]:
-            if cursor.peek() == t.magic_byte:
-                # noinspection PyProtectedMember
-                return t._create(cursor)
-
-        return None
+        return read_basic(cursor)
 
     @classmethod
     @typing.override
     def _create(cls, cursor: Cursor, *args, **kwargs) -> typing.Self:
         result = cls(*args, **kwargs)
+        values = {}
         size = read_int(cursor)
         for _ in range(size):
             key = read_utf8str(cursor)
             value = cls._read_basic(cursor)
             assert value is not None, "Value not found"
-            result[key] = value
+            values[key] = value
+
+        result._adopt(values)
         return result
 
+    @classmethod
+    @typing.override
+    def _type_bytes(cls, _schema: typing.Any = None) -> frozenset[int]:
+        return frozenset((Int.magic_byte,))
+
     @typing.override
     def _write(self, cursor: Cursor):
         write_int(cursor, len(self))
@@ -667,6 +920,8 @@ class DynamicMap(DictBase[str, typing.Any], Serializable):
 
 
 class DateTime(IntBase, Serializable):
+    __slots__ = ()
+
     @typing.override
     def __new__(
         cls,
@@ -705,12 +960,17 @@ class DateTime(IntBase, Serializable):
     def _create(cls, cursor: Cursor, *args, **kwargs) -> typing.Self:
         return cls(read_long(cursor), *args, **kwargs)
 
+    @classmethod
+    @typing.override
+    def _type_bytes(cls, _schema: typing.Any = None) -> frozenset[int]:
+        return frozenset((Long.magic_byte,))
+
     @typing.override
     def _write(self, cursor: Cursor):
         write_long(cursor, max(-1, int(self)))
 
     def __bytes__(self) -> bytes:
-        csr = Cursor()
+        csr = WriteCursor()
         self._write(csr)
         return csr.dump()
 
@@ -736,80 +996,214 @@ class _JsonEncoder(json.JSONEncoder):
         return super().default(o)
 
 
-class Position(_TypedDict, Serializable):
+# the same few positions turn up again and again across bookmarks,
+# highlights, notes and page history, so parsing and formatting are
+# memoized. bounded so that a long-running process doesn't grow forever
+_POSITION_MEMO_SIZE: typing.Final[int] = 4096
+
+
+@functools.total_ordering
+class Position(collections.abc.Mapping, Serializable):
+    # an immutable value. reads like the mapping it used to be, but holds
+    # plain ints and orders by where it is in the book. chunk_eid and
+    # chunk_pos are -1 when the position has none
+    __slots__ = ("__char_pos", "__chunk_eid", "__chunk_pos", "__encoded")
     _MAGIC_CHUNK_V1: typing.Final[int] = 0x01
-    _FIELDS: typing.Final[dict[str, Field]] = {
-        "char_pos": Field(Protoform(Int)),
-        "chunk_eid": Field(Protoform(Int, -1), required=False),
-        "chunk_pos": Field(Protoform(Int, -1), required=False),
-    }
+    _KEYS: typing.Final[tuple[str, ...]] = (
+        "char_pos",
+        "chunk_eid",
+        "chunk_pos",
+    )
 
-    @typing.override
     def __init__(
         self,
         *args,
+        _schema: typing.Any = None,
         **kwargs,
     ):
-        args = list(args)
-        kwargs = dict(kwargs)
+        assert _schema is None, "invalid argument"
+        if args == (None,):
+            args = ()
 
-        if args == [None]:
-            args = []
+        if len(args) == 1 and isinstance(args[0], str) and not kwargs:
+            init = dict(zip(self._KEYS, self._parse(args[0])))
+        else:
+            init = dict(*args, **kwargs)
 
-        if kwargs.get("_schema") is None:
-            kwargs.pop("_schema", None)
+        for key, value in init.items():
+            if key not in self._KEYS:
+                raise KeyError(f'Key "{key}" is invalid for this container.')
+            if value is not None and not isinstance(value, int):
+                raise ValueError(
+                    f"The key-value pair ({key}, {value}) "
+                    + "is invalid for this container."
+                )
 
-        assert "_schema" not in kwargs, "invalid argument"
-        super().__init__(*args, _schema=self._FIELDS, **kwargs)
+        self.__char_pos: int = int(init.get("char_pos") or 0)
+        self.__chunk_eid: int = self.__or_unset(init.get("chunk_eid"))
+        self.__chunk_pos: int = self.__or_unset(init.get("chunk_pos"))
+        self.__encoded: None | str = None
+
+    @staticmethod
+    def __or_unset(value: None | int) -> int:
+        return -1 if value is None else int(value)
+
+    @property
+    def char_pos(self) -> int:
+        return self.__char_pos
+
+    @property
+    def chunk_eid(self) -> int:
+        return self.__chunk_eid
+
+    @property
+    def chunk_pos(self) -> int:
+        return self.__chunk_pos
 
     @classmethod
-    @typing.override
-    def _create(cls, cursor: Cursor, *args, **kwargs) -> typing.Self:
-        result = cls(*args, **kwargs)
-        s = read_utf8str(cursor)
+    @functools.lru_cache(maxsize=_POSITION_MEMO_SIZE)
+    def _parse(cls, s: str) -> tuple[int, int, int]:
+        # (char_pos, chunk_eid, chunk_pos)
         split = s.split(":", 2)
-        if len(split) > 1:
-            b = base64.b64decode(split[0])
-            version = b[0]
-            if version == result._MAGIC_CHUNK_V1:
-                result["chunk_eid"] = int.from_bytes(b[1:5], "little")
-                result["chunk_pos"] = int.from_bytes(b[5:9], "little")
-            else:
-                # TODO throw a proper exception
-                raise Exception(
-                    "Unrecognized position version 0x%02x" % version
-                )
-            result["char_pos"] = int(split[1])
-        else:
-            result["char_pos"] = int(s)
+        if len(split) <= 1:
+            return int(s), -1, -1
+
+        b = base64.b64decode(split[0])
+        version = b[0]
+        if version != cls._MAGIC_CHUNK_V1:
+            # TODO throw a proper exception
+            raise Exception("Unrecognized position version 0x%02x" % version)
+        return (
+            int(split[1]),
+            int.from_bytes(b[1:5], "little"),
+            int.from_bytes(b[5:9], "little"),
+        )
+
+    @classmethod
+    def _from_str(cls, s: str) -> typing.Self:
+        # skips __init__, as the values are already known to be valid
+        result = cls.__new__(cls)
+        (
+            result.__char_pos,
+            result.__chunk_eid,
+            result.__chunk_pos,
+        ) = cls._parse(s)
+        result.__encoded = s
         return result
 
+    @classmethod
     @typing.override
-    def _write(self, cursor: Cursor):
+    def _create(cls, cursor: Cursor, *args, **kwargs) -> typing.Self:
+        assert not args and kwargs.get("_schema") is None, "invalid argument"
+        return cls._from_str(str(read_utf8str(cursor)))
+
+    @classmethod
+    @typing.override
+    def _type_bytes(cls, _schema: typing.Any = None) -> frozenset[int]:
+        return frozenset((Utf8Str.magic_byte,))
+
+    @classmethod
+    @functools.lru_cache(maxsize=_POSITION_MEMO_SIZE)
+    def _format(
+        cls,
+        char_pos: None | int,
+        chunk_eid: int,
+        chunk_pos: int,
+    ) -> str:
         s = ""
-        if self["chunk_eid"] >= 0 and self["chunk_pos"] >= 0:
-            b_version = self._MAGIC_CHUNK_V1.to_bytes(
+        if chunk_eid >= 0 and chunk_pos >= 0:
+            b_version = cls._MAGIC_CHUNK_V1.to_bytes(
                 1, "little", signed=False
             )
-            b_eid = self["chunk_eid"].to_bytes(4, "little", signed=False)
-            b_pos = self["chunk_pos"].to_bytes(4, "little", signed=False)
+            b_eid = chunk_eid.to_bytes(4, "little", signed=False)
+            b_pos = chunk_pos.to_bytes(4, "little", signed=False)
             s += base64.b64encode(b_version + b_eid + b_pos).decode("ascii")
             s += ":"
         s += str(
-            int(self["char_pos"])
-            if self["char_pos"] is not None and self["char_pos"] >= 0
-            else -1
+            int(char_pos) if char_pos is not None and char_pos >= 0 else -1
         )
-        write_utf8str(cursor, s)
+        return s
+
+    @typing.override
+    def _write(self, cursor: Cursor):
+        write_utf8str(cursor, str(self))
+
+    def __key(self) -> tuple[int, int, int]:
+        return self.__chunk_eid, self.__chunk_pos, self.__char_pos
+
+    @typing.override
+    def __getitem__(self, key: str) -> int:
+        if key == "char_pos":
+            return self.__char_pos
+        if key == "chunk_eid" and self.__chunk_eid >= 0:
+            return self.__chunk_eid
+        if key == "chunk_pos" and self.__chunk_pos >= 0:
+            return self.__chunk_pos
+        raise KeyError(f'Key "{key}" not found.')
+
+    @typing.override
+    def __iter__(self) -> typing.Iterator[str]:
+        yield "char_pos"
+        if self.__chunk_eid >= 0:
+            yield "chunk_eid"
+        if self.__chunk_pos >= 0:
+            yield "chunk_pos"
+
+    @typing.override
+    def __len__(self) -> int:
+        return 1 + (self.__chunk_eid >= 0) + (self.__chunk_pos >= 0)
+
+    @typing.override
+    def __eq__(self, other: typing.Any) -> bool:
+        if isinstance(other, Position):
+            return self.__key() == other.__key()
+        return super().__eq__(other)
+
+    def __lt__(self, other: typing.Any) -> bool:
+        if not isinstance(other, Position):
+            return NotImplemented
+        return self.__key() < other.__key()
+
+    @typing.override
+    def __hash__(self) -> int:
+        return hash(self.__key())
+
+    def __copy__(self) -> typing.Self:
+        return self
+
+    def __deepcopy__(self, memo: dict) -> typing.Self:
+        return self
+
+    def __reduce__(self) -> tuple:
+        return self.__class__, (dict(self),)
+
+    @typing.override
+    def __str__(self) -> str:
+        # the encoded form, which is what gets written
+        if self.__encoded is None:
+            self.__encoded = self._format(
+                self.__char_pos,
+                self.__chunk_eid,
+                self.__chunk_pos,
+            )
+        return self.__encoded
+
+    @typing.override
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}{dict(self)}"
+
+    def __json__(self) -> dict:
+        return dict(self)
 
 
 class LPR(_TypedDict, Serializable):  # aka LPR
+    __slots__ = ()
     _MAGIC_V2: typing.Final[int] = 2
-    _FIELDS: typing.Final[dict[str, Field]] = {
+    _FIELDS: typing.Final[Mapping] = _freeze_mapping({
         "pos": Field(Protoform(Position)),
         "timestamp": Field(Protoform(Int, -1), required=False),
         "lpr_version": Field(Protoform(Int, -1), required=False),
-    }
+    })
 
     @typing.override
     def __init__(self, *args, **kwargs):
@@ -828,25 +1222,32 @@ class LPR(_TypedDict, Serializable):  # aka LPR
     @classmethod
     @typing.override
     def _create(cls, cursor: Cursor, *args, **kwargs) -> typing.Self:
-        init = {}
+        values = {}
 
-        type_byte = cursor.peek()
-        if type_byte == Utf8Str.magic_byte:
+        type_ = peek_basic_type(cursor)
+        if type_ is Utf8Str:
             # old LPR version'
-            init["pos"] = _read_object(cursor, Position)
-        elif type_byte == Byte.magic_byte:
+            values["pos"] = _read_object(cursor, Position)
+        elif type_ is Byte:
             # new LPR version
-            init["lpr_version"] = read_byte(cursor)
-            init["pos"] = _read_object(cursor, Position)
-            init["timestamp"] = int(read_long(cursor))
+            values["lpr_version"] = Int(read_byte(cursor))
+            values["pos"] = _read_object(cursor, Position)
+            values["timestamp"] = Int(read_long(cursor))
         else:
             raise UnexpectedBytesError(
                 cursor.tell(),
                 [Utf8Str.magic_byte, Byte.magic_byte],
-                type_byte,
+                cursor.peek(),
             )
 
-        return cls(*args, **init, **kwargs)
+        result = cls(*args, _defaults=False, **kwargs)
+        result._adopt(values)
+        return result
+
+    @classmethod
+    @typing.override
+    def _type_bytes(cls, _schema: typing.Any = None) -> frozenset[int]:
+        return frozenset((Utf8Str.magic_byte, Byte.magic_byte))
 
     @typing.override
     def _write(self, cursor: Cursor):
@@ -864,6 +1265,8 @@ class LPR(_TypedDict, Serializable):  # aka LPR
 
 
 class TimeZoneOffset(IntBase, Serializable):
+    __slots__ = ()
+
     @typing.override
     def __new__(
         cls,
@@ -886,6 +1289,11 @@ class TimeZoneOffset(IntBase, Serializable):
     def _create(cls, cursor: Cursor, *args, **kwargs) -> typing.Self:
         return cls(read_long(cursor), *args, **kwargs)
 
+    @classmethod
+    @typing.override
+    def _type_bytes(cls, _schema: typing.Any = None) -> frozenset[int]:
+        return frozenset((Long.magic_byte,))
+
     @typing.override
     def _write(self, cursor: Cursor):
         write_long(cursor, max(-1, self))
@@ -909,7 +1317,7 @@ class TimeZoneOffset(IntBase, Serializable):
         return self >= 0
 
     def __bytes__(self) -> bytes:
-        csr = Cursor()
+        csr = WriteCursor()
         self._write(csr)
         return csr.dump()
 
@@ -922,14 +1330,14 @@ class TimeZoneOffset(IntBase, Serializable):
 # can contain Bool, Char, Byte, Short, Int, Long, Float, Double,
 #   Utf8Str, Object
 class ObjectMap(_TypedDict, Serializable):
+    __slots__ = ("__key_to_field",)
     _MAGIC_STR: typing.Final[bytes] = b"\x00\x00\x00\x00\x00\x1A\xB1\x26"
     _FIXED_MYSTERY_NUM: typing.Final[int] = (
         1  # present after the signature; unknown what this number means
     )
 
     def __init__(self, *args, _schema: Mapping, **kwargs):
-        schema = copy.deepcopy(_schema)
-        _fix_mapping(schema, False)
+        schema = _freeze_mapping(_schema, False)
 
         self.__key_to_field: Mapping = schema
         # super constructor last so hooks work correctly
@@ -937,9 +1345,7 @@ class ObjectMap(_TypedDict, Serializable):
 
     @classmethod
     def _schema(cls, mapping: dict[str, type | Field]) -> Mapping:
-        result = copy.deepcopy(mapping)
-        _fix_mapping(result, False)
-        return result
+        return _freeze_mapping(mapping, False)
 
     @classmethod
     def __eat_signature_or_error(cls, cursor: Cursor):
@@ -1021,6 +1427,7 @@ class ObjectMap(_TypedDict, Serializable):
         result.__eat_signature_or_error(cursor)
         result.__eat_fixed_mystery_num_or_error(cursor)
 
+        values = {}
         size = read_int(cursor)
         for _ in range(size):
             schema_id = cls.__peek_object_schema_id(cursor)
@@ -1032,9 +1439,16 @@ class ObjectMap(_TypedDict, Serializable):
                 schema_id,
             )
             assert schema_id_actual, "Object has blank schema."
-            result[schema_id_actual] = value
+            values[schema_id_actual] = value
+
+        result._adopt(values)
         return result
 
+    @classmethod
+    @typing.override
+    def _type_bytes(cls, _schema: typing.Any = None) -> frozenset[int]:
+        return frozenset(cls._MAGIC_STR[:1])
+
     @typing.override
     def _write(self, cursor: Cursor):
         cursor.write(self._MAGIC_STR)
@@ -1192,9 +1606,7 @@ _apnx = Protoform(Record, Record._schema({
 
 # noinspection PyProtectedMember
 # NOTE if you update this schema map update the type hints too
-_store_key_to_field: \
-dict[str, type | NotImplemented | Field] \
-= ObjectMap._schema({  # noqa
+_store_key_to_field: Mapping = ObjectMap._schema({  # noqa
     "clock.data.store": NotImplemented,
     "dictionary": Utf8Str,
     "lpu": NotImplemented,
@@ -1281,7 +1693,6 @@ dict[str, type | NotImplemented | Field] \
         _timer_average_calculator_outliers,
     ),
 })
-_fix_mapping(_store_key_to_field, recurse=True)
 
 # autopep8: on
 # yapf: enable
@@ -1290,6 +1701,8 @@ _fix_mapping(_store_key_to_field, recurse=True)
 
 
 class Store(ObjectMap):
+    __slots__ = ()
+
     @typing.override
     def __init__(self, *args, **kwargs):
         assert kwargs.get("_schema") is None, "invalid argument"
@@ -1303,30 +1716,513 @@ class Store(ObjectMap):
     @typing.override
     def _create(cls, cursor: Cursor, *args, **kwargs) -> typing.Self:
         assert kwargs.get("_schema") is None, "invalid argument"
-        return super()._create(
-            cursor,
+        if args or kwargs:
+            return super()._create(
+                cursor,
+                *args,
+                **kwargs,
+            )
+
+        from .codec import decoder_for
+
+        # the schema is fixed, so decode through the compiled decoders
+        return decoder_for(cls)(cursor)
+
+    @typing.override
+    def _write(self, cursor: Cursor):
+        from .codec import encoder_for
+
+        encoder_for(self.__class__)(cursor, self)
+
+
+class PartialStore(Store):
+    # what a selective decode returns. only the selected key paths were
+    # decoded and everything else in the file was skipped, so writing this
+    # back would lose whatever wasn't selected
+    __slots__ = ()
+
+    @typing.override
+    def __init__(self, *args, _schema: None | Mapping = None, **kwargs):
+        # narrowed to the selected keys, see compile_selective_decoder
+        super(Store, self).__init__(
             *args,
+            _schema=_schema if _schema is not None else _store_key_to_field,
             **kwargs,
         )
 
+    @typing.override
+    def _write(self, cursor: Cursor):
+        raise TypeError(
+            "Cannot write a partially loaded Store "
+            + "(load it without select to modify it)."
+        )
+
+
+class LazyStore(Store):
+    # top-level entries are only located when the file is read. each one
+    # is kept as its raw frame and decoded the first time it's accessed,
+    # and entries that were never touched are written back as-is
+    __slots__ = ("__key_to_frame", "__order")
+
+    @typing.override
+    def __init__(self, *args, **kwargs):
+        self.__key_to_frame: dict[str, bytes] = {}
+        self.__order: list[str] = []
+        super().__init__(*args, **kwargs)
+
+    @classmethod
+    @typing.override
+    def _create(cls, cursor: Cursor, *args, **kwargs) -> typing.Self:
+        from .codec import is_store_entry
+        from .codec import scan_object_map
+
+        result = cls(*args, **kwargs)
+        entries = scan_object_map(cursor)
+        end = cursor.tell()
 
-def load_file(file: str | pathlib.Path) -> Store:
+        for schema_id, pos, length in entries:
+            if not is_store_entry(schema_id):
+                raise UnexpectedStructureError(
+                    f'Object schema "{schema_id}" not recognized',
+                    pos=pos,
+                )
+            cursor.seek(pos)
+            result.__key_to_frame[schema_id] = cursor.read(length)
+            result.__order.append(schema_id)
+
+        cursor.seek(end)
+        return result
+
+    def __load(self, key: typing.Any):
+        from .codec import decode_store_entry
+
+        frame = self.__key_to_frame.get(key) if isinstance(key, str) else None
+        if frame is None:
+            return
+
+        _, value = decode_store_entry(frame)
+        # the decoded value is already of the schema's class
+        dict.__setitem__(self, key, value)
+        del self.__key_to_frame[key]
+
+    def __load_all(self):
+        for key in list(self.__key_to_frame):
+            self.__load(key)
+
+    def __ordered_keys(self) -> list[str]:
+        result = [
+            k
+            for k in self.__order
+            if k in self.__key_to_frame or dict.__contains__(self, k)
+        ]
+        result.extend(k for k in dict.keys(self) if k not in result)
+        return result
+
+    @property
+    def pending(self) -> frozenset[str]:
+        # keys that have not been decoded yet
+        return frozenset(self.__key_to_frame)
+
+    @typing.override
+    def _write(self, cursor: Cursor):
+        from .codec import encode_store_entry
+        from .codec import write_store_header
+
+        write_store_header(cursor, len(self))
+        for key in self.__ordered_keys():
+            frame = self.__key_to_frame.get(key)
+            if frame is not None:
+                cursor.write(frame)
+            else:
+                encode_store_entry(cursor, key, dict.__getitem__(self, key))
+
+    @typing.override
+    def __getitem__(self, key: str) -> typing.Any:
+        self.__load(key)
+        return super().__getitem__(key)
+
+    @typing.override
+    def get(self, key: str, default: typing.Any = None) -> typing.Any:
+        self.__load(key)
+        return super().get(key, default)
+
+    @typing.override
+    def setdefault(self, key: str, default: typing.Any = None) -> typing.Any:
+        self.__load(key)
+        return super().setdefault(key, default)
+
+    @typing.override
+    def pop(self, key: str, *args, **kwargs) -> typing.Any:
+        self.__load(key)
+        return super().pop(key, *args, **kwargs)
+
+    @typing.override
+    def __contains__(self, key: typing.Any) -> bool:
+        return key in self.__key_to_frame or super().__contains__(key)
+
+    @typing.override
+    def __setitem__(self, key: str, item: typing.Any):
+        super().__setitem__(key, item)
+        self.__key_to_frame.pop(key, None)
+
+    @typing.override
+    def __delitem__(self, key: str):
+        if key not in self.__key_to_frame:
+            super().__delitem__(key)
+            return
+
+        del self.__key_to_frame[key]
+        self._modified = True
+        self._notify_observers()
+
+    @typing.override
+    def update(self, *args, **kwargs):
+        other = dict(*args, **kwargs)
+        super().update(other)
+        for key in other:
+            self.__key_to_frame.pop(key, None)
+
+    @typing.override
+    def __len__(self) -> int:
+        return super().__len__() + len(self.__key_to_frame)
+
+    # anything that looks at the whole container decodes everything first
+
+    @typing.override
+    def __iter__(self) -> typing.Iterator[str]:
+        self.__load_all()
+        return super().__iter__()
+
+    @typing.override
+    def keys(self) -> dict_keys[str, typing.Any]:
+        self.__load_all()
+        return super().keys()
+
+    @typing.override
+    def values(self) -> dict_values[str, typing.Any]:
+        self.__load_all()
+        return super().values()
+
+    @typing.override
+    def items(self) -> dict_items[str, typing.Any]:
+        self.__load_all()
+        return super().items()
+
+    @typing.override
+    def popitem(self, *args, **kwargs) -> tuple[str, typing.Any]:
+        self.__load_all()
+        return super().popitem(*args, **kwargs)
+
+    @typing.override
+    def clear(self, *args, **kwargs):
+        self.__load_all()
+        super().clear(*args, **kwargs)
+
+    @typing.override
+    def copy(self) -> typing.Self:
+        self.__load_all()
+        return super().copy()
+
+    @typing.override
+    def __eq__(self, o: typing.Any) -> bool:
+        self.__load_all()
+        return super().__eq__(o)
+
+    @typing.override
+    def __or__(self, other: typing.Mapping[typing.Any, typing.Any]):
+        self.__load_all()
+        return super().__or__(other)
+
+    @typing.override
+    def __str__(self) -> str:
+        self.__load_all()
+        return super().__str__()
+
+    @typing.override
+    def __repr__(self) -> str:
+        self.__load_all()
+        return super().__repr__()
+
+
+@contextlib.contextmanager
+def _open_cursor(
+    file: str | pathlib.Path,
+    mmap: bool = False,
+) -> typing.Iterator[ReadCursor]:
     if isinstance(file, str):
         file = pathlib.Path(file)
 
     with file.open("rb") as f:
-        csr = Cursor(f.read())
+        # mmap refuses zero-length files so read those the normal way
+        if not mmap or os.fstat(f.fileno()).st_size <= 0:
+            yield ReadCursor(f.read())
+            return
+
+        # decode straight out of the page cache instead of holding a
+        # private copy of the whole file for the duration of the parse
+        with mmap_.mmap(f.fileno(), 0, access=mmap_.ACCESS_READ) as mm:
+            csr = ReadCursor(mm)
+            try:
+                yield csr
+            finally:
+                csr.release()
+
+
+@typing.overload
+def load_file(
+    file: str | pathlib.Path,
+    mmap: bool = False,
+    lazy: bool = False,
+    select: None | typing.Iterable[str | typing.Sequence[str | int]] = None,
+    native: typing.Literal[False] = False,
+) -> Store: ...
+
+
+@typing.overload
+def load_file(
+    file: str | pathlib.Path,
+    mmap: bool = False,
+    lazy: typing.Literal[False] = False,
+    select: None = None,
+    *,
+    native: typing.Literal[True],
+) -> dict[str, typing.Any]: ...
+
+
+@typing.overload
+def load_file(
+    file: str | pathlib.Path,
+    mmap: bool = False,
+    lazy: bool = False,
+    select: None | typing.Iterable[str | typing.Sequence[str | int]] = None,
+    native: bool = False,
+) -> Store | dict[str, typing.Any]: ...
+
+
+def load_file(
+    file: str | pathlib.Path,
+    mmap: bool = False,
+    lazy: bool = False,
+    select: None | typing.Iterable[str | typing.Sequence[str | int]] = None,
+    native: bool = False,
+) -> Store | dict[str, typing.Any]:
+    if native:
+        if lazy or select is not None:
+            raise ValueError(
+                "Cannot natively decode lazy-loaded or selected keys."
+            )
+        with _open_cursor(file, mmap) as csr:
+            return _load_native(csr)
+
+    if select is not None:
+        from .codec import selective_decoder_for
+
+        if lazy:
+            raise ValueError("Cannot both select and lazy-load keys.")
+
+        # only the selected keys are decoded and everything else is
+        # skipped, so what's returned is a partial view of the file
+        key_paths = tuple(_split_key_path(e) for e in select)
+        with _open_cursor(file, mmap) as csr:
+            return selective_decoder_for(Store, key_paths)(csr)
+
+    cls_ = LazyStore if lazy else Store
+    with _open_cursor(file, mmap) as csr:
         # noinspection PyProtectedMember
-        return Store._create(csr)
+        return cls_._create(csr)
+
+
+@dataclasses.dataclass(frozen=True)
+class ObjectSpan:
+    schema_id: str
+    offset: int  # of the OBJECT_BEGIN byte
+    length: int  # through the OBJECT_END byte
+
+
+def scan_index(
+    file: str | pathlib.Path,
+    mmap: bool = False,
+) -> list[ObjectSpan]:
+    from .codec import scan_object_map
+
+    # only steps over the values, so none of them are decoded
+    with _open_cursor(file, mmap) as csr:
+        return [ObjectSpan(*e) for e in scan_object_map(csr)]
+
+
+def _split_key_path(
+    key_path: str | typing.Sequence[str | int],
+) -> tuple[str | int, ...]:
+    # "annotation.cache.object/notes/0" or ("annotation.cache.object",
+    # "notes", 0). numeric segments index into arrays
+    if isinstance(key_path, str):
+        key_path = key_path.split("/")
+    result = tuple(
+        int(e) if isinstance(e, str) and e.isdigit() else e for e in key_path
+    )
+    if not result or not result[0]:
+        raise KeyError("Key path is empty.")
+    return result
+
+
+def patch_file(
+    file: str | pathlib.Path,
+    key_path: str | typing.Sequence[str | int],
+    value: typing.Any,
+):
+    from .codec import decode_store_entry
+    from .codec import encode_store_entry
+    from .codec import encode_store_header
+    from .codec import scan_object_map
+
+    if isinstance(file, str):
+        file = pathlib.Path(file)
+
+    keys = _split_key_path(key_path)
+    schema_id = keys[0]
+    if isinstance(schema_id, int):
+        raise KeyError(f'Top-level key "{schema_id}" must be a str.')
+
+    data = file.read_bytes()
+    csr = ReadCursor(data)
+    entries = scan_object_map(csr)
+
+    # only the top-level object being edited is decoded
+    root = Store()
+    pos, length = csr.tell(), 0
+    for schema_id_, pos_, length_ in entries:
+        if schema_id_ == schema_id:
+            pos, length = pos_, length_
+            _, o = decode_store_entry(data[pos : pos + length])
+            # already of the schema's class
+            dict.__setitem__(root, schema_id, o)
+            break
+
+    if len(keys) == 1:
+        root[schema_id] = value
+    else:
+        parent, key = root, schema_id
+        o = root[schema_id]
+        for key_ in keys[1:-1]:
+            parent, key = o, key_
+            o = o[key_]
+        if isinstance(o, Position):
+            # positions are immutable, so swap in an edited copy
+            edited = Position({**o, keys[-1]: value})
+            if isinstance(key, int):
+                typing.cast(ListBase, parent)[key] = edited
+            else:
+                parent[key] = edited
+        else:
+            o[keys[-1]] = value
+
+    csr = WriteCursor()
+    encode_store_entry(csr, schema_id, dict.__getitem__(root, schema_id))
+    frame = csr.dump()
+
+    if len(frame) == length:
+        # nothing else moves, so only the object's own bytes are written
+        with file.open("r+b") as f:
+            f.seek(pos)
+            f.write(frame)
+        return
+
+    def write(f: typing.BinaryIO):
+        view = memoryview(data)
+        start = 0
+        if length <= 0:
+            # a new object was appended
+            header = encode_store_header(len(entries) + 1)
+            f.write(header)
+            start = len(header)
+        f.write(view[start:pos])
+        f.write(frame)
+        # everything after the object shifts
+        f.write(view[pos + length :])
+
+    _replace_file(file, write)
+
+
+def _load_native(csr: ReadCursor) -> dict:
+    from .codec import native_decoder_for
+
+    # the same tree as the Store but made of plain dicts, lists, bools,
+    # ints, floats and strs. see compile_native_decoder
+    return native_decoder_for(Store)(csr)
+
+
+@typing.overload
+def loads(
+    data: typing.ByteString,
+    native: typing.Literal[False] = False,
+) -> Store: ...
+
+
+@typing.overload
+def loads(
+    data: typing.ByteString,
+    native: typing.Literal[True],
+) -> dict[str, typing.Any]: ...
+
+
+@typing.overload
+def loads(
+    data: typing.ByteString,
+    native: bool = False,
+) -> Store | dict[str, typing.Any]: ...
+
+
+def loads(
+    data: typing.ByteString,
+    native: bool = False,
+) -> Store | dict[str, typing.Any]:
+    csr = ReadCursor(data)
+    if native:
+        return _load_native(csr)
+    # noinspection PyProtectedMember
+    return Store._create(csr)
 
 
 def dump_bytes(o: Store) -> bytes:
-    csr = Cursor()
+    csr = WriteCursor()
     # noinspection PyProtectedMember
     o._write(csr)
     return csr.dump()
 
 
+def _replace_file(
+    file: pathlib.Path, write: typing.Callable[[typing.BinaryIO], None]
+):
+    # written next to the target and moved over it only once complete, so
+    # that a failure part way through leaves the original file as it was
+    fd, tmp = tempfile.mkstemp(
+        dir=file.parent, prefix=f".{file.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        with contextlib.suppress(FileNotFoundError):
+            shutil.copymode(file, tmp)
+        os.replace(tmp, file)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp)
+        raise
+
+
+def dump_file(o: Store, file: str | pathlib.Path):
+    if isinstance(file, str):
+        file = pathlib.Path(file)
+
+    def write(f: typing.BinaryIO):
+        csr = WriteCursor(f)
+        # noinspection PyProtectedMember
+        o._write(csr)
+        csr.flush()
+
+    _replace_file(file, write)
+
+
 ALL_OBJECT_TYPES: typing.Final[tuple[type, ...]] = (
     Array,
     Record,
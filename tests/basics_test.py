@@ -1,3 +1,8 @@
+import copy
+import pickle
+
+import pytest
+
 from krdsrw.basics import Bool
 from krdsrw.basics import Byte
 from krdsrw.basics import Char
@@ -7,6 +12,8 @@ from krdsrw.basics import Long
 from krdsrw.basics import Float
 from krdsrw.basics import Double
 from krdsrw.basics import Utf8Str
+from krdsrw.basics import peek_basic_type
+from krdsrw.basics import read_basic
 from krdsrw.basics import read_bool
 from krdsrw.basics import write_bool
 from krdsrw.basics import read_byte
@@ -73,6 +80,17 @@ def test_utf8str_cmp():
     assert o == "foo"
 
 
+def test_utf8str_prefer_null_read_only():
+    o = Utf8Str("", prefer_null=True)
+    with pytest.raises(AttributeError):
+        o.prefer_null = False  # type: ignore
+
+    o2 = Utf8Str(o, prefer_null=False)
+    assert o2 == "" and not o2.prefer_null and o.prefer_null
+    assert copy.copy(o2).prefer_null is False
+    assert pickle.loads(pickle.dumps(o2)).prefer_null is False
+
+
 def test_cursor_read_bool():
     csr = Cursor(b"\x00\x01")
     assert read_bool(csr) == True
@@ -93,6 +111,22 @@ def test_cursor_read_utf8str():
     assert read_utf8str(csr) == "abc"
 
 
+def test_peek_basic_type():
+    for cls_ in [Bool, Byte, Char, Short, Int, Long, Float, Double, Utf8Str]:
+        assert peek_basic_type(Cursor(bytes([cls_.magic_byte]))) is cls_
+    assert peek_basic_type(Cursor(b"\xfe")) is None
+
+
+def test_cursor_read_basic():
+    csr = Cursor(b"\x01\x00\xcc\x07\xc9\x03\x00\x00\x03\x61\x62\x63\xfe")
+    value = read_basic(csr)
+    assert type(value) is Int and value == 13371337
+    value = read_basic(csr)
+    assert type(value) is Utf8Str and value == "abc"
+    assert read_basic(csr) is None
+    assert csr.tell() == 12
+
+
 def test_cursor_read_double():
     csr = Cursor(b"\x04\x01\x23\x34\x56\x78\x9a\xbc\xde")
     assert read_double(csr) == 3.50054869405591e-303
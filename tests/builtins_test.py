@@ -1,4 +1,7 @@
+import copy
+import threading
 import typing
+import weakref
 
 import pytest
 
@@ -801,6 +804,100 @@ class TestListBase:
         assert not o2.is_modified
         assert not o3.is_modified
 
+    def test_postulate(self):
+        o = ListBase([1, 2])
+        o2 = ListBase()
+        o3 = ListBase()
+        o._add_postulate(o2)
+        o._add_postulate(o3)
+        o._add_postulate(o2)  # no error
+        assert o == [1, 2]
+
+        o3.append(4)
+        o2.append(3)
+        assert o == [1, 2, [4], [3]]
+        assert o.is_modified
+
+        o = ListBase([1, 2])
+        o2 = ListBase()
+        o._add_postulate(o2)
+        o.remove(o2)
+        o2.append(3)
+        assert o == [1, 2]
+
+        o = ListBase([1, 2])
+        o2 = ListBase()
+        o._add_postulate(o2)
+        o = copy.copy(o)
+        o2.append(3)
+        assert o == [1, 2]
+
+    @pytest.mark.parametrize(
+        "detach",
+        [
+            lambda o: o.pop(),
+            lambda o: o.pop(0),
+            lambda o: o.remove(o[1]),
+            lambda o: o.clear(),
+            lambda o: o.__delitem__(0),
+            lambda o: o.__delitem__(slice(1, None)),
+            lambda o: o.__setitem__(0, ListBase()),
+            lambda o: o.__setitem__(slice(0, 2), [ListBase()]),
+            lambda o: o.__imul__(0),
+        ],
+    )
+    def test_detach(self, detach):
+        o = ListBase([ListBase(), ListBase(), ListBase()])
+        children = list(o)
+        for e in children:
+            e._add_observer(o)
+
+        detach(o)
+        for e in children:
+            assert (e._parent is o) == any(e is e2 for e2 in o)
+        assert any(e._parent is None for e in children)
+
+    def test_postulate_storage_released(self):
+        o = ListBase()
+        o2 = ListBase()
+        o._add_postulate(o2)
+        assert o._postulates is not ListBase()._postulates
+        o2.append(1)
+        assert o == [[1]]
+        assert o._postulates is ListBase()._postulates
+
+    def test_parent_kept_on_notify(self):
+        o = ListBase()
+        o2 = ListBase()
+        o._add_postulate(o2)
+        o2.append(1)
+        assert o2._parent is o
+        o2.append(2)
+        assert o == [[1, 2]]
+        assert o2._parent is o
+
+    def test_detach_postulate(self):
+        o = ListBase()
+        o2 = ListBase()
+        o._add_postulate(o2)
+        o.remove(o2)
+        assert o2._parent is None
+
+        o._add_postulate(o2)
+        o.clear()
+        assert o2._parent is None
+
+    def test_detach_duplicate(self):
+        o = ListBase([ListBase()])
+        o.append(o[0])
+        o[0]._add_observer(o)
+        o.pop()
+        assert o[0]._parent is o
+
+    def test_weakref(self):
+        o = ListBase()
+        assert weakref.ref(o)() is o
+
 
 class TestDictBase:
     def test_instantiate(self):
@@ -1772,6 +1869,175 @@ class TestDictBase:
         o2["f0"] = True
         assert o == {"a0": {"b0": True}}
 
+    def test_chain_copy_is_detached(self):
+        class Chain(DictBase[typing.Any, typing.Any]):
+            @typing.override
+            def _make_postulate(self, key: typing.Any) -> None | typing.Any:
+                return self.__class__()
+
+        o = Chain()
+        o2 = o["a0"]
+        o3 = copy.deepcopy(o2)
+        o3["b0"] = "lorem"
+        assert o == {}
+        o2["b0"] = "ipsum"
+        assert o == {"a0": {"b0": "ipsum"}}
+
+    @pytest.mark.parametrize(
+        "detach",
+        [
+            lambda o: o.pop("a"),
+            lambda o: o.popitem(),
+            lambda o: o.clear(),
+            lambda o: o.__delitem__("a"),
+            lambda o: o.__setitem__("a", DictBase()),
+            lambda o: o.update({"a": DictBase(), "b": DictBase()}),
+        ],
+    )
+    def test_detach(self, detach):
+        o = DictBase({"a": DictBase(), "b": DictBase(), "c": DictBase()})
+        children = list(o.values())
+        for e in children:
+            e._add_observer(o)
+
+        detach(o)
+        for e in children:
+            assert (e._parent is o) == any(e is e2 for e2 in o.values())
+        assert any(e._parent is None for e in children)
+
+    def test_postulate_storage_released(self):
+        class Chain(DictBase[typing.Any, typing.Any]):
+            @typing.override
+            def _make_postulate(self, key: typing.Any) -> None | typing.Any:
+                return self.__class__()
+
+        o = Chain()
+        o["a0"]["b0"] = "lorem"
+        assert o == {"a0": {"b0": "lorem"}}
+        assert o._key_to_postulate is Chain()._key_to_postulate
+        assert o._postulate_to_key is Chain()._postulate_to_key
+
+    def test_detach_postulate(self):
+        class Chain(DictBase[typing.Any, typing.Any]):
+            @typing.override
+            def _make_postulate(self, key: typing.Any) -> None | typing.Any:
+                return self.__class__()
+
+        o = Chain()
+        o2 = o["a0"]
+        assert o2._parent is o
+        o.clear()
+        assert o2._parent is None
+
+        o2 = o["a0"]
+        o["a0"] = Chain({"b0": "lorem"})
+        o2["b0"] = "ipsum"
+        assert o == {"a0": {"b0": "lorem"}}
+        assert o2._parent is None
+
+    def test_parent_kept_on_notify(self):
+        class Chain(DictBase[typing.Any, typing.Any]):
+            @typing.override
+            def _make_postulate(self, key: typing.Any) -> None | typing.Any:
+                return self.__class__()
+
+        o = Chain()
+        o2 = o["a0"]
+        o2["b0"] = "lorem"
+        assert o2._parent is o
+        o2["b1"] = "ipsum"
+        assert o == {"a0": {"b0": "lorem", "b1": "ipsum"}}
+        assert o2._parent is o
+
+    def test_weakref(self):
+        o = DictBase()
+        assert weakref.ref(o)() is o
+
+    def test_batch(self):
+        class Chain(DictBase[typing.Any, typing.Any]):
+            @typing.override
+            def _make_postulate(self, key: typing.Any) -> None | typing.Any:
+                return self.__class__()
+
+        o = Chain()
+        with o.batch():
+            o["a0"]["b0"] = "lorem"
+            o["a0"]["b1"]["c0"] = "ipsum"
+            with o.batch():
+                o["a1"]["b0"] = "dolor"
+            assert o == {}
+        assert o == {
+            "a0": {"b0": "lorem", "b1": {"c0": "ipsum"}},
+            "a1": {"b0": "dolor"},
+        }
+
+        o = Chain()
+        with pytest.raises(ValueError):
+            with o.batch():
+                o["a0"]["b0"] = "lorem"
+                raise ValueError()
+        assert o == {"a0": {"b0": "lorem"}}
+
+    def test_batch_is_scoped(self):
+        class Chain(DictBase[typing.Any, typing.Any]):
+            @typing.override
+            def _make_postulate(self, key: typing.Any) -> None | typing.Any:
+                return self.__class__()
+
+        a = Chain()
+        b = Chain()
+        with a.batch():
+            a["a0"]["b0"] = "lorem"
+            b["a0"]["b0"] = "ipsum"
+            assert a == {}
+            assert b == {"a0": {"b0": "ipsum"}}
+
+            with a["a1"].batch():
+                a["a1"]["b0"]["c0"] = "dolor"
+                assert a["a1"] == {}
+            assert a["a1"] == {"b0": {"c0": "dolor"}}
+            assert a == {}
+        assert a == {"a0": {"b0": "lorem"}, "a1": {"b0": {"c0": "dolor"}}}
+
+    def test_batch_defers_bookkeeping(self):
+        class Chain(DictBase[typing.Any, typing.Any]):
+            @typing.override
+            def _make_postulate(self, key: typing.Any) -> None | typing.Any:
+                return self.__class__()
+
+        o = Chain()
+        o2 = o["a0"]
+        o3 = o2["b0"]
+        with o.batch():
+            o3["c0"] = "lorem"
+            assert o3.is_modified and not o3._modified
+            assert not o2.is_modified
+
+            # found once and kept along the way up for later edits
+            assert o3._batch is not None and o3._batch[1] is not None
+            assert o3._batch[1].root is o
+            assert o2._batch is o3._batch and o._batch is o3._batch
+            o3["c1"] = "ipsum"
+            assert o == {}
+
+        assert o3._modified and o2._modified and o._modified
+        assert o == {"a0": {"b0": {"c0": "lorem", "c1": "ipsum"}}}
+
+    def test_batch_is_per_thread(self):
+        class Chain(DictBase[typing.Any, typing.Any]):
+            @typing.override
+            def _make_postulate(self, key: typing.Any) -> None | typing.Any:
+                return self.__class__()
+
+        o = Chain()
+        with o.batch():
+            thread = threading.Thread(
+                target=lambda: o["a0"].__setitem__("b0", "lorem")
+            )
+            thread.start()
+            thread.join()
+            assert o == {"a0": {"b0": "lorem"}}
+
     def test_chain_identities_are_persistent(self):
         class Chain(DictBase[typing.Any, typing.Any]):
             @typing.override
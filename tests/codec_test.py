@@ -0,0 +1,482 @@
+import array
+import copy
+import typing
+
+import pytest
+
+from krdsrw.basics import Byte
+from krdsrw.basics import Double
+from krdsrw.basics import Float
+from krdsrw.basics import Int
+from krdsrw.basics import Long
+from krdsrw.basics import Short
+from krdsrw.basics import Utf8Str
+from krdsrw.codec import compile_decoder
+from krdsrw.codec import compile_encoder
+from krdsrw.codec import compile_native_decoder
+from krdsrw.codec import decode_positions
+from krdsrw.codec import decode_store_entry
+from krdsrw.codec import encode_positions
+from krdsrw.codec import read_fixed_width_values
+from krdsrw.codec import scan_object_map
+from krdsrw.codec import write_fixed_width_values
+from krdsrw.cursor import Cursor
+from krdsrw.cursor import ReadCursor
+from krdsrw.cursor import WriteCursor
+from krdsrw.error import UnexpectedBytesError
+from krdsrw.error import UnexpectedStructureError
+from krdsrw.objects import Array
+from krdsrw.objects import Field
+from krdsrw.objects import IntMap
+from krdsrw.objects import ObjectMap
+from krdsrw.objects import Position
+from krdsrw.objects import Protoform
+from krdsrw.objects import Record
+from krdsrw.objects import Store
+from krdsrw.objects import _make_object
+from krdsrw.objects import dump_bytes
+
+
+def test_decode_fixed_width():
+    decode = compile_decoder(Int)
+    o = decode(ReadCursor(b"\x01\x00\x00\x05\x39"))
+    assert o == 1337 and isinstance(o, Int)
+
+
+def test_decode_array():
+    decode = compile_decoder(Array, Array._schema(Protoform(Double)))
+    o = decode(
+        ReadCursor(
+            b"\x01\x00\x00\x00\x02"
+            + b"\x04\x3f\xf0\x00\x00\x00\x00\x00\x00"
+            + b"\x04\x40\x00\x00\x00\x00\x00\x00\x00"
+        )
+    )
+    assert isinstance(o, Array) and o == [1.0, 2.0]
+    assert o.elmt_schema_cls is Double
+
+
+def test_position_batch():
+    strs = ["AdIEAAAuFgAA:5050", "12345", "AdIEAAAuFgAA:5050"]
+    positions = decode_positions(strs)
+    assert positions[0] == positions[2]
+    assert positions[1] == {"char_pos": 12345}
+    assert encode_positions(positions) == strs
+    assert encode_positions([{"char_pos": 7}]) == ["7"]
+
+
+def test_position_array_roundtrip():
+    sch = Array._schema(Protoform(Position))
+    o = _make_object(Array, schema=sch)
+    o.append({"char_pos": 1})
+    o.append({"char_pos": 2, "chunk_eid": 3, "chunk_pos": 4})
+    csr = WriteCursor()
+    compile_encoder(Array, sch)(csr, o)
+    data = csr.dump()
+
+    p = compile_decoder(Array, sch)(ReadCursor(data))
+    assert p == o and all(isinstance(e, Position) for e in p)
+
+    expected = Cursor()
+    o._write(expected)
+    assert expected.dump() == data
+
+
+def test_fixed_width_values():
+    data = (
+        b"\x01\x00\x00\x00\x02"
+        + b"\x04\x3f\xf0\x00\x00\x00\x00\x00\x00"
+        + b"\x04\x40\x00\x00\x00\x00\x00\x00\x00"
+    )
+    values = read_fixed_width_values(ReadCursor(data), Double)
+    assert values == array.array("d", [1.0, 2.0])
+
+    csr = WriteCursor()
+    write_fixed_width_values(csr, Double, [1.0, 2.0])
+    assert csr.dump() == data
+
+
+def test_fixed_width_values_bad_magic_byte():
+    data = b"\x01\x00\x00\x00\x02\x01\x00\x00\x00\x07\x02\x00\x00\x00\x08"
+    with pytest.raises(UnexpectedBytesError):
+        read_fixed_width_values(ReadCursor(data), Int)
+
+
+def test_fixed_width_values_bad_magic_byte_mid_array():
+    data = (
+        b"\x01\x00\x00\x00\x03"
+        + b"\x01\x00\x00\x00\x07"
+        + b"\x01\x00\x00\x00\x08"
+        + b"\x05\x00\x00\x00\x09"
+    )
+    with pytest.raises(UnexpectedBytesError) as e:
+        read_fixed_width_values(ReadCursor(data), Int)
+    assert e.value.pos == 15
+    assert e.value.expected == [Int.magic_byte]
+    assert e.value.actual == 0x05
+
+
+def test_fixed_width_values_numpy():
+    numpy = pytest.importorskip("numpy")
+    csr = WriteCursor()
+    write_fixed_width_values(csr, Long, numpy.arange(5))
+    values = read_fixed_width_values(ReadCursor(csr.dump()), Long, True)
+    assert isinstance(values, numpy.ndarray)
+    assert values.tolist() == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.parametrize("cls_", [Byte, Short, Int, Long, Float, Double])
+def test_fixed_width_array_roundtrip(cls_: type):
+    sch = Array._schema(Protoform(cls_))
+    o = _make_object(Array, schema=sch)
+    o.extend([cls_(1), cls_(-2), cls_(3)])
+
+    expected = Cursor()
+    o._write(expected)
+    csr = WriteCursor()
+    compile_encoder(Array, sch)(csr, o)
+    assert csr.dump() == expected.dump()
+
+    p = compile_decoder(Array, sch)(ReadCursor(csr.dump()))
+    assert p == o and all(type(e) is cls_ for e in p)
+
+
+def test_native_array():
+    sch = Array._schema(Protoform(Double))
+    o = _make_object(Array, schema=sch)
+    o.extend([Double(1.5), Double(2.5)])
+    csr = Cursor()
+    o._write(csr)
+    value = compile_native_decoder(Array, sch)(ReadCursor(csr.dump()))
+    assert value == [1.5, 2.5] and type(value[0]) is float
+
+    sch = Array._schema(Protoform(Position))
+    o = _make_object(Array, schema=sch)
+    o.append(Position(char_pos=5, chunk_eid=7, chunk_pos=0))
+    csr = Cursor()
+    o._write(csr)
+    value = compile_native_decoder(Array, sch)(ReadCursor(csr.dump()))
+    assert value == [{"char_pos": 5, "chunk_eid": 7, "chunk_pos": 0}]
+
+
+def test_native_record_decodes_unknown_field_once():
+    class Counting(ReadCursor):
+        restores = 0
+
+        @typing.override
+        def restore(self):
+            Counting.restores += 1
+            super().restore()
+
+    # a record of optional fields has no leading type byte to check
+    inner = Record._schema({"x": Field(Protoform(Int), required=False)})
+    sch = Record._schema(
+        {"a": Int, "b": Field(Protoform(Record, inner), required=False)}
+    )
+    data = b"\x01\x00\x00\x00\x01\x01\x00\x00\x00\x02"
+    value = compile_native_decoder(Record, sch)(Counting(data))
+    assert value == {"a": 1, "b": {"x": 2}}
+    assert Counting.restores == 0
+
+
+def test_decode_record_optional():
+    sch = Record._schema(
+        {
+            "a": Int,
+            "b": Field(Protoform(Utf8Str), required=False),
+            "c": Field(Protoform(Int), required=False),
+        }
+    )
+    csr = Cursor(b"\x01\x00\x00\x05\x39\x03\x00\x00\x01\x61\xff")
+    o = compile_decoder(Record, sch)(csr)
+    assert o == {"a": 1337, "b": "a"}
+    assert csr.tell() == 10
+
+
+def test_decode_record_framed():
+    sch = Record._schema({"pos": Position})
+    decode = compile_decoder(Record, sch, "x.y")
+    csr = ReadCursor(
+        b"\xfe\x00\x00\x03\x78\x2e\x79"
+        + b"\x03\x00\x00\x05\x31\x32\x33\x34\x35\xff"
+    )
+    o = decode(csr)
+    assert o == {"pos": {"char_pos": 12345}}
+    assert csr.tell() == len(csr)
+
+
+def test_decode_record_wrong_schema_id():
+    sch = Record._schema({"pos": Position})
+    decode = compile_decoder(Record, sch, "x.z")
+    csr = ReadCursor(
+        b"\xfe\x00\x00\x03\x78\x2e\x79"
+        + b"\x03\x00\x00\x05\x31\x32\x33\x34\x35\xff"
+    )
+    with pytest.raises(UnexpectedStructureError):
+        decode(csr)
+
+
+def test_decode_int_map():
+    sch = IntMap._schema(
+        {
+            "apple": Field(Protoform(Int), "name.a"),
+            "banana": Field(Protoform(Utf8Str)),
+        }
+    )
+    decode = compile_decoder(IntMap, sch)
+    o = decode(
+        ReadCursor(
+            b"\x01\x00\x00\x00\x01"
+            + b"\x01\x00\x00\x00\x01"
+            + b"\x03\x00\x00\x03\x61\x62\x63"
+        )
+    )
+    assert isinstance(o, IntMap) and o == {"banana": "abc"}
+
+
+def test_decode_store_matches_interpreted():
+    o = _make_object(
+        Store,
+        {
+            "lpr": {"pos": {"char_pos": 12345}},
+            "font.prefs": {
+                "typeface": "_INVALID_,und:helvetica neue lt",
+                "line_sp": 1,
+                "size": 0,
+                "align": 1,
+                "inset_top": 63,
+                "inset_left": 80,
+                "inset_bottom": 0,
+                "inset_right": 80,
+                "unknown1": 0,
+                "bold": 1,
+            },
+        },
+    )
+    data = dump_bytes(o)
+
+    root = compile_decoder(Store)(ReadCursor(data))
+    assert isinstance(root, Store)
+    assert root["font.prefs"]["bold"] == 1
+    assert "user_sideloadable_font" not in root["font.prefs"]
+    assert dump_bytes(root) == data
+
+
+def test_encode_record_matches_interpreted():
+    sch = Record._schema(
+        {
+            "a": Int,
+            "b": Field(Protoform(Utf8Str), required=False),
+            "pos": Field(Protoform(Position), "x.y", required=False),
+        }
+    )
+    o = _make_object(
+        Record, {"a": 1337, "b": "", "pos": {"char_pos": 5}}, schema=sch
+    )
+
+    expected = Cursor()
+    o._write(expected)
+
+    actual = WriteCursor()
+    compile_encoder(Record, sch)(actual, o)
+    assert actual.dump() == expected.dump()
+
+
+def test_encode_int_map_matches_interpreted():
+    sch = IntMap._schema(
+        {
+            "apple": Field(Protoform(Int), "name.a"),
+            "banana": Field(Protoform(Utf8Str)),
+        }
+    )
+    o = _make_object(IntMap, {"apple": 1, "banana": "abc"}, schema=sch)
+
+    expected = Cursor()
+    o._write(expected)
+
+    actual = WriteCursor()
+    compile_encoder(IntMap, sch)(actual, o)
+    assert actual.dump() == expected.dump()
+
+
+def test_encode_store_matches_interpreted():
+    o = _make_object(
+        Store,
+        {
+            "lpr": {"pos": {"char_pos": 12345}, "timestamp": 1},
+            "font.prefs": {"typeface": "abc", "bold": 1},
+            "apnx.key": {"asin": "abc", "cde_type": "EBOK"},
+        },
+    )
+
+    expected = Cursor()
+    ObjectMap._write(o, expected)
+    assert dump_bytes(o) == expected.dump()
+
+
+def test_scan_object_map():
+    o = _make_object(
+        Store,
+        {
+            "lpr": {"pos": {"char_pos": 12345}, "timestamp": 1},
+            "apnx.key": {"asin": "abc", "cde_type": "EBOK"},
+        },
+    )
+    data = dump_bytes(o)
+
+    csr = ReadCursor(data)
+    entries = scan_object_map(csr)
+    assert csr.tell() == len(data)
+    assert [e[0] for e in entries] == ["lpr", "apnx.key"]
+
+    for schema_id, pos, length in entries:
+        schema_id_actual, value = decode_store_entry(data[pos : pos + length])
+        assert schema_id_actual == schema_id
+        assert type(value) is type(o[schema_id])
+
+
+def test_passthrough_unmodified():
+    o = _make_object(
+        Store,
+        {
+            "lpr": {"pos": {"char_pos": 12345}, "timestamp": 1},
+            "font.prefs": {"typeface": "abc", "bold": 1},
+        },
+    )
+    data = dump_bytes(o)
+
+    root = compile_decoder(Store)(ReadCursor(data))
+    assert root._source is not None
+    assert root["font.prefs"]._source is not None
+    assert dump_bytes(root) == data
+
+
+def test_passthrough_modified_descendant():
+    o = _make_object(
+        Store,
+        {
+            "lpr": {"pos": {"char_pos": 12345}, "timestamp": 1},
+            "font.prefs": {"typeface": "abc", "bold": 1},
+        },
+    )
+    root = compile_decoder(Store)(ReadCursor(dump_bytes(o)))
+    root["lpr"]["pos"] = {"char_pos": 5}
+
+    assert root._source is None
+    assert root["lpr"]._source is None
+    assert root["font.prefs"]._source is not None
+
+    expected = Cursor()
+    ObjectMap._write(root, expected)
+    assert dump_bytes(root) == expected.dump()
+    assert (
+        compile_decoder(Store)(ReadCursor(dump_bytes(root)))["lpr"]["pos"][
+            "char_pos"
+        ]
+        == 5
+    )
+
+
+def test_passthrough_batch():
+    o = _make_object(
+        Store,
+        {
+            "lpr": {"pos": {"char_pos": 12345}, "timestamp": 1},
+            "font.prefs": {"typeface": "abc", "bold": 1},
+        },
+    )
+    root = compile_decoder(Store)(ReadCursor(dump_bytes(o)))
+    with root.batch():
+        root["lpr"]["timestamp"] = 2
+        root["lpr"]["pos"] = {"char_pos": 5}
+        assert root._source is not None
+
+    assert root._source is None
+    assert root["font.prefs"]._source is not None
+    lpr = compile_decoder(Store)(ReadCursor(dump_bytes(root)))["lpr"]
+    assert lpr["timestamp"] == 2 and lpr["pos"]["char_pos"] == 5
+
+
+def test_passthrough_batch_dump():
+    o = _make_object(Store, {"lpr": {"timestamp": 1}})
+    root = compile_decoder(Store)(ReadCursor(dump_bytes(o)))
+    with root.batch():
+        root["lpr"]["timestamp"] = 2
+        data = dump_bytes(root)
+        root["lpr"]["timestamp"] = 3
+
+    assert compile_decoder(Store)(ReadCursor(data))["lpr"]["timestamp"] == 2
+    data = dump_bytes(root)
+    assert compile_decoder(Store)(ReadCursor(data))["lpr"]["timestamp"] == 3
+
+
+def test_passthrough_copy():
+    o = _make_object(Store, {"lpr": {"pos": {"char_pos": 12345}}})
+    root = compile_decoder(Store)(ReadCursor(dump_bytes(o)))
+    assert root["lpr"]._source is not None
+    assert copy.deepcopy(root["lpr"])._source is None
+    assert copy.copy(root)._source is None
+
+
+@pytest.mark.parametrize(
+    "mutate",
+    [
+        lambda o: o["apnx.key"]["opn_to_pos"].__setitem__(0, 9),
+        lambda o: o["apnx.key"]["opn_to_pos"].__delitem__(0),
+        lambda o: o["apnx.key"]["opn_to_pos"].__delitem__(slice(1, None)),
+        lambda o: o["apnx.key"]["opn_to_pos"].__imul__(2),
+        lambda o: o["apnx.key"]["opn_to_pos"].__iadd__([4]),
+        lambda o: o["apnx.key"]["opn_to_pos"].append(4),
+        lambda o: o["apnx.key"]["opn_to_pos"].insert(0, 4),
+        lambda o: o["apnx.key"]["opn_to_pos"].extend([4, 5]),
+        lambda o: o["apnx.key"]["opn_to_pos"].pop(),
+        lambda o: o["apnx.key"]["opn_to_pos"].remove(2),
+        lambda o: o["apnx.key"]["opn_to_pos"].clear(),
+        lambda o: o["apnx.key"]["opn_to_pos"].sort(reverse=True),
+        lambda o: o["apnx.key"]["opn_to_pos"].reverse(),
+        lambda o: o["apnx.key"].__setitem__(
+            "cde_type", Utf8Str(o["apnx.key"]["cde_type"], prefer_null=False)
+        ),
+        lambda o: o.__setitem__("lpr", {"pos": {"char_pos": 5}}),
+        lambda o: o.__delitem__("lpr"),
+        lambda o: o.pop("lpr"),
+        lambda o: o.popitem(),
+        lambda o: o.setdefault("font.prefs", {"bold": 1}),
+        lambda o: o.update({"font.prefs": {"bold": 1}}),
+        lambda o: o.__ior__({"font.prefs": {"bold": 1}}),
+        lambda o: o.clear(),
+    ],
+)
+def test_passthrough_every_mutation(mutate):
+    o = _make_object(
+        Store,
+        {
+            "lpr": {"pos": {"char_pos": 12345}, "timestamp": 1},
+            "apnx.key": {"asin": "abc", "opn_to_pos": [1, 2, 3]},
+        },
+    )
+    data = dump_bytes(o)
+    root = compile_decoder(Store)(ReadCursor(data))
+    assert root["apnx.key"]["cde_type"] == ""
+
+    mutate(root)
+
+    expected = Cursor()
+    ObjectMap._write(root, expected)
+    assert expected.dump() != data
+    assert dump_bytes(root) == expected.dump()
+
+
+def test_decoded_child_detached_on_removal():
+    o = _make_object(
+        Store,
+        {"lpr": {"timestamp": 1}, "apnx.key": {"opn_to_pos": [1, 2]}},
+    )
+    root = compile_decoder(Store)(ReadCursor(dump_bytes(o)))
+    assert root["lpr"]._parent is root
+
+    assert root.pop("lpr")._parent is None
+    opn_to_pos = root["apnx.key"]["opn_to_pos"]
+    assert opn_to_pos._parent is root["apnx.key"]
+    root["apnx.key"]["opn_to_pos"] = [3]
+    assert opn_to_pos._parent is None
@@ -1,6 +1,10 @@
+import io
 import os
+import struct
 import sys
 
+import pytest
+
 from krdsrw import cursor
 
 
@@ -91,3 +95,121 @@ def test_cursor_unsave():
     csr.unsave()
     csr.restore()
     assert csr.tell() == 0
+
+
+def test_read_cursor_dump():
+    csr = cursor.ReadCursor(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    assert csr.dump() == b"ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def test_read_cursor_read():
+    csr = cursor.ReadCursor(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    assert csr.read() == 65
+    assert csr.read(4) == b"BCDE" and csr.tell() == 5
+
+
+def test_read_cursor_read_past_end():
+    csr = cursor.ReadCursor(b"AB")
+    assert csr.read(4) == b"AB" and csr.tell() == 2
+    with pytest.raises(IndexError):
+        csr.read()
+
+
+def test_read_cursor_seek():
+    csr = cursor.ReadCursor(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    csr.seek(8)
+    assert csr.peek(1) == b"I" and csr.tell() == 8
+
+
+def test_read_cursor_skip():
+    csr = cursor.ReadCursor(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    csr.skip(8)
+    assert csr.peek() == 73 and csr.tell() == 8
+
+
+def test_read_cursor_eat():
+    csr = cursor.ReadCursor(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    assert not csr.eat(b"ABCE") and csr.tell() == 0
+    assert csr.eat(b"ABCD") and csr.tell() == 4
+    assert csr.eat(0x45) and csr.tell() == 5
+
+
+def test_read_cursor_peek_matches():
+    csr = cursor.ReadCursor(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    assert csr.peek_matches(b"ABCD") and csr.peek_matches(65)
+
+
+def test_read_cursor_unpack():
+    csr = cursor.ReadCursor(b"\x01\x00\x00\x05\x39\xff")
+    assert csr.read() == 1
+    assert csr.unpack(struct.Struct(">l")) == (1337,)
+    assert csr.tell() == 5
+
+
+def test_read_cursor_decode():
+    csr = cursor.ReadCursor(b"\x03\x61\x62\x63")
+    csr.skip(1)
+    assert csr.decode(3) == "abc" and csr.tell() == 4
+
+
+def test_read_cursor_write():
+    csr = cursor.ReadCursor(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    with pytest.raises(io.UnsupportedOperation):
+        csr.write(b"0123")
+
+
+def test_read_cursor_is_at_end():
+    csr = cursor.ReadCursor(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    csr.seek(25)
+    assert csr.is_at_end() is True
+
+
+def test_read_cursor_save_restore():
+    csr = cursor.ReadCursor(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    csr.save()
+    csr.seek(8)
+    csr.save()
+    csr.seek(16)
+    csr.unsave()
+    csr.restore()
+    assert csr.tell() == 0
+
+
+def test_write_cursor_write():
+    csr = cursor.WriteCursor()
+    csr.write(0x41)
+    csr.write(b"BCD")
+    assert csr.dump() == b"ABCD" and csr.tell() == 4
+
+
+def test_write_cursor_read():
+    csr = cursor.WriteCursor()
+    csr.write(b"ABCD")
+    with pytest.raises(io.UnsupportedOperation):
+        csr.read()
+    with pytest.raises(io.UnsupportedOperation):
+        csr.seek(0)
+
+
+def test_write_cursor_sink():
+    sink = io.BytesIO()
+    csr = cursor.WriteCursor(sink)
+    csr.write(0x41)
+    csr.write(b"BCD")
+    csr.flush()
+    assert sink.getvalue() == b"ABCD" and csr.tell() == 4
+
+
+def test_read_cursor_view():
+    csr = cursor.ReadCursor(b"\x01\x02\x03\x04")
+    view = csr.view(1, 3)
+    assert view is not None
+    assert bytes(view) == b"\x02\x03"
+    assert cursor.Cursor(b"\x01\x02").view(0, 1) is None
+
+
+def test_read_cursor_view_mutable():
+    # the caller could change the bytes out from under a view
+    data = bytearray(b"\x01\x02\x03\x04")
+    assert cursor.ReadCursor(data).view(0, 2) is None
+    assert cursor.ReadCursor(memoryview(data)).view(0, 2) is None
@@ -0,0 +1,60 @@
+import pathlib
+
+from krdsrw.basics import Byte
+from krdsrw.basics import Long
+from krdsrw.basics import Utf8Str
+from krdsrw.events import Value
+from krdsrw.events import iterparse
+from krdsrw.objects import Store
+from krdsrw.objects import _make_object
+from krdsrw.objects import dump_bytes
+from krdsrw.objects import dump_file
+
+
+def test_iterparse_record():
+    o = _make_object(Store, {"font.prefs": {"typeface": "abc", "bold": 1}})
+    data = dump_bytes(o)
+
+    events = list(iterparse(data))
+    assert events[0] == ("begin_object", "font.prefs")
+    assert events[1] == ("field", "typeface")
+    assert events[2] == ("value", Value(Utf8Str, "abc", 36))
+    assert events[-1] == ("end_object", "font.prefs")
+    assert ("field", "bold") in events
+
+
+def test_iterparse_lpr():
+    o = _make_object(
+        Store, {"lpr": {"pos": {"char_pos": 12345}, "timestamp": 7}}
+    )
+    data = dump_bytes(o)
+
+    kinds = [(e, v.cls_) if e == "value" else e for e, v in iterparse(data)]
+    assert kinds == [
+        "begin_object",
+        ("value", Byte),
+        ("value", Utf8Str),
+        ("value", Long),
+        "end_object",
+    ]
+
+
+def test_iterparse_array(tmp_path: pathlib.Path):
+    o = _make_object(
+        Store,
+        {
+            "page.history.store": [
+                {"pos": {"char_pos": 1}, "time": 2},
+                {"pos": {"char_pos": 3}, "time": 4},
+            ]
+        },
+    )
+    path = tmp_path / "test.yjr"
+    dump_file(o, path)
+
+    events = list(iterparse(path))
+    assert events[0] == ("begin_object", "page.history.store")
+    assert events[1] == ("begin_array", 2)
+    assert events[-2] == ("end_array", 2)
+    values = [v.value for e, v in events if e == "value"]
+    assert values == ["1", 2, "3", 4]
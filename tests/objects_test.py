@@ -1,6 +1,9 @@
+import abc
 import dataclasses
 import json
+import os
 import pathlib
+import struct
 import typing
 
 import pytest
@@ -16,13 +19,23 @@ from krdsrw.objects import DynamicMap
 from krdsrw.objects import Field
 from krdsrw.objects import IntMap
 from krdsrw.objects import LPR
+from krdsrw.objects import LazyStore
+from krdsrw.objects import PartialStore
 from krdsrw.objects import Position
 from krdsrw.objects import Protoform
 from krdsrw.objects import Record
 from krdsrw.objects import Store
+from krdsrw.objects import _JsonEncoder
 from krdsrw.objects import _TypedDict
+from krdsrw.objects import _is_compatible
 from krdsrw.objects import _make_object
 from krdsrw.objects import _read_object
+from krdsrw.objects import dump_bytes
+from krdsrw.objects import dump_file
+from krdsrw.objects import load_file
+from krdsrw.objects import loads
+from krdsrw.objects import patch_file
+from krdsrw.objects import scan_index
 
 TEMPEST_EPUB: typing.Final[pathlib.Path] = (
     pathlib.Path(__file__).parent / "the-tempest.epub"
@@ -281,6 +294,71 @@ class TestRecord:
         o = _read_object(csr, Record, sch)
         assert o == {"a": 1337, "b": 0.0, "c": 0.0, "d": "abc"}
 
+    def test_read_optional_absent(self):
+        sch = Record._schema(
+            {
+                "a": Int,
+                "b": Field(Protoform(Utf8Str), required=False),
+                "c": Field(Protoform(Int), required=False),
+            }
+        )
+
+        csr = Cursor(b"\x01\x00\x00\x05\x39\xff")
+        o = _read_object(csr, Record, sch)
+        assert o == {"a": 1337}
+        assert csr.tell() == 5
+
+    def test_read_optional_partial(self):
+        sch = Record._schema(
+            {
+                "a": Int,
+                "b": Field(Protoform(Utf8Str), required=False),
+                "c": Field(Protoform(Int), required=False),
+            }
+        )
+
+        csr = Cursor(b"\x01\x00\x00\x05\x39\x03\x00\x00\x01\x61")
+        o = _read_object(csr, Record, sch)
+        assert o == {"a": 1337, "b": "a"}
+        assert csr.tell() == 10
+
+    def test_deferred_defaults(self):
+        sch = Record._schema(
+            {
+                "a": Int,
+                "b": Utf8Str,
+                "c": Field(Protoform(Int), required=False),
+            }
+        )
+
+        o = Record(_schema=sch, _defaults=False)
+        assert dict(o) == {}
+
+        # noinspection PyProtectedMember
+        o._adopt({"a": Int(1)})
+        assert o == {"a": 1, "b": ""}
+        assert isinstance(o["b"], Utf8Str)
+
+    def test_read_validates_later_edits(self):
+        sch = Record._schema(
+            {
+                "a": Int,
+                "b": Field(Protoform(Utf8Str), required=False),
+            }
+        )
+
+        csr = Cursor(b"\x01\x00\x00\x05\x39\x03\x00\x00\x01\x61")
+        o = _read_object(csr, Record, sch)
+        assert not o.is_modified
+        assert isinstance(o["a"], Int) and isinstance(o["b"], Utf8Str)
+
+        with pytest.raises(KeyError):
+            o["c"] = 1
+        with pytest.raises(ValueError):
+            o["a"] = "abc"
+        o["a"] = 42
+        assert o.is_modified and isinstance(o["a"], Int)
+
     def test_write(self):
         sch = Record._schema(
             {
@@ -326,6 +404,28 @@ class TestRecord:
         assert o["c"] == 7.89
         assert o["d"] == "hello"
 
+    def test_schema_interned(self):
+        sch1 = Record._schema({"a": Int, "b": Float})
+        sch2 = Record._schema({"a": Field(Protoform(Int)), "b": Float})
+        assert sch1 is sch2
+
+        o1 = _make_object(Record, schema=sch1)
+        o2 = _make_object(Record, schema=sch1)
+        # noinspection PyUnresolvedReferences
+        assert o1._TypedDict__key_to_field is o2._TypedDict__key_to_field
+
+    def test_schema_immutable(self):
+        sch = Record._schema({"a": Int, "b": Float})
+        with pytest.raises(TypeError):
+            sch["c"] = Field(Protoform(Int))
+        with pytest.raises(TypeError):
+            sch.setdefault("c", Field(Protoform(Int)))
+        with pytest.raises(TypeError):
+            sch.update({"c": Field(Protoform(Int))})
+        assert "c" not in sch
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            sch["a"].required = False  # type: ignore
+
 
 class TestIntMap:
     def test_instantiate(self):
@@ -412,7 +512,7 @@ class TestPosition:
         csr = Cursor(
             b"\x03\x00\x00\x11\x41\x64\x49\x45"
             + b"\x41\x41\x41\x75\x46\x67\x41\x41"
-            + b"\x3A\x35\x30\x35\x30"
+            + b"\x3a\x35\x30\x35\x30"
         )
         o = Position._create(csr)  # no error
         assert o == {
@@ -420,6 +520,27 @@ class TestPosition:
             "chunk_eid": 1234,
             "chunk_pos": 5678,
         }
+        assert str(o) == "AdIEAAAuFgAA:5050"
+
+    def test_immutable(self):
+        o = Position({"char_pos": 12345})
+        with pytest.raises(TypeError):
+            o["char_pos"] = 5  # type: ignore
+        assert o.char_pos == 12345
+        assert o.chunk_eid == -1 and "chunk_eid" not in o
+
+    def test_order(self):
+        a = Position(char_pos=9, chunk_eid=1, chunk_pos=2)
+        b = Position(char_pos=1, chunk_eid=1, chunk_pos=3)
+        c = Position(char_pos=0, chunk_eid=2, chunk_pos=0)
+        assert sorted([c, b, a]) == [a, b, c]
+        assert a < b <= c and c > a
+
+    def test_hash(self):
+        a = Position(char_pos=9, chunk_eid=1, chunk_pos=2)
+        b = Position("AQEAAAACAAAA:9")
+        assert a == b and hash(a) == hash(b)
+        assert len({a, b, Position(char_pos=9)}) == 2
 
     def test_write_v1(self):
         csr = Cursor()
@@ -440,7 +561,7 @@ class TestPosition:
         assert csr.dump() == (
             b"\x03\x00\x00\x11\x41\x64\x49\x45"
             + b"\x41\x41\x41\x75\x46\x67\x41\x41"
-            + b"\x3A\x35\x30\x35\x30"
+            + b"\x3a\x35\x30\x35\x30"
         )
 
 
@@ -495,24 +616,52 @@ class TestStore:
         assert o["creation_time"] == 1701332599082
         assert o["last_modification_time"] == 1701332599082
 
+    def test_load_file_mmap(self, tmp_path: pathlib.Path):
+        o = _make_object(Store, {"lpr": {"pos": {"char_pos": 12345}}})
+        path = tmp_path / "test.yjr"
+        path.write_bytes(dump_bytes(o))
+
+        root = load_file(path, mmap=True)
+        assert root["lpr"]["pos"]["char_pos"] == 12345
+        assert dump_bytes(root) == path.read_bytes()
+
+    def test_dump_file(self, tmp_path: pathlib.Path):
+        o = _make_object(Store, {"lpr": {"pos": {"char_pos": 12345}}})
+        path = tmp_path / "test.yjr"
+        dump_file(o, path)
+        assert path.read_bytes() == dump_bytes(o)
+        assert load_file(path)["lpr"]["pos"]["char_pos"] == 12345
+
+    def test_dump_file_failed(self, tmp_path: pathlib.Path):
+        o = _make_object(Store, {"font.prefs": {"bold": 1}})
+        path = tmp_path / "test.yjr"
+        dump_file(o, path)
+        data = path.read_bytes()
+
+        o["font.prefs"]["bold"] = 2**40  # too big for an Int
+        with pytest.raises(struct.error):
+            dump_file(o, path)
+        assert path.read_bytes() == data
+        assert list(tmp_path.iterdir()) == [path]
+
     def test_read_object(self):
         csr = Cursor(
-            b"\x00\x00\x00\x00\x00\x1A\xB1\x26"
+            b"\x00\x00\x00\x00\x00\x1a\xb1\x26"
             + b"\x02\x00\x00\x00\x00\x00\x00\x00"
-            + b"\x01\x01\x00\x00\x00\x01\xFE\x00"
-            + b"\x00\x1D\x61\x6E\x6E\x6F\x74\x61"
-            + b"\x74\x69\x6F\x6E\x2E\x70\x65\x72"
-            + b"\x73\x6F\x6E\x61\x6C\x2E\x68\x69"
-            + b"\x67\x68\x6C\x69\x67\x68\x74\x03"
-            + b"\x00\x00\x12\x41\x65\x51\x4B\x41"
-            + b"\x41\x41\x6D\x41\x41\x41\x41\x3A"
+            + b"\x01\x01\x00\x00\x00\x01\xfe\x00"
+            + b"\x00\x1d\x61\x6e\x6e\x6f\x74\x61"
+            + b"\x74\x69\x6f\x6e\x2e\x70\x65\x72"
+            + b"\x73\x6f\x6e\x61\x6c\x2e\x68\x69"
+            + b"\x67\x68\x6c\x69\x67\x68\x74\x03"
+            + b"\x00\x00\x12\x41\x65\x51\x4b\x41"
+            + b"\x41\x41\x6d\x41\x41\x41\x41\x3a"
             + b"\x31\x35\x32\x38\x38\x03\x00\x00"
-            + b"\x12\x41\x58\x38\x4D\x41\x41\x41"
-            + b"\x63\x41\x41\x41\x41\x3A\x31\x35"
-            + b"\x33\x33\x30\x02\x00\x00\x01\x8C"
-            + b"\x02\xDF\x5A\xC1\x02\x00\x00\x01"
-            + b"\x8C\x02\xDF\x5A\xC1\x03\x00\x00"
-            + b"\x05\x30\xEF\xBF\xBC\x30\xFF"
+            + b"\x12\x41\x58\x38\x4d\x41\x41\x41"
+            + b"\x63\x41\x41\x41\x41\x3a\x31\x35"
+            + b"\x33\x33\x30\x02\x00\x00\x01\x8c"
+            + b"\x02\xdf\x5a\xc1\x02\x00\x00\x01"
+            + b"\x8c\x02\xdf\x5a\xc1\x03\x00\x00"
+            + b"\x05\x30\xef\xbf\xbc\x30\xff"
         )
         store = Store._create(csr)
         n = store["annotation.personal.highlight"]
@@ -554,23 +703,23 @@ class TestStore:
         o._write(csr)
 
         assert csr.dump() == (
-            b"\x00\x00\x00\x00\x00\x1A\xB1\x26"
+            b"\x00\x00\x00\x00\x00\x1a\xb1\x26"
             + b"\x02\x00\x00\x00\x00\x00\x00\x00"
-            + b"\x01\x01\x00\x00\x00\x01\xFE\x00"
-            + b"\x00\x0A\x66\x6F\x6E\x74\x2E\x70"
-            + b"\x72\x65\x66\x73\x03\x00\x00\x1F"
-            + b"\x5F\x49\x4E\x56\x41\x4C\x49\x44"
-            + b"\x5F\x2C\x75\x6E\x64\x3A\x68\x65"
-            + b"\x6C\x76\x65\x74\x69\x63\x61\x20"
-            + b"\x6E\x65\x75\x65\x20\x6C\x74\x01"
+            + b"\x01\x01\x00\x00\x00\x01\xfe\x00"
+            + b"\x00\x0a\x66\x6f\x6e\x74\x2e\x70"
+            + b"\x72\x65\x66\x73\x03\x00\x00\x1f"
+            + b"\x5f\x49\x4e\x56\x41\x4c\x49\x44"
+            + b"\x5f\x2c\x75\x6e\x64\x3a\x68\x65"
+            + b"\x6c\x76\x65\x74\x69\x63\x61\x20"
+            + b"\x6e\x65\x75\x65\x20\x6c\x74\x01"
             + b"\x00\x00\x00\x01\x01\x00\x00\x00"
             + b"\x00\x01\x00\x00\x00\x01\x01\x00"
-            + b"\x00\x00\x3F\x01\x00\x00\x00\x50"
+            + b"\x00\x00\x3f\x01\x00\x00\x00\x50"
             + b"\x01\x00\x00\x00\x00\x01\x00\x00"
             + b"\x00\x50\x01\x00\x00\x00\x00\x01"
-            + b"\x00\x00\x00\x01\x03\x01\x01\xFF"
-            + b"\xFF\xFF\xFF\x03\x01\x00\x00\x03"
-            + b"\x01\xFF"
+            + b"\x00\x00\x00\x01\x03\x01\x01\xff"
+            + b"\xff\xff\xff\x03\x01\x00\x00\x03"
+            + b"\x01\xff"
         )
 
     def test_json(self):
@@ -631,3 +780,305 @@ class TestStore:
 
         print(json.dumps(jso, cls=Encoder))
         print(json.dumps(o, cls=Encoder))
+
+
+class TestLazyStore:
+    @staticmethod
+    def make_data() -> bytes:
+        o = _make_object(
+            Store,
+            {
+                "lpr": {"pos": {"char_pos": 12345}},
+                "fpr": {"pos": {"char_pos": 678}},
+                "font.prefs": {"typeface": "abc", "bold": 1},
+            },
+        )
+        return dump_bytes(o)
+
+    def test_read_pending(self):
+        o = LazyStore._create(Cursor(self.make_data()))
+        assert o.pending == {"lpr", "fpr", "font.prefs"}
+        assert len(o) == 3
+        assert "fpr" in o and "apnx.key" not in o
+        assert o.pending == {"lpr", "fpr", "font.prefs"}
+
+    def test_decode_on_access(self):
+        o = LazyStore._create(Cursor(self.make_data()))
+        assert o["fpr"]["pos"]["char_pos"] == 678
+        assert o.pending == {"lpr", "font.prefs"}
+        assert not o.is_modified
+
+    def test_write_untouched(self):
+        data = self.make_data()
+        o = LazyStore._create(Cursor(data))
+        assert dump_bytes(o) == data
+        o["fpr"]  # decoded but not modified
+        assert dump_bytes(o) == data
+
+    def test_write_modified(self):
+        data = self.make_data()
+        expected = Store._create(Cursor(data))
+        expected["fpr"]["pos"] = {"char_pos": 5}
+        del expected["lpr"]
+
+        o = LazyStore._create(Cursor(data))
+        o["fpr"]["pos"] = {"char_pos": 5}
+        del o["lpr"]
+        assert "lpr" not in o
+        assert dump_bytes(o) == dump_bytes(expected)
+
+    def test_items(self):
+        o = LazyStore._create(Cursor(self.make_data()))
+        assert set(o.keys()) == {"lpr", "fpr", "font.prefs"}
+        assert not o.pending
+
+    def test_load_file(self, tmp_path: pathlib.Path):
+        data = self.make_data()
+        path = tmp_path / "test.yjr"
+        path.write_bytes(data)
+        o = load_file(path, mmap=True, lazy=True)
+        assert isinstance(o, LazyStore)
+        assert o["lpr"]["pos"]["char_pos"] == 12345
+        assert dump_bytes(o) == data
+
+
+def test_is_compatible_memo():
+    class Custom:
+        pass
+
+    assert _is_compatible(1, Int)
+    assert _is_compatible(Int, [Utf8Str, Int])
+    assert not _is_compatible("abc", Int)
+    assert not _is_compatible(Custom(), Record)
+
+    # registering with an ABC has to invalidate what was remembered. a
+    # local ABC so that the global registry is left as it was
+    class Local(abc.ABC):
+        pass
+
+    assert not _is_compatible(Custom(), Local)
+    Local.register(Custom)
+    assert _is_compatible(Custom(), Local)
+
+
+def test_no_instance_dict():
+    root = Store()
+    root["lpr"] = {"pos": {"char_pos": 123}}
+    root["apnx.key"]["page_map"] = "abc"
+    root["page.history.store"].make_and_append(
+        {"pos": {"char_pos": 456}, "time": 789}
+    )
+
+    def walk(o: typing.Any):
+        assert not hasattr(o, "__dict__"), type(o)
+        children = dict.values(o) if isinstance(o, dict) else o
+        if isinstance(o, (dict, list)):
+            for e in children:
+                walk(e)
+
+    # noinspection PyProtectedMember
+    walk(Store._create(Cursor(dump_bytes(root))))
+
+
+def test_scan_index(tmp_path: pathlib.Path):
+    o = _make_object(
+        Store,
+        {
+            "lpr": {"pos": {"char_pos": 12345}},
+            "font.prefs": {"typeface": "abc", "bold": 1},
+        },
+    )
+    data = dump_bytes(o)
+    path = tmp_path / "test.yjr"
+    path.write_bytes(data)
+
+    index = scan_index(path)
+    assert [e.schema_id for e in index] == ["lpr", "font.prefs"]
+    assert all(type(e.schema_id) is str for e in index)
+    assert index[0].offset == 22
+    assert index[-1].offset + index[-1].length == len(data)
+    for e in index:
+        assert data[e.offset] == 0xFE
+        assert data[e.offset + e.length - 1] == 0xFF
+
+
+def test_load_native(tmp_path: pathlib.Path):
+    o = _make_object(
+        Store,
+        {
+            "lpr": {"pos": {"char_pos": 12345}},
+            "font.prefs": {"typeface": "abc", "bold": 1},
+        },
+    )
+    o["ReaderMetrics"]["abc"] = Bool(True)
+    o["ReaderMetrics"]["def"] = Double(1.5)
+    data = dump_bytes(o)
+    path = tmp_path / "test.yjr"
+    path.write_bytes(data)
+
+    root = load_file(path, native=True)
+    assert root == loads(data, native=True)
+    assert root == json.loads(json.dumps(loads(data), cls=_JsonEncoder))
+    assert type(root) is dict
+    assert type(root["lpr"]["pos"]) is dict
+    assert type(root["font.prefs"]["typeface"]) is str
+    assert type(root["ReaderMetrics"]["abc"]) is bool
+    assert type(root["ReaderMetrics"]["def"]) is float
+
+    with pytest.raises(ValueError):
+        load_file(path, lazy=True, native=True)
+
+
+class TestPatchFile:
+    @staticmethod
+    def make_file(tmp_path: pathlib.Path) -> pathlib.Path:
+        o = _make_object(
+            Store,
+            {
+                "lpr": {"pos": {"char_pos": 12345}},
+                "font.prefs": {"typeface": "abc", "bold": 1},
+                "fpr": {"pos": {"char_pos": 678}},
+            },
+        )
+        path = tmp_path / "test.yjr"
+        dump_file(o, path)
+        return path
+
+    def test_patch_same_length(self, tmp_path: pathlib.Path):
+        path = self.make_file(tmp_path)
+        size = path.stat().st_size
+        patch_file(path, "lpr/pos/char_pos", 54321)
+        assert path.stat().st_size == size
+        o = load_file(path)
+        assert o["lpr"]["pos"]["char_pos"] == 54321
+        assert o["fpr"]["pos"]["char_pos"] == 678
+
+    def test_patch_resize(self, tmp_path: pathlib.Path):
+        path = self.make_file(tmp_path)
+        patch_file(path, ["font.prefs", "typeface"], "a much longer name")
+        o = load_file(path)
+        assert o["font.prefs"]["typeface"] == "a much longer name"
+        assert o["fpr"]["pos"]["char_pos"] == 678
+
+    def test_patch_failed(self, tmp_path: pathlib.Path):
+        path = self.make_file(tmp_path)
+        data = path.read_bytes()
+        with pytest.raises(struct.error):
+            patch_file(path, "font.prefs/bold", 2**40)  # too big for an Int
+        assert path.read_bytes() == data
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_patch_resize_interrupted(
+        self, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        path = self.make_file(tmp_path)
+        data = path.read_bytes()
+
+        def replace(*args, **kwargs):
+            raise OSError("interrupted")
+
+        # the resized file is only moved over the original once complete
+        monkeypatch.setattr(os, "replace", replace)
+        with pytest.raises(OSError):
+            patch_file(path, ["font.prefs", "typeface"], "a much longer name")
+        assert path.read_bytes() == data
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_patch_top_level(self, tmp_path: pathlib.Path):
+        path = self.make_file(tmp_path)
+        patch_file(path, "fpr", {"pos": {"char_pos": 9}})
+        assert load_file(path)["fpr"]["pos"]["char_pos"] == 9
+
+    def test_patch_append(self, tmp_path: pathlib.Path):
+        path = self.make_file(tmp_path)
+        patch_file(path, "apnx.key/asin", "abc")
+        o = load_file(path)
+        assert len(o) == 4
+        assert o["apnx.key"]["asin"] == "abc"
+        assert o["lpr"]["pos"]["char_pos"] == 12345
+
+    def test_patch_position_in_array(self, tmp_path: pathlib.Path):
+        path = self.make_file(tmp_path)
+        patch_file(path, "page.history.store", [{"pos": {"char_pos": 1}}])
+        patch_file(path, ["page.history.store", 0, "pos", "char_pos"], 7)
+        o = load_file(path)
+        assert o["page.history.store"][0]["pos"]["char_pos"] == 7
+
+    def test_patch_int_top_level(self, tmp_path: pathlib.Path):
+        path = self.make_file(tmp_path)
+        with pytest.raises(KeyError):
+            patch_file(path, [0, "pos"], 7)
+
+
+class TestLoadFileSelect:
+    @staticmethod
+    def make_file(tmp_path: pathlib.Path) -> pathlib.Path:
+        o = _make_object(
+            Store,
+            {
+                "lpr": {"pos": {"char_pos": 12345}},
+                "font.prefs": {"typeface": "abc", "bold": 1},
+                "apnx.key": {"asin": "B00", "cde_type": "EBOK"},
+                "page.history.store": [
+                    {"pos": {"char_pos": 1}, "time": 2},
+                    {"pos": {"char_pos": 3}, "time": 4},
+                ],
+            },
+        )
+        path = tmp_path / "test.yjr"
+        dump_file(o, path)
+        return path
+
+    def test_select_top_level(self, tmp_path: pathlib.Path):
+        o = load_file(self.make_file(tmp_path), select=["lpr"])
+        assert set(dict.keys(o)) == {"lpr"}
+        assert o["lpr"]["pos"]["char_pos"] == 12345
+
+    def test_select_nested(self, tmp_path: pathlib.Path):
+        o = load_file(
+            self.make_file(tmp_path),
+            select=["apnx.key/cde_type", "font.prefs/bold"],
+        )
+        assert set(dict.keys(o)) == {"apnx.key", "font.prefs"}
+        assert dict(o["apnx.key"]) == {"cde_type": "EBOK"}
+        assert dict(o["font.prefs"]) == {"bold": 1}
+
+    def test_select_array_elements(self, tmp_path: pathlib.Path):
+        o = load_file(
+            self.make_file(tmp_path), select=["page.history.store/time"]
+        )
+        assert [e["time"] for e in o["page.history.store"]] == [2, 4]
+        assert not any(
+            dict.__contains__(e, "pos") for e in o["page.history.store"]
+        )
+
+    def test_select_unselected_raises(self, tmp_path: pathlib.Path):
+        o = load_file(
+            self.make_file(tmp_path),
+            select=["font.prefs/bold", "page.history.store/time"],
+        )
+        assert o["font.prefs"]["bold"] == 1
+        # rather than a default that looks like it was read from the file
+        with pytest.raises(KeyError):
+            o["font.prefs"]["typeface"]
+        with pytest.raises(KeyError):
+            o["page.history.store"][0]["pos"]
+        with pytest.raises(KeyError):
+            o["lpr"]
+
+    def test_select_array_index(self, tmp_path: pathlib.Path):
+        with pytest.raises(KeyError, match="index 0"):
+            load_file(
+                self.make_file(tmp_path), select=["page.history.store/0"]
+            )
+
+    def test_select_cannot_dump(self, tmp_path: pathlib.Path):
+        path = self.make_file(tmp_path)
+        o = load_file(path, select=["lpr"])
+        assert isinstance(o, PartialStore)
+        with pytest.raises(TypeError):
+            dump_bytes(o)
+
+    def test_select_unknown(self, tmp_path: pathlib.Path):
+        with pytest.raises(KeyError):
+            load_file(self.make_file(tmp_path), select=["apnx.key/nope"])